@@ -1,10 +1,28 @@
 from typing import Dict, Any
 from .base_agent import BaseAgent
-import ast
+from .stage_models import AnalysisInput
+from .prompt_builder import PromptBuilder
 from datetime import datetime
+from tools.skill_taxonomy import canonicalize_skills
 
 
 class AnalyzerAgent(BaseAgent):
+    response_schema = {
+        "type": "object",
+        "properties": {
+            "technical_skills": {"type": "array", "items": {"type": "string"}},
+            "years_of_experience": {"type": "number"},
+            "education": {
+                "type": "object",
+                "properties": {"level": {"type": "string"}, "field": {"type": "string"}},
+            },
+            "experience_level": {"type": "string", "enum": ["Junior", "Mid-level", "Senior"]},
+            "key_achievements": {"type": "array", "items": {"type": "string"}},
+            "domain_expertise": {"type": "array", "items": {"type": "string"}},
+        },
+        "required": ["technical_skills", "years_of_experience", "education", "experience_level"],
+    }
+
     def __init__(self, provider: str = None, api_key: str = None):
         super().__init__(
             name="Analyzer",
@@ -26,20 +44,19 @@ class AnalyzerAgent(BaseAgent):
         print("🔍 Analyzer: Analyzing candidate profile")
 
         content = messages[-1]["content"]
-        try:
-             extracted_data = ast.literal_eval(content) if isinstance(content, str) else content
-        except (ValueError, SyntaxError):
-             extracted_data = {}
+        extracted_data = content if isinstance(content, AnalysisInput) else AnalysisInput.from_content(content)
 
         # Get structured analysis from Ollama
-        analysis_prompt = f"""
+        # Raw text repeats what the structured data says, so it is trimmed first
+        prompt = PromptBuilder(self.name)
+        prompt.text("""
         Strictly analyze and categorize the following resume data.
-        
-        Data Sources:
-        1. Raw Text: {extracted_data.get("raw_text", "")[:2000]}
-        2. Structured Bits: {extracted_data.get("structured_data", "")}
-        3. Enhanced Signal: {extracted_data.get("enhanced_data", "")}
 
+        Data Sources:""")
+        prompt.data("1. Raw Text:", extracted_data.raw_text[:2000], priority=1)
+        prompt.data("2. Structured Bits:", extracted_data.structured_data, priority=3)
+        prompt.data("3. Enhanced Signal:", extracted_data.enhanced_data, priority=2)
+        prompt.text("""
         Task: Return a JSON object representing the candidate's professional profile.
         
         Validation Rules:
@@ -50,22 +67,22 @@ class AnalyzerAgent(BaseAgent):
         - key_achievements: Concrete results from jobs.
 
         Structure:
-        {{
+        {
             "technical_skills": ["skill1", "skill2"],
             "years_of_experience": number,
-            "education": {{
+            "education": {
                 "level": "Bachelors/Masters/PhD",
                 "field": "field of study"
-            }},
+            },
             "experience_level": "Junior/Mid-level/Senior",
             "key_achievements": ["achievement1", "achievement2"],
             "domain_expertise": ["domain1", "domain2"]
-        }}
+        }
 
         Return ONLY the JSON object, no other text.
-        """
+        """)
 
-        analysis_results = self._query_ollama(analysis_prompt)
+        analysis_results = await self._aquery_llm(prompt.build())
         parsed_results = self._parse_json_safely(analysis_results)
 
         # Ensure we have valid data even if parsing fails
@@ -79,6 +96,11 @@ class AnalyzerAgent(BaseAgent):
                 "domain_expertise": [],
             }
 
+        # One spelling per skill, so matching compares canonical skills
+        skills = parsed_results.get("technical_skills") if isinstance(parsed_results, dict) else None
+        if isinstance(skills, list):
+            parsed_results["technical_skills"] = canonicalize_skills(skills)
+
         return {
             "skills_analysis": parsed_results,
             "analysis_timestamp": datetime.now().strftime("%Y-%m-%d"),
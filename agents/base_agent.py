@@ -1,35 +1,50 @@
 import json
 import logging
-import re
-from typing import Dict, Any, Optional
-from openai import OpenAI
+import time
+from typing import Dict, Any, Optional, Set, Tuple
+from openai import AsyncOpenAI, BadRequestError
 from config import Config
+from .llm_clients import get_client, get_async_client, get_in_flight_limiter
+from .llm_cache import get_llm_cache
+from .json_parsing import first_json_object
+from .tracing import record_cache_hit, record_llm_call, record_json_parse
 
 logger = logging.getLogger(__name__)
 
+# (provider, model) pairs that rejected response_format; they get plain requests from then on
+_response_format_unsupported: Set[Tuple[str, str]] = set()
+
 
 class BaseAgent:
+    # Seconds a cached LLM response stays valid for this agent (0 disables caching)
+    cache_ttl: int = Config.LLM_CACHE_TTL
+    # JSON schema of the reply, sent as a json_schema response_format where the provider supports it
+    response_schema: Optional[Dict[str, Any]] = None
+
     def __init__(self, name: str, instructions: str, provider: str = None, api_key: str = None):
         self.name = name
         self.instructions = instructions
         self.provider = provider or Config.DEFAULT_PROVIDER
         self.api_key = api_key
+        self.temperature = 0.7
         
-        # Initialize Client based on provider
+        # Resolve the provider endpoint; clients come from the shared pool
         if self.provider == "nebius":
-            actual_key = self.api_key or Config.NEBIUS_API_KEY or "placeholder"
-            self.client = OpenAI(
-                base_url=Config.NEBIUS_BASE_URL,
-                api_key=actual_key,
-            )
+            self.base_url = Config.NEBIUS_BASE_URL
+            self._resolved_key = self.api_key or Config.NEBIUS_API_KEY or "placeholder"
             self.model = Config.NEBIUS_MODEL
         else: # Default to Ollama
-            self.client = OpenAI(
-                base_url=Config.OLLAMA_BASE_URL,
-                api_key="ollama", # Not required for Ollama
-            )
+            self.base_url = Config.OLLAMA_BASE_URL
+            self._resolved_key = "ollama" # Not required for Ollama
             self.model = Config.OLLAMA_MODEL
 
+        self.client = get_client(self.provider, self.base_url, self._resolved_key)
+
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        """Shared async client for this provider on the running event loop"""
+        return get_async_client(self.provider, self.base_url, self._resolved_key)
+
     async def run(self, messages: list) -> Dict[str, Any]:
         """
         Process messages and return a result.
@@ -41,50 +56,173 @@ class BaseAgent:
         """
         Query the LLM using the configured provider.
         """
+        request = self._completion_request(prompt)
+        cache_key, cached = self._cache_lookup(prompt, request.get("response_format"))
+        if cached is not None:
+            return cached
+
+        start = None
         try:
             # logger.info(f"[{self.name}] Querying {self.provider} ({self.model})...") # Reduced verbosity
-            
-            messages = [
-                {"role": "system", "content": self.instructions},
-                {"role": "user", "content": prompt}
-            ]
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=0.7,
-            )
+            start = time.perf_counter()
+            try:
+                response = self.client.chat.completions.create(**request)
+            except BadRequestError as e:
+                if not self._drop_response_format(request, e):
+                    raise
+                cache_key = self._cache_key(prompt)
+                start = time.perf_counter()
+                response = self.client.chat.completions.create(**request)
+            elapsed = time.perf_counter() - start
             
-            return response.choices[0].message.content
+            content = response.choices[0].message.content
+            record_llm_call(self.name, self.provider, elapsed, response.usage)
+            self._cache_store(cache_key, content)
+            return content
+        except Exception as e:
+            if start is not None:
+                record_llm_call(self.name, self.provider, time.perf_counter() - start, error=True)
+            logger.error(f"Error querying LLM ({self.provider}): {e}")
+            return json.dumps({"error": str(e)})
+
+    async def _aquery_llm(self, prompt: str) -> str:
+        """
+        Query the LLM without blocking the event loop.
+        Same contract as _query_llm, but awaits the AsyncOpenAI transport so
+        several agents can have requests in flight on a single worker.
+        """
+        request = self._completion_request(prompt)
+        cache_key, cached = await self._acache_lookup(prompt, request.get("response_format"))
+        if cached is not None:
+            return cached
+
+        start = None
+        try:
+            async with get_in_flight_limiter(self.provider):
+                # Latency covers the request only, not time queued for a slot
+                start = time.perf_counter()
+                try:
+                    response = await self.async_client.chat.completions.create(**request)
+                except BadRequestError as e:
+                    if not self._drop_response_format(request, e):
+                        raise
+                    cache_key = self._cache_key(prompt)
+                    start = time.perf_counter()
+                    response = await self.async_client.chat.completions.create(**request)
+                elapsed = time.perf_counter() - start
+
+            content = response.choices[0].message.content
+            record_llm_call(self.name, self.provider, elapsed, response.usage)
+            await self._acache_store(cache_key, content)
+            return content
         except Exception as e:
+            if start is not None:
+                record_llm_call(self.name, self.provider, time.perf_counter() - start, error=True)
             logger.error(f"Error querying LLM ({self.provider}): {e}")
             return json.dumps({"error": str(e)})
 
+    def _response_format(self) -> Optional[Dict[str, Any]]:
+        """Structured-output mode for this agent's requests, if the provider supports one"""
+        mode = Config.LLM_RESPONSE_FORMAT.get(self.provider, "") if Config.LLM_JSON_MODE else ""
+        if not mode or (self.provider, self.model) in _response_format_unsupported:
+            return None
+        if mode == "json_schema" and self.response_schema:
+            return {
+                "type": "json_schema",
+                "json_schema": {"name": self.name, "schema": self.response_schema, "strict": False},
+            }
+        return {"type": "json_object"}
+
+    def _completion_request(self, prompt: str) -> Dict[str, Any]:
+        request = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": self.instructions},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": self.temperature,
+        }
+        response_format = self._response_format()
+        if response_format is not None:
+            request["response_format"] = response_format
+        return request
+
+    def _drop_response_format(self, request: Dict[str, Any], error: BadRequestError) -> bool:
+        """
+        After a 400: drop response_format from the request (so it can be
+        retried) if that is what the provider rejected. Any other bad request,
+        e.g. an over-long prompt, is not retried and leaves JSON mode on.
+        """
+        if "response_format" not in request:
+            return False
+        reason = f"{getattr(error, 'param', None) or ''} {error.message}".lower()
+        if not any(name in reason for name in ("response_format", "json_schema", "json_object")):
+            return False
+        del request["response_format"]
+        logger.warning(f"[{self.name}] {self.provider} ({self.model}) rejected response_format; sending plain requests")
+        _response_format_unsupported.add((self.provider, self.model))
+        return True
+
+    def _cache_key(self, prompt: str, response_format: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Key of this agent's reply to `prompt`; None when caching is off"""
+        cache = get_llm_cache()
+        if cache is None or self.cache_ttl <= 0:
+            return None
+        return cache.make_key(self.provider, self.model, self.temperature, self.instructions, prompt, response_format)
+
+    def _cache_lookup(self, prompt: str, response_format: Optional[Dict[str, Any]] = None) -> Tuple[Optional[str], Optional[str]]:
+        """Return (cache_key, cached_response); key is None when caching is off"""
+        key = self._cache_key(prompt, response_format)
+        if key is None:
+            return None, None
+        cached = get_llm_cache().get(key)
+        if cached is not None:
+            record_cache_hit(self.name)
+        return key, cached
+
+    @staticmethod
+    def _cacheable_reply(content: Optional[str]) -> bool:
+        """
+        Only replies holding a JSON object are cached. A truncated or
+        prose-only reply would otherwise be replayed for the agent's whole
+        cache_ttl; left uncached, the next request asks the LLM again.
+        """
+        return bool(content) and first_json_object(content)[0] is not None
+
+    def _cache_store(self, cache_key: Optional[str], content: Optional[str]):
+        if cache_key is None or not self._cacheable_reply(content):
+            return
+        get_llm_cache().set(cache_key, content, self.cache_ttl)
+
+    async def _acache_lookup(self, prompt: str, response_format: Optional[Dict[str, Any]] = None) -> Tuple[Optional[str], Optional[str]]:
+        """_cache_lookup without blocking the event loop on the SQLite tier"""
+        key = self._cache_key(prompt, response_format)
+        if key is None:
+            return None, None
+        cached = await get_llm_cache().aget(key)
+        if cached is not None:
+            record_cache_hit(self.name)
+        return key, cached
+
+    async def _acache_store(self, cache_key: Optional[str], content: Optional[str]):
+        if cache_key is None or not self._cacheable_reply(content):
+            return
+        await get_llm_cache().aset(cache_key, content, self.cache_ttl)
+
     # Backwards compatibility alias
     def _query_ollama(self, prompt: str) -> str:
         return self._query_llm(prompt)
 
     def _parse_json_safely(self, text: str) -> Dict[str, Any]:
         """
-        Safely parse JSON from LLM response, attempting to find JSON blocks within text.
+        Parse the first JSON object in an LLM response, skipping markdown
+        fences, surrounding prose and bare arrays (callers read fields with
+        .get()).
         """
-        try:
-            # 1. Try direct parsing first
-            return json.loads(text)
-        except json.JSONDecodeError:
-            try:
-                # 2. Try cleaning markdown indicators
-                clean_text = text.replace("```json", "").replace("```", "").strip()
-                return json.loads(clean_text)
-            except json.JSONDecodeError:
-                # 3. Use regex to find the FIRST JSON object or array block
-                # Search for something starting with { and ending with }
-                match = re.search(r"(\{.*\}|\[.*\])", text, re.DOTALL)
-                if match:
-                    try:
-                        return json.loads(match.group(1))
-                    except json.JSONDecodeError:
-                        pass
-                
-                logger.warning(f"[{self.name}] Failed to parse JSON from: {text[:200]}...")
-                return {"error": "Failed to parse JSON", "raw_text": text}
+        value, outcome = first_json_object(text or "")
+        record_json_parse(self.name, outcome)
+        if value is None:
+            logger.warning(f"[{self.name}] Failed to parse JSON ({outcome}) from: {(text or '')[:200]}...")
+            return {"error": "Failed to parse JSON", "raw_text": text}
+        return value
@@ -0,0 +1,45 @@
+import asyncio
+from typing import Awaitable, Callable, List, Optional, Sequence, TypeVar
+
+from config import Config
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+async def process_batch(
+    items: Sequence[T],
+    worker: Callable[[T], Awaitable[R]],
+    concurrency: Optional[int] = None,
+) -> List[R]:
+    """
+    Run `worker` over `items` with at most `concurrency` in flight.
+
+    A fixed pool of tasks pulls from a queue, so memory stays flat however
+    large the batch is. Results come back in input order; the worker is
+    responsible for persisting each result as it completes and for turning
+    per-item failures into results.
+    """
+    concurrency = max(1, concurrency or Config.BATCH_CONCURRENCY)
+    queue: "asyncio.Queue[int]" = asyncio.Queue()
+    for index in range(len(items)):
+        queue.put_nowait(index)
+
+    results: List[Optional[R]] = [None] * len(items)
+
+    async def consume():
+        while True:
+            try:
+                index = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            results[index] = await worker(items[index])
+
+    workers = [asyncio.create_task(consume()) for _ in range(min(concurrency, len(items)))]
+    try:
+        await asyncio.gather(*workers)
+    finally:
+        for task in workers:
+            task.cancel()
+
+    return results
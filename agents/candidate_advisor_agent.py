@@ -1,10 +1,22 @@
 from typing import Dict, Any
 from .base_agent import BaseAgent
+from .prompt_builder import PromptBuilder
 import logging
 
 logger = logging.getLogger(__name__)
 
 class CandidateAdvisorAgent(BaseAgent):
+    response_schema = {
+        "type": "object",
+        "properties": {
+            "strengths": {"type": "array", "items": {"type": "string"}},
+            "improvement_areas": {"type": "array", "items": {"type": "string"}},
+            "actionable_tips": {"type": "array", "items": {"type": "string"}},
+            "career_advice": {"type": "string"},
+        },
+        "required": ["strengths", "improvement_areas", "actionable_tips", "career_advice"],
+    }
+
     def __init__(self, provider: str = None, api_key: str = None):
         super().__init__(
             name="CandidateAdvisor",
@@ -40,24 +52,24 @@ class CandidateAdvisorAgent(BaseAgent):
         content = messages[-1].get("content", {})
         
         # Prepare context for LLM
-        prompt = f"""
-        As a Career Advisor, analyze this candidate profile:
-        {str(content)}
-        
+        prompt = PromptBuilder(self.name)
+        prompt.text("As a Career Advisor, analyze this candidate profile.")
+        prompt.data("Candidate profile:", content, priority=1)
+        prompt.text("""
         Provide a strategic career advice report in JSON format.
         
         Required JSON Structure:
-        {{
+        {
             "strengths": ["list of assets"],
             "improvement_areas": ["list of gaps"],
             "actionable_tips": ["specific steps to take"],
             "career_advice": "long-term strategic summary"
-        }}
+        }
         
         Return ONLY valid JSON.
-        """
+        """)
         
-        response = self._query_llm(prompt)
+        response = await self._aquery_llm(prompt.build())
         parsed = self._parse_json_safely(response)
         
         if "error" in parsed:
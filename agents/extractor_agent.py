@@ -1,9 +1,38 @@
 from typing import Dict, Any
-from pdfminer.high_level import extract_text # pip install pdfminer.six
 from .base_agent import BaseAgent
-import ast
+from .tracing import record_cache_hit
+from .stage_models import ResumeInput
+from .prompt_builder import PromptBuilder
+from tools.pdf_extraction import extract_pdf_text, extract_pdf_prefix, file_sha256
+from db.database import JobDatabase
+from config import Config
+import asyncio
+from utils.exceptions import ExtractionError
 
 class ExtractorAgent(BaseAgent):
+    # Same resume text always extracts the same way; keep for a month
+    cache_ttl = 30 * 24 * 3600
+
+    response_schema = {
+        "type": "object",
+        "properties": {
+            "personal_info": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "email": {"type": "string"},
+                    "phone": {"type": "string"},
+                    "location": {"type": "string"},
+                },
+            },
+            "education": {"type": "array", "items": {"type": "object"}},
+            "experience": {"type": "array", "items": {"type": "object"}},
+            "technical_skills": {"type": "array", "items": {"type": "string"}},
+            "certifications": {"type": "array", "items": {"type": "string"}},
+        },
+        "required": ["personal_info", "technical_skills"],
+    }
+
     def __init__(self, provider: str = None, api_key: str = None):
         super().__init__(
             name="Extractor",
@@ -13,71 +42,141 @@ class ExtractorAgent(BaseAgent):
             provider=provider,
             api_key=api_key
         )
+        self.db = JobDatabase()
     
     async def run(self, messages: list) -> Dict[str, Any]:
         """Process the resume and extract information"""
         print("📄 Extractor: Processing resume")
         
         content = messages[-1]["content"]
-        try:
-             resume_data = ast.literal_eval(content) if isinstance(content, str) else content
-        except (ValueError, SyntaxError):
-             resume_data = {}
+        resume = content if isinstance(content, ResumeInput) else ResumeInput.from_content(content)
         
-        # Extract text from PDF
-        if resume_data.get("file_path"):
-            raw_text = extract_text(resume_data["file_path"])
+        # Identical PDF bytes were already parsed and extracted: reuse that
+        content_hash = resume.content_hash
+        if resume.file_path and not content_hash:
+            try:
+                content_hash = await asyncio.to_thread(file_sha256, resume.file_path)
+            except OSError:
+                content_hash = None
+        if content_hash:
+            cached = self.db.get_cached_extraction(content_hash)
+            if cached is not None:
+                print("📄 Extractor: Reusing cached extraction")
+                record_cache_hit(self.name, cache="extraction")
+                result = {
+                    **cached,
+                    "source_file": resume.file_path,
+                    "content_hash": content_hash,
+                    "cache_hit": True,
+                    "extraction_status": "completed",
+                }
+                if not Config.PDF_PAGE_LIMITED:
+                    # Full-text mode: finish a page-limited text cached earlier
+                    await self.full_text(result)
+                return result
+
+        # Extract text from PDF (off the event loop, in the PDF process pool).
+        # By default only the pages needed to fill the prompt budget are parsed;
+        # full_text() parses the rest for callers that need the whole resume.
+        text_complete = True
+        if resume.file_path:
+            try:
+                if Config.PDF_PAGE_LIMITED:
+                    raw_text, text_complete = await extract_pdf_prefix(
+                        resume.file_path, Config.EXTRACTION_CHAR_BUDGET
+                    )
+                else:
+                    raw_text = await extract_pdf_text(resume.file_path)
+            except ExtractionError as e:
+                print(f"Extractor: {e}")
+                return {
+                    "raw_text": "",
+                    "structured_data": {},
+                    "extraction_status": "failed",
+                    "error": str(e),
+                }
         else:
-            raw_text = resume_data.get("text", "")
+            raw_text = resume.text
 
         # Get structured information
-        extraction_prompt = f"""
-        Extract the resume text into a STRICT JSON format.
-        
-        Resume Text:
-        {raw_text[:4000]}
-        
+        prompt = PromptBuilder(self.name)
+        prompt.text("Extract the resume text into a STRICT JSON format.")
+        prompt.data("Resume Text:", raw_text[:Config.EXTRACTION_CHAR_BUDGET], priority=1)
+        prompt.text("""
         OUTPUT SCHEMA:
-        {{
-            "personal_info": {{
+        {
+            "personal_info": {
                 "name": "full name",
                 "email": "email address",
                 "phone": "phone number",
                 "location": "city, country"
-            }},
+            },
             "education": [
-                {{
+                {
                     "institution": "University/School",
                     "level": "Degree level (e.g. Bachelor's, Master's)",
                     "field": "Field of study (e.g. Computer Science)",
                     "year": "Graduation year"
-                }}
+                }
             ],
             "experience": [
-                {{
+                {
                     "company": "Company Name",
                     "role": "Job Title",
                     "duration": "Dates of employment",
                     "responsibilities": ["bullet points"]
-                }}
+                }
             ],
             "technical_skills": ["List of skills"],
             "certifications": ["List of certifications"]
-        }}
+        }
         
         CRITICAL: For Education, separate "level" (e.g. B.Sc) and "field" (e.g. Engineering).
         RETURN ONLY VALID JSON.
-        """
+        """)
 
-        extracted_info = self._query_llm(extraction_prompt)
+        extracted_info = await self._aquery_llm(prompt.build())
         parsed_data = self._parse_json_safely(extracted_info)
 
-        return {
+        result = {
             "raw_text": raw_text,
+            "raw_text_complete": text_complete,
+            "source_file": resume.file_path,
+            "content_hash": content_hash,
+            "cache_hit": False,
             "structured_data": parsed_data,
             "extraction_status": "completed" if "error" not in parsed_data else "partial"
         }
 
+        # Only clean extractions are worth reusing
+        if content_hash and result["extraction_status"] == "completed":
+            self.db.cache_extraction(content_hash, result)
+
+        return result
+
+    async def full_text(self, extraction_results: Dict[str, Any]) -> str:
+        """
+        Full resume text for callers that need more than the prompt budget.
+        Parses the remaining pages on first request, updating the result (and
+        the cached extraction) in place; falls back to the prefix on failure.
+        """
+        raw_text = extraction_results.get("raw_text", "")
+        source_file = extraction_results.get("source_file")
+        if extraction_results.get("raw_text_complete", True) or not source_file:
+            return raw_text
+        try:
+            raw_text = await extract_pdf_text(source_file)
+        except ExtractionError as e:
+            print(f"Extractor: Keeping the first pages only: {e}")
+            return raw_text
+
+        extraction_results.update({"raw_text": raw_text, "raw_text_complete": True})
+        content_hash = extraction_results.get("content_hash")
+        if content_hash and extraction_results.get("extraction_status") == "completed":
+            self.db.cache_extraction(content_hash, extraction_results)
+        return raw_text
+
+
 
 
 # import json
@@ -0,0 +1,295 @@
+"""
+Background ingestion for the recruiter dashboard.
+
+Uploads and folder syncs are recorded as jobs in SQLite (ingestion_jobs and
+ingestion_files) and drained by a fixed pool of async workers, so the HTTP
+request only has to return a job ID. Progress (every workflow stage of every
+file, then its stored result) is published to subscribers, which main.py
+streams as Server-Sent Events. Jobs left unfinished by a restart are queued
+again when the workers start.
+"""
+import asyncio
+import logging
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from config import Config
+from db.database import JobDatabase
+from .orchestrator import OrchestratorAgent
+from .pipeline import stage_listener
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_SECONDS = 15.0
+
+
+def candidate_summary(result: dict, filename: str, fallback_name: str) -> dict:
+    """Build the candidates-table row from an orchestrator result"""
+    # Robust Name Extraction
+    extraction_results = result.get("extraction_results", {})
+    structured_data = extraction_results.get("structured_data", {})
+    personal = structured_data.get("Personal Info") or structured_data.get("personal_info") or {}
+
+    if isinstance(personal, list) and len(personal) > 0: personal = personal[0]
+
+    candidate_name = (
+        personal.get("Name") or
+        personal.get("name") or
+        personal.get("Full Name") or
+        personal.get("full_name") or
+        fallback_name
+    )
+
+    return {
+        "filename": filename,
+        "name": str(candidate_name),
+        "email": personal.get("Email") or personal.get("email"),
+        "phone": personal.get("Phone") or personal.get("phone"),
+        "score": result.get("screening_results", {}).get("screening_score", 0),
+        "recommendation": result.get("final_recommendation", {}).get("recommendation", "N/A"),
+        "full_report": result,
+        "status": "Analyzed",
+        "content_hash": extraction_results.get("content_hash"),
+        "cache_hit": extraction_results.get("cache_hit", False)
+    }
+
+
+async def process_and_store(orchestrator: OrchestratorAgent, db: JobDatabase, file_path: Path, filename: str, fallback_name: str, content_hash: Optional[str] = None) -> dict:
+    """Run one resume through the pipeline and persist it as soon as it finishes"""
+    try:
+        resume_data = {
+            "file_path": str(file_path),
+            "filename": filename
+        }
+        if content_hash:
+            resume_data["content_hash"] = content_hash
+        # The workflow's resume_text stage completes the text the report keeps
+        result = await orchestrator.process_application(resume_data)
+
+        summary = candidate_summary(result, filename, fallback_name)
+        summary["id"] = db.add_candidate(summary)
+
+        logger.info(f"Result for {filename}: Name={summary['name']}, Score={summary['score']}")
+        return summary
+
+    except Exception as e:
+        logger.error(f"Processing failed for {filename}: {e}")
+        return {"filename": filename, "status": "Failed", "error": str(e)}
+
+
+def job_progress(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Counts for a job row as returned by JobDatabase.get_ingestion_job"""
+    states = [f["status"] for f in job["files"]]
+    return {
+        "job_id": job["id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "total": job["total_files"],
+        "processed": states.count("done"),
+        "failed": states.count("failed"),
+        "pending": sum(1 for state in states if state in ("queued", "processing")),
+        "created_at": job["created_at"],
+        "finished_at": job["finished_at"],
+    }
+
+
+def _failed_result(file: Dict[str, Any]) -> Dict[str, Any]:
+    return {"filename": file["filename"], "status": "Failed", "error": file.get("error")}
+
+
+class IngestionQueue:
+    """
+    Durable work queue for resume ingestion. Files from every job share one
+    pool of `concurrency` workers, so a large batch cannot starve the event
+    loop or the LLM providers. API keys are kept in memory only; a job resumed
+    after a restart runs with its provider's configured key.
+    """
+
+    def __init__(self, concurrency: int = None):
+        self.concurrency = max(1, concurrency or Config.BATCH_CONCURRENCY)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._remaining: Dict[str, int] = {}
+        self._orchestrators: Dict[str, OrchestratorAgent] = {}
+        self._api_keys: Dict[str, Optional[str]] = {}
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    def start(self):
+        """Start the workers on the running loop and requeue unfinished jobs (idempotent)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._workers:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._remaining.clear()
+        self._orchestrators.clear()
+        self._workers = [loop.create_task(self._work()) for _ in range(self.concurrency)]
+
+        for job in JobDatabase().get_unfinished_ingestion_jobs():
+            if job["files"]:
+                logger.info(f"Resuming ingestion job {job['id']} ({len(job['files'])} files left)")
+            self._enqueue(job["id"], job["provider"], job["files"])
+
+    async def stop(self):
+        """Cancel the workers; files they were processing are requeued on the next start"""
+        workers, self._workers = self._workers, []
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    def submit(self, kind: str, files: List[Dict[str, Any]], provider: str, api_key: str = None) -> str:
+        """
+        Queue files for ingestion and return the job ID. Each file is
+        {"filename", "file_path", "content_hash"?, "remove_after"?}.
+        """
+        self.start()
+        job_id = uuid.uuid4().hex
+        db = JobDatabase()
+        db.create_ingestion_job(job_id, kind, provider, files)
+        self._api_keys[job_id] = api_key
+        # Re-read so the queued files carry their row ids
+        self._enqueue(job_id, provider, db.get_ingestion_job(job_id)["files"])
+        logger.info(f"Queued ingestion job {job_id}: {len(files)} files ({kind})")
+        return job_id
+
+    def _enqueue(self, job_id: str, provider: str, files: List[Dict[str, Any]]):
+        if not files:
+            self._finish(job_id)
+            return
+        self._remaining[job_id] = len(files)
+        self._orchestrators[job_id] = OrchestratorAgent(provider=provider, api_key=self._api_keys.get(job_id))
+        for file in files:
+            self._queue.put_nowait((job_id, file))
+
+    async def _work(self):
+        while True:
+            job_id, file = await self._queue.get()
+            try:
+                await self._process_file(job_id, file)
+            except Exception as e:
+                logger.error(f"Ingestion of {file['filename']} failed: {e}")
+                JobDatabase().update_ingestion_file(file["id"], status="failed", stage=None, error=str(e))
+                self._publish(job_id, "result", {
+                    "file_id": file["id"], "filename": file["filename"],
+                    "result": {"filename": file["filename"], "status": "Failed", "error": str(e)},
+                })
+            self._remaining[job_id] -= 1
+            if self._remaining[job_id] == 0:
+                self._finish(job_id)
+
+    async def _process_file(self, job_id: str, file: Dict[str, Any]):
+        db = JobDatabase()
+        file_id, filename = file["id"], file["filename"]
+        path = Path(file["file_path"])
+
+        db.set_ingestion_job_status(job_id, "running")
+        db.update_ingestion_file(file_id, status="processing")
+        self._publish(job_id, "file", {"file_id": file_id, "filename": filename, "status": "processing", "stage": None})
+
+        def on_stage(stage: str, state: str):
+            if state == "started":
+                db.update_ingestion_file(file_id, stage=stage)
+            self._publish(job_id, "stage", {"file_id": file_id, "filename": filename, "stage": stage, "state": state})
+
+        if not path.exists():
+            summary = {"filename": filename, "status": "Failed", "error": "File no longer exists"}
+        else:
+            token = stage_listener.set(on_stage)
+            try:
+                summary = await process_and_store(
+                    self._orchestrators[job_id], db, path, filename, Path(filename).stem, file.get("content_hash")
+                )
+            finally:
+                stage_listener.reset(token)
+
+        if file["remove_after"] and path.exists():
+            os.remove(path)
+
+        if summary.get("status") == "Failed":
+            db.update_ingestion_file(file_id, status="failed", stage=None, error=summary.get("error"))
+        else:
+            db.update_ingestion_file(file_id, status="done", stage=None, candidate_id=summary["id"])
+            # Clients fetch the report on demand from /api/recruiter/candidates/{id}
+            summary = {key: value for key, value in summary.items() if key != "full_report"}
+        self._publish(job_id, "result", {"file_id": file_id, "filename": filename, "result": summary})
+
+    def _finish(self, job_id: str):
+        db = JobDatabase()
+        db.set_ingestion_job_status(job_id, "completed")
+        for state in (self._remaining, self._orchestrators, self._api_keys):
+            state.pop(job_id, None)
+        progress = job_progress(db.get_ingestion_job(job_id))
+        logger.info(f"Ingestion job {job_id} completed: {progress['processed']} processed, {progress['failed']} failed")
+        self._publish(job_id, "done", progress)
+
+    def _publish(self, job_id: str, event: str, data: Dict[str, Any]):
+        for subscriber in self._subscribers.get(job_id, ()):
+            subscriber.put_nowait((event, data))
+
+    async def events(self, job_id: str) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Yield (event, data) for a job: its current state first (progress, then
+        a "result" or "file" event per file), then live "file" / "stage" /
+        "result" events until "done". Emits "ping" while idle.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        try:
+            db = JobDatabase()
+            job = db.get_ingestion_job(job_id)
+            if job is None:
+                yield "error", {"job_id": job_id, "message": f"Ingestion job {job_id} not found"}
+                return
+
+            yield "job", job_progress(job)
+            done_ids = [f["candidate_id"] for f in job["files"] if f["status"] == "done"]
+            candidates = {c["id"]: c for c in db.get_candidates_by_ids(done_ids)}
+            replayed = set()
+            for file in job["files"]:
+                if file["status"] in ("done", "failed"):
+                    result = candidates.get(file["candidate_id"]) if file["status"] == "done" else _failed_result(file)
+                    if result is not None:
+                        replayed.add(file["id"])
+                        yield "result", {"file_id": file["id"], "filename": file["filename"], "result": result}
+                        continue
+                yield "file", {"file_id": file["id"], "filename": file["filename"], "status": file["status"], "stage": file["stage"]}
+
+            if job["status"] == "completed":
+                yield "done", job_progress(job)
+                return
+
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield "ping", {}
+                    continue
+                # Results published between subscribing and reading the job were replayed above
+                if event == "result" and data["file_id"] in replayed:
+                    continue
+                yield event, data
+                if event == "done":
+                    return
+        finally:
+            subscribers = self._subscribers.get(job_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[job_id]
+
+
+_ingestion_queue: Optional[IngestionQueue] = None
+_ingestion_lock = threading.Lock()
+
+
+def get_ingestion_queue() -> IngestionQueue:
+    """Process-wide ingestion queue"""
+    global _ingestion_queue
+    with _ingestion_lock:
+        if _ingestion_queue is None:
+            _ingestion_queue = IngestionQueue()
+        return _ingestion_queue
@@ -0,0 +1,305 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from db.database import JobDatabase
+
+# Same thresholds as the per-job loop in MatcherAgent._score_jobs
+MATCH_THRESHOLD = 30
+NO_REQUIREMENTS_SCORE = 75
+
+
+def match_scores(overlap: np.ndarray, required: np.ndarray) -> np.ndarray:
+    """int(overlap / required * 100) elementwise, or 75 where nothing is required"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = (overlap / required * 100).astype(np.int32)
+    scores[required == 0] = NO_REQUIREMENTS_SCORE
+    return scores
+
+
+def _top_positions(positions: np.ndarray, scores: np.ndarray, stop: int) -> Tuple[np.ndarray, np.ndarray]:
+    """First `stop` (position, score) pairs by score desc, then position asc"""
+    if len(positions) > stop:
+        # Order by score, then by position, in one integer key
+        span = int(positions.max()) + 1
+        keys = scores.astype(np.int64) * (span + 1) + (span - positions)
+        best = np.argpartition(-keys, stop - 1)[:stop]
+        positions, scores = positions[best], scores[best]
+    order = np.lexsort((positions, -scores))
+    return positions[order], scores[order]
+
+
+class SkillIndex:
+    """
+    Rows x skills incidence matrix over a skill vocabulary, kept in CSR form
+    (per-row skills) and CSC form (per-skill postings). Overlap with a query
+    skill set is a sparse vector-matrix product: only the postings of the
+    query's own skills are touched, instead of one Python set intersection
+    per row. Each row also carries an experience level.
+    """
+
+    def __init__(self, row_ids: np.ndarray, level_codes: np.ndarray, levels: Dict[str, int],
+                 indptr: np.ndarray, indices: np.ndarray, vocabulary: Dict[str, int],
+                 postings: np.ndarray = None, skill_ptr: np.ndarray = None):
+        self.row_ids = row_ids
+        self.level_codes = level_codes
+        self.levels = levels
+        self.indptr = indptr
+        self.indices = indices
+        self.vocabulary = vocabulary
+        # Vocabulary ids are assigned in insertion order
+        self.skill_names = list(vocabulary)
+
+        self.skill_counts = np.diff(indptr).astype(np.int32)
+
+        if postings is None:
+            # CSC view: for each skill, the (ascending) row positions having it
+            row_of_entry = np.repeat(np.arange(len(row_ids), dtype=np.int32), self.skill_counts)
+            order = np.argsort(indices, kind="stable")
+            postings = row_of_entry[order]
+            skill_ptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(indices, minlength=len(vocabulary)), out=skill_ptr[1:])
+        self.postings = postings
+        self.skill_ptr = skill_ptr
+
+    @staticmethod
+    def _encode(rows: Iterable[Tuple[int, str, Iterable[str]]], vocabulary: Dict[str, int],
+                levels: Dict[str, int], start: int = 0):
+        """
+        CSR lists for (row_id, experience_level, skills) tuples, adding new
+        skills and levels to the given maps. indptr starts at `start`.
+        """
+        normalize = JobDatabase.normalize_skill
+        row_ids, level_codes, indptr, indices = [], [], [start], []
+        for row_id, level, row_skills in rows:
+            skills = {normalize(skill) for skill in row_skills if isinstance(skill, str)}
+            skills.discard("")
+            for skill in skills:
+                indices.append(vocabulary.setdefault(skill, len(vocabulary)))
+            indptr.append(start + len(indices))
+            row_ids.append(row_id)
+            level_codes.append(levels.setdefault(level, len(levels)))
+        return (
+            np.asarray(row_ids, dtype=np.int64),
+            np.asarray(level_codes, dtype=np.int16),
+            np.asarray(indptr, dtype=np.int64),
+            np.asarray(indices, dtype=np.int32),
+        )
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[int, str, Iterable[str]]]):
+        """Build from (row_id, experience_level, skills) tuples"""
+        vocabulary: Dict[str, int] = {}
+        levels: Dict[str, int] = {}
+        row_ids, level_codes, indptr, indices = cls._encode(rows, vocabulary, levels)
+        return cls(row_ids, level_codes, levels, indptr, indices, vocabulary)
+
+    def appended(self, rows: Iterable[Tuple[int, str, Iterable[str]]]):
+        """
+        A new index with `rows` (ids above every indexed id) after the existing
+        ones. New rows take the last positions, so each skill's postings only
+        gain a tail; nothing already indexed is re-read or re-sorted. This
+        index is left as it was for readers still holding it.
+        """
+        vocabulary, levels = dict(self.vocabulary), dict(self.levels)
+        row_ids, level_codes, indptr, indices = self._encode(rows, vocabulary, levels, start=len(self.indices))
+        if not len(row_ids):
+            return self
+
+        positions = np.repeat(np.arange(len(self), len(self) + len(row_ids), dtype=np.int32), np.diff(indptr))
+        order = np.argsort(indices, kind="stable")
+        # Old skill pointers, with empty postings for skills first seen now
+        old_ptr = np.concatenate([self.skill_ptr, np.full(len(vocabulary) - len(self.vocabulary), self.skill_ptr[-1])])
+        # Each new entry goes at the end of its skill's existing postings
+        postings = np.insert(self.postings, old_ptr[indices[order] + 1], positions[order])
+        skill_ptr = old_ptr.copy()
+        skill_ptr[1:] += np.cumsum(np.bincount(indices, minlength=len(vocabulary)))
+
+        return type(self)(
+            np.concatenate([self.row_ids, row_ids]),
+            np.concatenate([self.level_codes, level_codes]),
+            levels,
+            np.concatenate([self.indptr, indptr[1:]]),
+            np.concatenate([self.indices, indices]),
+            vocabulary,
+            postings,
+            skill_ptr,
+        )
+
+    @property
+    def last_row_id(self) -> int:
+        return int(self.row_ids[-1]) if len(self.row_ids) else 0
+
+    def __len__(self) -> int:
+        return len(self.row_ids)
+
+    def skill_ids(self, skills: Iterable[str]) -> np.ndarray:
+        """Vocabulary ids of the given skills; unknown skills simply don't count"""
+        normalize = JobDatabase.normalize_skill
+        ids = {
+            self.vocabulary.get(normalize(skill))
+            for skill in skills if isinstance(skill, str)
+        }
+        ids.discard(None)
+        return np.fromiter(ids, dtype=np.int64, count=len(ids))
+
+    def overlap(self, skill_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Sparse row of (query vector x matrix): returns the positions of rows
+        sharing at least one skill (ascending) and the shared-skill counts.
+        """
+        if not len(skill_ids):
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32)
+        hits = np.concatenate([
+            self.postings[self.skill_ptr[skill]:self.skill_ptr[skill + 1]] for skill in skill_ids
+        ])
+        positions, counts = np.unique(hits, return_counts=True)
+        return positions, counts.astype(np.int32)
+
+    def _eligible(self, skills: List[str], level: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Rows at `level` that share a skill with the query, with overlap counts.
+        With no query skills every row at the level is eligible.
+        """
+        level_code = self.levels.get(level, -1)
+        if skills:
+            eligible, overlap = self.overlap(self.skill_ids(skills))
+            at_level = self.level_codes[eligible] == level_code
+            return eligible[at_level], overlap[at_level]
+        eligible = np.flatnonzero(self.level_codes == level_code)
+        return eligible, np.zeros(len(eligible), dtype=np.int32)
+
+
+def _valid_skills(skills: Iterable[str]) -> List[str]:
+    normalize = JobDatabase.normalize_skill
+    return [skill for skill in skills if isinstance(skill, str) and normalize(skill)]
+
+
+class JobSkillIndex(SkillIndex):
+    """
+    Jobs x skills index. Scores follow MatcherAgent: int(overlap / required * 100),
+    or 75 for jobs without requirements.
+    """
+
+    @classmethod
+    def from_jobs(cls, jobs: Iterable[Tuple[int, str, Iterable[str]]]) -> "JobSkillIndex":
+        """Build from (job_id, experience_level, requirements) rows"""
+        return cls.from_rows(jobs)
+
+    def top_k_many(self, skill_lists: Sequence[Iterable[str]], experience_levels: Sequence[str],
+                   k: int = 3, threshold: int = MATCH_THRESHOLD) -> List[Dict[str, np.ndarray]]:
+        """
+        Score several candidates, one sparse overlap lookup each. For each,
+        returns the top-k job ids and scores (ties broken by lowest job id)
+        plus the number of jobs clearing the threshold and the first eligible
+        job id.
+
+        A job is eligible when it is at the candidate's experience level and,
+        if the candidate listed skills, shares at least one of them.
+        """
+        results = []
+        for skills, level in zip(skill_lists, experience_levels):
+            # Only jobs sharing a skill can score, so work on that sparse set
+            eligible, overlap = self._eligible(_valid_skills(skills), level)
+            scores = match_scores(overlap, self.skill_counts[eligible])
+            keep = scores >= threshold
+            top, top_scores = _top_positions(eligible[keep], scores[keep], k)
+
+            results.append({
+                "job_ids": self.row_ids[top],
+                "scores": top_scores,
+                "number_of_matches": int(np.count_nonzero(keep)),
+                "first_eligible_id": int(self.row_ids[eligible[0]]) if len(eligible) else None,
+            })
+        return results
+
+    def top_k(self, skills: Iterable[str], experience_level: str, k: int = 3,
+              threshold: int = MATCH_THRESHOLD) -> Dict[str, np.ndarray]:
+        return self.top_k_many([skills], [experience_level], k=k, threshold=threshold)[0]
+
+
+class CandidateSkillIndex(SkillIndex):
+    """
+    Candidates x skills index for reverse matching: ranks stored candidates
+    against one job with the same score MatcherAgent would give that pair.
+    """
+
+    @classmethod
+    def from_candidates(cls, candidates: Iterable[Tuple[int, str, Iterable[str]]]) -> "CandidateSkillIndex":
+        """Build from (candidate_id, experience_level, technical_skills) rows"""
+        return cls.from_rows(candidates)
+
+    def rank_for_job(self, requirements: Iterable[str], experience_level: str,
+                     offset: int = 0, limit: int = 50,
+                     threshold: int = MATCH_THRESHOLD) -> Dict[str, object]:
+        """
+        Candidates whose match score for the job clears the threshold, best
+        first (ties by lowest candidate id). Returns the requested page of
+        candidate ids, scores and matched skills plus the total number of matches.
+        """
+        normalize = JobDatabase.normalize_skill
+        required = {normalize(skill) for skill in _valid_skills(requirements)}
+
+        # Candidates must share a requirement unless the job lists none
+        eligible, overlap = self._eligible(sorted(required), experience_level)
+        scores = match_scores(overlap, np.full(len(eligible), len(required), dtype=np.int32))
+        keep = scores >= threshold
+        top, top_scores = _top_positions(eligible[keep], scores[keep], offset + limit)
+        page, page_scores = top[offset:offset + limit], top_scores[offset:offset + limit]
+
+        required_ids = {self.vocabulary[skill] for skill in required if skill in self.vocabulary}
+        matched_skills = [
+            sorted(
+                self.skill_names[skill]
+                for skill in self.indices[self.indptr[position]:self.indptr[position + 1]]
+                if skill in required_ids
+            )
+            for position in page
+        ]
+
+        return {
+            "candidate_ids": self.row_ids[page].tolist(),
+            "scores": page_scores.tolist(),
+            "matched_skills": matched_skills,
+            "total": int(np.count_nonzero(keep)),
+        }
+
+
+_index: Optional[JobSkillIndex] = None
+_index_signature = None
+_candidate_index: Optional[CandidateSkillIndex] = None
+_candidate_index_signature = None
+_index_lock = threading.Lock()
+
+
+def get_job_index(db: JobDatabase) -> JobSkillIndex:
+    """Process-wide index over the jobs table, rebuilt when jobs are added or removed"""
+    global _index, _index_signature
+    signature = db.get_jobs_signature()
+    with _index_lock:
+        if _index is None or signature != _index_signature:
+            _index = JobSkillIndex.from_jobs(db.iter_job_skills())
+            _index_signature = signature
+        return _index
+
+
+def get_candidate_index(db: JobDatabase) -> CandidateSkillIndex:
+    """
+    Process-wide index over stored candidates' analyzed skills. Candidates
+    added since the last lookup are appended (reading only their rows); the
+    index is rebuilt only when existing candidates changed or were removed.
+    """
+    global _candidate_index, _candidate_index_signature
+    signature = db.get_candidates_signature()
+    with _index_lock:
+        index, previous = _candidate_index, _candidate_index_signature
+        if index is not None and signature == previous:
+            return index
+        # Signature is (database, any change, rewrites); appends leave the last one alone
+        if index is not None and signature[0] == previous[0] and signature[2] == previous[2]:
+            index = index.appended(db.iter_candidate_skills(after_id=index.last_row_id))
+        else:
+            index = CandidateSkillIndex.from_candidates(db.iter_candidate_skills())
+        _candidate_index, _candidate_index_signature = index, signature
+        return index
@@ -0,0 +1,97 @@
+"""
+Pulling JSON out of LLM responses.
+
+Even in JSON mode some models wrap the object in markdown fences or prose.
+JSONObjectScanner finds complete top-level objects and arrays in a single
+left-to-right pass: it tracks bracket nesting and string/escape state only,
+so it never backtracks (the regex it replaces could scan a long reply many
+times over) and it can be fed a streamed response chunk by chunk. Each
+balanced candidate is checked with json.loads; one that does not decode (say
+"{name}" in prose) or is not an object (say a "[1, 2]" aside) is skipped and
+scanning carries on after it.
+"""
+import json
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class JSONObjectScanner:
+    """Incremental scanner for balanced top-level JSON objects and arrays"""
+
+    __slots__ = ("_buffer", "_stack", "_in_string", "_escaped")
+
+    def __init__(self):
+        self._buffer: List[str] = []  # earlier chunks of the open candidate
+        self._stack: List[str] = []  # closing brackets still expected
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> Iterator[str]:
+        """Yield the text of every candidate completed by this chunk"""
+        stack = self._stack
+        segment_start = 0
+        for index, char in enumerate(chunk):
+            if not stack:
+                if char in _CLOSERS:
+                    stack.append(_CLOSERS[char])
+                    segment_start = index
+                continue
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in _CLOSERS:
+                stack.append(_CLOSERS[char])
+            elif char in "}]":
+                if char != stack.pop():
+                    # Mismatched bracket: not JSON, look for the next opener
+                    stack.clear()
+                    self._buffer = []
+                elif not stack:
+                    self._buffer.append(chunk[segment_start:index + 1])
+                    candidate = "".join(self._buffer)
+                    self._buffer = []
+                    yield candidate
+        if stack:
+            # The open candidate continues in the next chunk
+            self._buffer.append(chunk[segment_start:])
+
+    @property
+    def pending(self) -> bool:
+        """True while an opened candidate has not been closed (e.g. truncated output)"""
+        return bool(self._stack)
+
+
+def first_json_object(text: str) -> Tuple[Optional[Dict[str, Any]], str]:
+    """
+    (object, outcome) for the first JSON object in `text`. Outcome is
+    "direct" (the whole text is one), "extracted" (found inside other text),
+    "truncated" (a candidate was opened but never closed) or "no_json".
+    """
+    stripped = text.strip()
+    if stripped[:1] == "{":
+        try:
+            value = json.loads(stripped)
+        except json.JSONDecodeError:
+            pass
+        else:
+            if isinstance(value, dict):
+                return value, "direct"
+
+    scanner = JSONObjectScanner()
+    for candidate in scanner.feed(text):
+        if candidate[0] != "{":
+            continue
+        try:
+            value = json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(value, dict):
+            return value, "extracted"
+    return None, "truncated" if scanner.pending else "no_json"
@@ -0,0 +1,191 @@
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class LLMCache:
+    """
+    Content-addressed cache for LLM responses.
+
+    Two tiers: a bounded in-memory LRU in front of a SQLite table stored next
+    to db/jobs.sqlite. Entries carry an absolute expiry so each agent can pick
+    its own TTL; expired rows are swept every Config.LLM_CACHE_PURGE_INTERVAL.
+    """
+
+    def __init__(self, db_path: Path, max_entries: int = 1024):
+        self.db_path = Path(db_path)
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # One connection per thread (the event loop's worker threads included)
+        self._local = threading.local()
+        self._next_purge = 0.0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.purged = 0
+        self._init_db()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Long-lived connection for the calling thread, in WAL mode like db/jobs.sqlite"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=Config.SQLITE_BUSY_TIMEOUT)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        with self._get_connection() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+                """
+            )
+        self._purge_expired()
+
+    def _purge_expired(self):
+        """Delete expired rows (at most once per purge interval)"""
+        now = time.time()
+        with self._lock:
+            if now < self._next_purge:
+                return
+            self._next_purge = now + Config.LLM_CACHE_PURGE_INTERVAL
+        with self._get_connection() as conn:
+            deleted = conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,)).rowcount
+        with self._lock:
+            self.purged += deleted
+
+    @staticmethod
+    def make_key(provider: str, model: str, temperature: float, instructions: str, prompt: str, response_format: Any = None) -> str:
+        """Hash everything that influences the completion"""
+        payload = json.dumps([provider, model, temperature, instructions, prompt, response_format])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        response = self._memory_get(key)
+        if response is not None:
+            return response
+        return self._disk_get(key)
+
+    def set(self, key: str, response: str, ttl: int):
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._remember(key, expires_at, response)
+        self._disk_set(key, response, expires_at)
+
+    async def aget(self, key: str) -> Optional[str]:
+        """get() for the event loop: the memory tier inline, SQLite in a worker thread"""
+        response = self._memory_get(key)
+        if response is not None:
+            return response
+        return await asyncio.to_thread(self._disk_get, key)
+
+    async def aset(self, key: str, response: str, ttl: int):
+        """set() for the event loop: the SQLite write and commit run in a worker thread"""
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._remember(key, expires_at, response)
+        await asyncio.to_thread(self._disk_set, key, response, expires_at)
+
+    def _memory_get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, response = entry
+                if expires_at > time.time():
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return response
+                del self._memory[key]
+        return None
+
+    def _disk_get(self, key: str) -> Optional[str]:
+        try:
+            with self._get_connection() as conn:
+                row = conn.execute(
+                    "SELECT response, expires_at FROM llm_cache WHERE key = ? AND expires_at > ?",
+                    (key, time.time()),
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache read failed: {e}")
+            row = None
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._remember(key, row[1], row[0])
+        return row[0]
+
+    def _disk_set(self, key: str, response: str, expires_at: float):
+        try:
+            with self._get_connection() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, response, expires_at) VALUES (?, ?, ?)",
+                    (key, response, expires_at),
+                )
+            self._purge_expired()
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache write failed: {e}")
+
+    def _remember(self, key: str, expires_at: float, response: str):
+        """Insert into the memory tier, evicting least recently used entries (lock held)"""
+        self._memory[key] = (expires_at, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self.hits = self.disk_hits = self.misses = self.purged = 0
+        with self._get_connection() as conn:
+            conn.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "purged": self.purged,
+            }
+
+
+_cache: Optional[LLMCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Process-wide cache instance, or None when caching is disabled"""
+    global _cache
+    if not Config.LLM_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            db_path = Path(__file__).parent.parent / "db" / Config.LLM_CACHE_DB
+            _cache = LLMCache(db_path, max_entries=Config.LLM_CACHE_MAX_ENTRIES)
+        return _cache
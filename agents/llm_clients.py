@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Dict, Tuple
+
+import httpx
+from openai import OpenAI, AsyncOpenAI
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+ClientKey = Tuple[str, str, str]
+
+_lock = threading.Lock()
+_sync_clients: Dict[ClientKey, OpenAI] = {}
+# Async connection pools are bound to the event loop that opened them,
+# so they are kept per loop and dropped together with it.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[ClientKey, AsyncOpenAI]]" = weakref.WeakKeyDictionary()
+_in_flight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+
+
+def _http2_enabled() -> bool:
+    """HTTP/2 needs the optional 'h2' package; fall back to HTTP/1.1 without it."""
+    if not Config.LLM_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=Config.LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=Config.LLM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=Config.LLM_KEEPALIVE_EXPIRY,
+    )
+
+
+def get_client(provider: str, base_url: str, api_key: str) -> OpenAI:
+    """Return the shared synchronous client for (provider, base_url, api_key)."""
+    key = (provider, base_url, api_key)
+    with _lock:
+        client = _sync_clients.get(key)
+        if client is None:
+            logger.info(f"Opening pooled LLM client for {provider} ({base_url})")
+            client = OpenAI(
+                base_url=base_url,
+                api_key=api_key,
+                http_client=httpx.Client(
+                    limits=_limits(),
+                    http2=_http2_enabled(),
+                    timeout=Config.LLM_TIMEOUT,
+                ),
+            )
+            _sync_clients[key] = client
+        return client
+
+
+def get_async_client(provider: str, base_url: str, api_key: str) -> AsyncOpenAI:
+    """
+    Return the shared async client for (provider, base_url, api_key) on the
+    running event loop. Must be called from inside a coroutine.
+    """
+    loop = asyncio.get_running_loop()
+    key = (provider, base_url, api_key)
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            client = AsyncOpenAI(
+                base_url=base_url,
+                api_key=api_key,
+                http_client=httpx.AsyncClient(
+                    limits=_limits(),
+                    http2=_http2_enabled(),
+                    timeout=Config.LLM_TIMEOUT,
+                ),
+            )
+            clients[key] = client
+        return client
+
+
+def get_in_flight_limiter(provider: str) -> asyncio.Semaphore:
+    """
+    Semaphore capping concurrent requests to one provider on the running loop,
+    so bulk jobs cannot flood a local Ollama or trip cloud rate limits.
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        limiters = _in_flight.setdefault(loop, {})
+        limiter = limiters.get(provider)
+        if limiter is None:
+            limit = Config.LLM_MAX_IN_FLIGHT.get(provider, Config.LLM_MAX_IN_FLIGHT_DEFAULT)
+            limiter = limiters[provider] = asyncio.Semaphore(limit)
+        return limiter
+
+
+async def aclose_clients():
+    """Close every pooled client (call on application shutdown)."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        async_clients = list(_async_clients.pop(loop, {}).values())
+        sync_clients = list(_sync_clients.values())
+        _sync_clients.clear()
+
+    for client in async_clients:
+        await client.close()
+    for client in sync_clients:
+        client.close()
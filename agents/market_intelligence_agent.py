@@ -1,6 +1,7 @@
 from typing import Dict, Any, List
 from .base_agent import BaseAgent
-from duckduckgo_search import DDGS
+from .prompt_builder import PromptBuilder
+from tools.search_providers import SearchProvider, get_search_provider
 import json
 import logging
 from datetime import datetime
@@ -8,7 +9,32 @@ from datetime import datetime
 logger = logging.getLogger(__name__)
 
 class MarketIntelligenceAgent(BaseAgent):
-    def __init__(self, provider: str = None, api_key: str = None):
+    # Market snapshots go stale quickly
+    cache_ttl = 3600
+
+    response_schema = {
+        "type": "object",
+        "properties": {
+            "market_jobs": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "title": {"type": "string"},
+                        "company": {"type": "string"},
+                        "location": {"type": "string"},
+                        "salary_range": {"type": "string"},
+                        "requirements": {"type": "array", "items": {"type": "string"}},
+                        "description": {"type": "string"},
+                    },
+                    "required": ["title", "company", "requirements"],
+                },
+            },
+        },
+        "required": ["market_jobs"],
+    }
+
+    def __init__(self, provider: str = None, api_key: str = None, search_provider: SearchProvider = None):
         super().__init__(
             name="MarketIntelligence",
             instructions="""You are a Market Intelligence Expert. 
@@ -35,6 +61,7 @@ class MarketIntelligenceAgent(BaseAgent):
             provider=provider,
             api_key=api_key
         )
+        self.search_provider = search_provider or get_search_provider()
 
     async def run(self, messages: list) -> Dict[str, Any]:
         """
@@ -57,38 +84,36 @@ class MarketIntelligenceAgent(BaseAgent):
         skills = data.get("skills", [])
         
         # 1. Fetch real-world market signals
-        market_signals = self._fetch_search_results(f"{role} hiring trends skills {datetime.now().year} {datetime.now().year+1}")
+        market_signals = await self._fetch_search_results(f"{role} hiring trends skills {datetime.now().year} {datetime.now().year+1}")
         
         # 2. Synthesize into fake-but-realistic jobs
-        context_str = json.dumps(market_signals[:3])
-        
+        prompt = PromptBuilder(self.name)
         if market_signals and market_signals[0]["title"] == "General Market":
              # Fallback Prompt for Offline Mode
              print("⚠️ Search failed/offline. Generating simulated market data based on general knowledge.")
-             prompt = f"""
+             prompt.text(f"""
              You are a Market Intelligence Expert. The live search is unavailable.
              Generate 3 REALISTIC, 'Live' job listings for a '{role}' role based on your general knowledge of the current tech market.
              
              Skills to include: {', '.join(skills)}
              
              Return ONLY a JSON object with this key: "market_jobs": [job1, job2, job3]
-             """
+             """)
         else:
              # Standard Prompt with Search Context
-             prompt = f"""
+             prompt.text(f"""
              Role: {role}
              Top Skills: {', '.join(skills)}
-             
-             Real-world Market Signals (Search Results):
-             {context_str} 
-             
+             """)
+             prompt.data("Real-world Market Signals (Search Results):", market_signals[:3], priority=1)
+             prompt.text("""
              Based on these signals, generate 3 highly relevant 'Live' job listings that a candidate with these skills might see today.
              Make them look distinct from generic simulated data. Use specific, modern terminology found in the signals.
              
              Return ONLY a JSON object with this key: "market_jobs": [job1, job2, job3]
-             """
+             """)
         
-        response = self._query_llm(prompt)
+        response = await self._aquery_llm(prompt.build())
         parsed = self._parse_json_safely(response)
         
         # Fallback if parsing fails or returns empty
@@ -98,18 +123,13 @@ class MarketIntelligenceAgent(BaseAgent):
             
         return parsed
 
-    def _fetch_search_results(self, query: str) -> List[Dict[str, str]]:
-        """Fetch snippets from DuckDuckGo"""
+    async def _fetch_search_results(self, query: str) -> List[Dict[str, str]]:
+        """Fetch snippets from the configured search provider"""
         try:
-            results = []
-            # Suppress/handle the specific warning if needed, but let's try direct usage
-            from duckduckgo_search import DDGS
-            with DDGS() as ddgs:
-                # Use simplified search
-                search_results = ddgs.text(query, max_results=5)
-                for r in search_results:
-                    results.append({"title": r.get('title', ''), "snippet": r.get('body', '')})
-            return results
+            results = await self.search_provider.search(query, max_results=5)
+            if results:
+                return results
+            logger.warning(f"Search returned no results ({self.search_provider.name})")
         except Exception as e:
-            logger.error(f"Search failed: {e}")
-            return [{"title": "General Market", "snippet": "High demand for AI and Cloud skills in 2024."}]
+            logger.error(f"Search failed ({self.search_provider.name}): {e!r}")
+        return [{"title": "General Market", "snippet": "High demand for AI and Cloud skills in 2024."}]
@@ -0,0 +1,193 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config import Config
+from db.database import JobDatabase
+from .tracing import detach_trace
+
+logger = logging.getLogger(__name__)
+
+
+def snapshot_key(role: str, skills: List[str]) -> str:
+    """
+    Key for a market snapshot: normalized role plus the sorted canonical IDs
+    of the candidate's leading skills, so near-identical profiles share one.
+    """
+    canonical = []
+    for skill in skills:
+        if not isinstance(skill, str):
+            continue
+        skill_id = JobDatabase.normalize_skill(skill)
+        if skill_id and skill_id not in canonical:
+            canonical.append(skill_id)
+    leading = sorted(canonical[:Config.MARKET_SNAPSHOT_SKILLS])
+    return f"{' '.join((role or '').lower().split())}|{','.join(leading)}"
+
+
+def normalize_market_job(job: Any) -> Optional[Dict[str, Any]]:
+    """
+    A market job in the shape MatcherAgent scores, or None if the LLM's item
+    is unusable (not an object, or no title / company). Requirements given
+    as one comma-separated string are split; missing optional fields get
+    the defaults the matcher shows.
+    """
+    if not isinstance(job, dict):
+        return None
+    title, company = job.get("title"), job.get("company")
+    if not isinstance(title, str) or not title.strip() or not isinstance(company, str) or not company.strip():
+        return None
+
+    requirements = job.get("requirements")
+    if isinstance(requirements, str):
+        requirements = requirements.split(",")
+    if not isinstance(requirements, list):
+        requirements = []
+
+    def text(key: str, default: str) -> str:
+        value = job.get(key)
+        return value.strip() if isinstance(value, str) and value.strip() else default
+
+    return {
+        "title": title.strip(),
+        "company": company.strip(),
+        "location": text("location", "Not specified"),
+        "salary_range": text("salary_range", "Competitive"),
+        "requirements": [skill.strip() for skill in requirements if isinstance(skill, str) and skill.strip()],
+        "description": text("description", ""),
+    }
+
+
+class MarketSnapshotStore:
+    """
+    File-backed market snapshots: one JSON document mapping snapshot keys to
+    {"role", "skills", "market_jobs", "fetched_at"}. Writes go to a temp file
+    and are swapped in atomically, so a copied or checked-in file can serve
+    snapshots on an offline machine.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._snapshots: Dict[str, Dict[str, Any]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable market snapshot file {self.path}: {e}")
+            return {}
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._snapshots.get(key)
+
+    def put(self, key: str, snapshot: Dict[str, Any]):
+        with self._lock:
+            self._snapshots[key] = snapshot
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(self._snapshots, f)
+            os.replace(tmp_path, self.path)
+
+    def __len__(self) -> int:
+        return len(self._snapshots)
+
+
+class MarketSnapshots:
+    """
+    Stale-while-revalidate access to market snapshots. Readers get the latest
+    stored jobs immediately; a missing or expired snapshot is refreshed by a
+    background task on the running loop (one refresh per key at a time).
+    """
+
+    def __init__(self, store: MarketSnapshotStore, ttl: float = None, refresh: bool = None):
+        self.store = store
+        self.ttl = Config.MARKET_SNAPSHOT_TTL if ttl is None else ttl
+        self.refresh_enabled = Config.MARKET_SNAPSHOT_REFRESH if refresh is None else refresh
+        self._refreshing: Dict[str, asyncio.Task] = {}
+
+    def latest(self, role: str, skills: List[str], provider: str = None, api_key: str = None) -> List[Dict[str, Any]]:
+        """
+        Jobs from the newest snapshot for (role, skills), or [] if there is
+        none yet. Never waits on the search or the LLM.
+        """
+        key = snapshot_key(role, skills)
+        snapshot = self.store.get(key)
+        if snapshot is None or time.time() - snapshot.get("fetched_at", 0) > self.ttl:
+            self._schedule_refresh(key, role, skills, provider, api_key)
+        if snapshot is None:
+            return []
+        # Callers annotate the jobs, so hand out copies
+        return [dict(job) for job in snapshot.get("market_jobs", [])]
+
+    def _schedule_refresh(self, key: str, role: str, skills: List[str], provider: str, api_key: str):
+        if not self.refresh_enabled or key in self._refreshing:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._background_refresh(role, skills, provider, api_key))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+    async def _background_refresh(self, role: str, skills: List[str], provider: str, api_key: str):
+        # Runs after the triggering resume is done; keep it out of that resume's trace
+        detach_trace()
+        await self.refresh(role, skills, provider, api_key)
+
+    async def refresh(self, role: str, skills: List[str], provider: str = None, api_key: str = None) -> List[Dict[str, Any]]:
+        """Run the market agent now and store its jobs; keeps the old snapshot on failure"""
+        from .market_intelligence_agent import MarketIntelligenceAgent
+
+        try:
+            agent = MarketIntelligenceAgent(provider=provider, api_key=api_key)
+            market_data = await agent.run([{"content": {"role": role, "skills": skills}}])
+        except Exception as e:
+            logger.warning(f"Market snapshot refresh failed for {role}: {e}")
+            return []
+
+        jobs = market_data.get("market_jobs", [])
+        # One malformed reply would otherwise be served to every matching resume until it expires
+        valid = [job for job in map(normalize_market_job, jobs if isinstance(jobs, list) else []) if job]
+        if isinstance(jobs, list) and len(valid) < len(jobs):
+            logger.warning(f"Dropped {len(jobs) - len(valid)} malformed market jobs for {role}")
+        jobs = valid
+        if jobs:
+            await asyncio.to_thread(self.store.put, snapshot_key(role, skills), {
+                "role": role,
+                "skills": skills,
+                "market_jobs": jobs,
+                "fetched_at": time.time(),
+            })
+        return jobs
+
+    async def wait_for_refreshes(self):
+        """Let in-flight background refreshes finish (shutdown, scripts, benchmarks)"""
+        if self._refreshing:
+            await asyncio.gather(*self._refreshing.values(), return_exceptions=True)
+
+
+_snapshots: Optional[MarketSnapshots] = None
+_snapshots_lock = threading.Lock()
+
+
+def get_market_snapshots() -> MarketSnapshots:
+    """Process-wide snapshot reader backed by db/market_snapshots.json"""
+    global _snapshots
+    with _snapshots_lock:
+        if _snapshots is None:
+            path = Path(__file__).parent.parent / "db" / Config.MARKET_SNAPSHOT_PATH
+            _snapshots = MarketSnapshots(MarketSnapshotStore(path))
+        return _snapshots
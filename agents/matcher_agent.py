@@ -1,10 +1,10 @@
 from typing import Dict, Any, List
 from .base_agent import BaseAgent
 from db.database import JobDatabase
-import json
-import sqlite3
+from .job_scoring import get_job_index
+from .market_snapshots import get_market_snapshots
+from .stage_models import MatchInput
 from datetime import datetime
-import ast
 
 
 class MatcherAgent(BaseAgent):
@@ -24,31 +24,11 @@ class MatcherAgent(BaseAgent):
         """Match candidate with available positions"""
         print("🎯 Matcher: Finding suitable job matches")
 
-        try:
-            # Parse input message safely
-            content = messages[-1].get("content", "{}")
-            if isinstance(content, str):
-                # Try JSON first, then AST for python dict string
-                try:
-                    analysis_results = json.loads(content)
-                except json.JSONDecodeError:
-                    try:
-                        analysis_results = ast.literal_eval(content)
-                    except (ValueError, SyntaxError):
-                        print("Failed to parse input content as JSON or dict")
-                        analysis_results = {}
-            else:
-                analysis_results = content
-        except Exception as e:
-            print(f"Error parsing analysis results: {e}")
-            return {
-                "matched_jobs": [],
-                "match_timestamp": datetime.now().strftime("%Y-%m-%d"),
-                "number_of_matches": 0,
-            }
+        content = messages[-1].get("content", "{}")
+        match_input = content if isinstance(content, MatchInput) else MatchInput.from_content(content)
 
         # Extract skills and experience level from analysis
-        skills_analysis = analysis_results.get("skills_analysis", {})
+        skills_analysis = match_input.skills_analysis
         if not skills_analysis:
             print("No skills analysis provided in the input.")
             return {
@@ -71,35 +51,73 @@ class MatcherAgent(BaseAgent):
 
         print(f" ==>>> Skills: {skills}, Experience Level: {experience_level}")
         
-        # 1. Search DB jobs
-        db_jobs = self.search_jobs(skills, experience_level)
-        for job in db_jobs:
-            job["source"] = "Database"
+        # 1. Score every DB job at once against the in-memory skill index
+        db_scored, db_match_count, role = self._score_db_jobs(skills, experience_level)
 
         # 2. Fetch/Simulate Live Market Jobs
         # Infer role from DB jobs or use a default
-        role = db_jobs[0]["title"] if db_jobs else "Software Engineer"
-        
-        from .market_intelligence_agent import MarketIntelligenceAgent
-        market_agent = MarketIntelligenceAgent(provider=self.provider, api_key=self.api_key)
+        role = role or "Software Engineer"
         
-        market_data = await market_agent.run([{"content": {"role": role, "skills": skills}}])
-        live_jobs = market_data.get("market_jobs", [])
+        # Latest stored snapshot; a stale or missing one is refreshed in the background
+        live_jobs = get_market_snapshots().latest(role, skills, provider=self.provider, api_key=self.api_key)
         for job in live_jobs:
              job["source"] = "Live Market 🌐"
-             # Normalize fields if needed
-             if "match_score" not in job: # we'll calculate it below
-                 pass
 
-        # Combine pools
-        all_potential_jobs = db_jobs + live_jobs
+        live_scored = self._score_jobs(live_jobs, skills)
+        number_of_matches = db_match_count + len(live_scored)
+
+        print(f" ==>>> Scored Jobs: {number_of_matches}")
+        # Sort by match score (stable: DB jobs first on ties, as before)
+        scored_jobs = db_scored + live_scored
+        scored_jobs.sort(key=lambda x: x["match_score"], reverse=True)
+
+        return {
+            "matched_jobs": scored_jobs[:3],  # Top 3 matches
+            "match_timestamp": datetime.now().strftime("%Y-%m-%d"),
+            "number_of_matches": number_of_matches,
+        }
+
+    def _score_db_jobs(self, skills: List[str], experience_level: str, k: int = 3):
+        """
+        Top-k DB jobs via the vectorized JobSkillIndex.
+        Returns (scored_jobs, number_of_matches, role) where role is the title
+        of the first eligible job, used to steer the market search.
+        """
+        match = get_job_index(self.db).top_k(skills, experience_level, k=k)
+        top_ids = match["job_ids"].tolist()
+        wanted = top_ids + ([match["first_eligible_id"]] if match["first_eligible_id"] is not None else [])
+        jobs = {job["id"]: job for job in self.db.get_jobs_by_ids(wanted)}
 
-        # Calculate match scores
         scored_jobs = []
-        for job in all_potential_jobs:
-            # Calculate match score based on requirements overlap
-            required_skills = set(job["requirements"])
-            candidate_skills = set(skills)
+        for job_id, score in zip(top_ids, match["scores"].tolist()):
+            job = jobs.get(job_id)
+            if job is None:
+                continue
+            scored_jobs.append(
+                {
+                    "title": f"{job['title']} at {job['company']}",
+                    "match_score": score,
+                    "location": job["location"],
+                    "salary_range": job.get("salary_range", "Competitive"),
+                    "requirements": job["requirements"],
+                    "source": "Database"
+                }
+            )
+
+        first = jobs.get(match["first_eligible_id"])
+        return scored_jobs, match["number_of_matches"], first["title"] if first else None
+
+    def _score_jobs(self, jobs: List[Dict[str, Any]], skills: List[str]) -> List[Dict[str, Any]]:
+        """Score jobs by requirements overlap, keeping those above the threshold"""
+        scored_jobs = []
+        normalize = JobDatabase.normalize_skill
+        candidate_skills = {normalize(skill) for skill in skills if isinstance(skill, str)}
+        for job in jobs:
+            requirements = job.get("requirements")
+            if not isinstance(requirements, list):
+                requirements = []
+            # Calculate match score based on requirements overlap (same normalization as the job_skills index)
+            required_skills = {normalize(skill) for skill in requirements if isinstance(skill, str)}
             overlap = len(required_skills.intersection(candidate_skills))
             total_required = len(required_skills)
             
@@ -115,68 +133,21 @@ class MatcherAgent(BaseAgent):
             if match_score >= 30:  # Include jobs with >30% match
                 scored_jobs.append(
                     {
-                        "title": f"{job['title']} at {job['company']}",
+                        "title": f"{job.get('title', 'Untitled role')} at {job.get('company', 'Unknown company')}",
                         "match_score": match_score, # Numeric
-                        "location": job["location"],
+                        "location": job.get("location", "Not specified"),
                         "salary_range": job.get("salary_range", "Competitive"),
-                        "requirements": job["requirements"],
+                        "requirements": requirements,
                         "source": job.get("source", "Database")
                     }
                 )
-
-        print(f" ==>>> Scored Jobs: {len(scored_jobs)}")
-        # Sort by match score
-        scored_jobs.sort(key=lambda x: x["match_score"], reverse=True)
-
-        return {
-            "matched_jobs": scored_jobs[:3],  # Top 3 matches
-            "match_timestamp": datetime.now().strftime("%Y-%m-%d"),
-            "number_of_matches": len(scored_jobs),
-        }
+        return scored_jobs
 
     def search_jobs(
         self, skills: List[str], experience_level: str
     ) -> List[Dict[str, Any]]:
         """Search jobs based on skills and experience level"""
-        query = "SELECT * FROM jobs WHERE experience_level = ?"
-        query_conditions = []
-        params = [experience_level]
-
-        # Create LIKE conditions for each skill
-        for skill in skills:
-            query_conditions.append("requirements LIKE ?")
-            params.append(f"%{skill}%")
-
-        if query_conditions:
-            query += " AND (" + " OR ".join(query_conditions) + ")"
-
-        try:
-            with sqlite3.connect(self.db.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                cursor.execute(query, params)
-                rows = cursor.fetchall()
-
-                return [
-                    {
-                        "id": row["id"],
-                        "title": row["title"],
-                        "company": row["company"],
-                        "location": row["location"],
-                        "type": row["type"],
-                        "experience_level": row["experience_level"],
-                        "salary_range": row["salary_range"],
-                        "description": row["description"],
-                        "requirements": json.loads(row["requirements"]),
-                        "benefits": (
-                            json.loads(row["benefits"]) if row["benefits"] else []
-                        ),
-                    }
-                    for row in rows
-                ]
-        except Exception as e:
-            print(f"Error searching jobs: {e}")
-            return []
+        return self.db.search_jobs(skills, experience_level)
 
 
 # ## This uses dummy data for the job listings and a fallback to sample data if the Ollama API fails to return valid JSON.
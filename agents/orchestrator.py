@@ -1,3 +1,4 @@
+import time
 from typing import Dict, Any
 from .base_agent import BaseAgent
 from .extractor_agent import ExtractorAgent
@@ -6,6 +7,19 @@ from .matcher_agent import MatcherAgent
 from .screener_agent import ScreenerAgent
 from .recommender_agent import RecommenderAgent
 from .profile_enhancer_agent import ProfileEnhancerAgent
+from .pipeline import Stage, StageGraph
+from .stage_models import AnalysisInput, MatchInput, RecommendationInput, ResumeInput, ScreeningInput
+from .tracing import tracing, record_resume
+from utils.exceptions import ExtractionError
+
+# Stage results copied into the workflow context returned to callers
+WORKFLOW_OUTPUTS = (
+    "extraction_results",
+    "analysis_results",
+    "job_matches",
+    "screening_results",
+    "final_recommendation",
+)
 
 
 class OrchestratorAgent(BaseAgent):
@@ -30,80 +44,107 @@ class OrchestratorAgent(BaseAgent):
         self.matcher = MatcherAgent(provider=self.provider, api_key=self.api_key)
         self.screener = ScreenerAgent(provider=self.provider, api_key=self.api_key)
         self.recommender = RecommenderAgent(provider=self.provider, api_key=self.api_key)
+        self.workflow = self._build_workflow()
 
     async def run(self, messages: list) -> Dict[str, Any]:
         """Process a single message through the agent"""
         prompt = messages[-1]["content"]
-        response = self._query_ollama(prompt)
+        response = await self._aquery_llm(prompt)
         return self._parse_json_safely(response)
 
-    async def process_application(self, resume_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Main workflow orchestrator for processing job applications"""
-        print("🎯 Orchestrator: Starting application process")
-
-        workflow_context = {
-            "resume_data": resume_data,
-            "status": "initiated",
-            "current_stage": "extraction",
-        }
+    def _build_workflow(self) -> StageGraph:
+        """Declare the recruitment stages and the data each one needs"""
 
-        try:
-            # Extract resume information
+        async def extract(results):
             extraction_res = await self.extractor.run(
-                [{"role": "user", "content": str(resume_data)}]
-            )
-            workflow_context.update({
-                "extraction_results": extraction_res,
-                "current_stage": "enhancement"
-            })
-            
-            # Step B: Profile Enhancement
-            enhanced_data = await self.enhancer.run(
-                [{"content": str(extraction_res.get("structured_data", ""))}]
+                [{"role": "user", "content": ResumeInput.from_content(results["resume_data"])}]
             )
+            if extraction_res.get("extraction_status") == "failed":
+                # Nothing useful for the downstream stages; don't spend LLM calls on it
+                raise ExtractionError(extraction_res.get("error", "Extraction failed"))
+            return extraction_res
 
-            # Analyze candidate profile
-            analysis_input = {
-                "raw_text": extraction_res.get("raw_text", ""),
-                "enhanced_data": enhanced_data,
-                "structured_data": extraction_res.get("structured_data", "")
-            }
-            analysis_results = await self.analyzer.run(
-                [{"role": "user", "content": str(analysis_input)}]
-            )
-            workflow_context.update(
-                {"analysis_results": analysis_results, "current_stage": "matching"}
+        async def full_text(results):
+            # Pages a page-limited extraction skipped, for the stored report
+            return await self.extractor.full_text(results["extraction_results"])
+
+        async def enhance(results):
+            return await self.enhancer.run(
+                [{"content": results["extraction_results"].get("structured_data", "")}]
             )
 
-            # Match with jobs
-            job_matches = await self.matcher.run(
-                [{"role": "user", "content": str(analysis_results)}]
+        async def analyze(results):
+            extraction_res = results["extraction_results"]
+            analysis_input = AnalysisInput(
+                raw_text=extraction_res.get("raw_text", ""),
+                structured_data=extraction_res.get("structured_data", ""),
+                enhanced_data=results["enhanced_data"],
             )
-            workflow_context.update(
-                {"job_matches": job_matches, "current_stage": "screening"}
+            return await self.analyzer.run(
+                [{"role": "user", "content": analysis_input}]
             )
 
-            # Screen candidate
-            screening_results = await self.screener.run(
-                [{"role": "user", "content": str(workflow_context)}]
-            )
-            workflow_context.update(
-                {
-                    "screening_results": screening_results,
-                    "current_stage": "recommendation",
-                }
+        async def match(results):
+            return await self.matcher.run(
+                [{"role": "user", "content": MatchInput.from_content(results["analysis_results"])}]
             )
 
-            # Generate recommendations
-            final_recommendation = await self.recommender.run(
-                [{"role": "user", "content": str(workflow_context)}]
+        async def screen(results):
+            return await self.screener.run(
+                [{"role": "user", "content": ScreeningInput.from_context(results)}]
             )
-            workflow_context.update(
-                {"final_recommendation": final_recommendation, "status": "completed"}
+
+        async def recommend(results):
+            return await self.recommender.run(
+                [{"role": "user", "content": RecommendationInput.from_context(results)}]
             )
 
-            return workflow_context
+        # The LLM stages form a chain: each prompt uses the previous stage's
+        # output (screening weighs the job matches, the recommendation the
+        # screening). The full-text parse needs none of them, so it runs in
+        # the PDF pool while they wait on the LLM.
+        return StageGraph([
+            Stage("extraction_results", extract, ("resume_data",)),
+            Stage("resume_text", full_text, ("extraction_results",)),
+            Stage("enhanced_data", enhance, ("extraction_results",)),
+            Stage("analysis_results", analyze, ("extraction_results", "enhanced_data")),
+            Stage("job_matches", match, ("analysis_results",)),
+            Stage("screening_results", screen, ("extraction_results", "analysis_results", "job_matches")),
+            Stage("final_recommendation", recommend, ("analysis_results", "job_matches", "screening_results")),
+        ], inputs=("resume_data",))
+
+    async def process_application(self, resume_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Main workflow orchestrator for processing job applications"""
+        print("🎯 Orchestrator: Starting application process")
+
+        workflow_context = {
+            "resume_data": resume_data,
+            "status": "initiated",
+            "current_stage": "extraction",
+        }
+
+        start = time.perf_counter()
+        with tracing() as trace:
+            try:
+                results, timings = await self.workflow.execute({"resume_data": resume_data})
+            except Exception as e:
+                record_resume(time.perf_counter() - start, failed=True)
+                workflow_context.update({
+                    "status": "failed",
+                    "current_stage": getattr(e, "failed_stage", workflow_context["current_stage"]),
+                    "error": str(e),
+                })
+                raise
+        record_resume(time.perf_counter() - start)
+
+        for key in WORKFLOW_OUTPUTS:
+            workflow_context[key] = results[key]
+        workflow_context.update({
+            "current_stage": "recommendation",
+            "status": "completed",
+            "stage_timings": timings,
+            "trace": trace.to_dict(),
+        })
+        print(f"🎯 Orchestrator: Stage timings {timings}")
 
-        except Exception as e:
-            workflow_context.update({"status": "failed", "error": str(e)})
-            raise
\ No newline at end of file
+        return workflow_context
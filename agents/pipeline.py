@@ -0,0 +1,125 @@
+import asyncio
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .tracing import current_stage, record_stage
+
+# Called as listener(stage_name, state) with state "started", "completed" or
+# "failed"; lets a caller report per-stage progress of the workflows it runs
+stage_listener: ContextVar[Optional[Callable[[str, str], None]]] = ContextVar("stage_listener", default=None)
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    One step of an agent workflow.
+
+    `run` receives the results of every finished stage (keyed by stage name)
+    and returns this stage's result. A stage starts as soon as all stages in
+    `depends_on` have finished.
+    """
+    name: str
+    run: Callable[[Dict[str, Any]], Awaitable[Any]]
+    depends_on: Tuple[str, ...] = ()
+
+
+class StageGraph:
+    """
+    Runs a set of stages concurrently, respecting their data dependencies.
+    `inputs` names values supplied to execute() rather than produced by a stage.
+    """
+
+    def __init__(self, stages: List[Stage], inputs: Tuple[str, ...] = ()):
+        self.inputs = tuple(inputs)
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Duplicate stage names in workflow")
+        for stage in stages:
+            missing = [dep for dep in stage.depends_on if dep not in self.stages and dep not in self.inputs]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stages: {missing}")
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        order, visiting, done = [], set(), set()
+
+        def visit(name: str):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Cycle detected in workflow at stage '{name}'")
+            visiting.add(name)
+            for dep in self.stages[name].depends_on:
+                if dep in self.stages:
+                    visit(dep)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    async def execute(self, results: Dict[str, Any] = None) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """
+        Run every stage and return (results, timings).
+        Timings are wall-clock seconds per stage (also recorded to the
+        current trace and stage metrics). If a stage raises, the
+        stages still in flight are cancelled and the error propagates with
+        `failed_stage` set on it.
+        """
+        results = dict(results or {})
+        missing = [name for name in self.inputs if name not in results]
+        if missing:
+            raise ValueError(f"Workflow inputs not provided: {missing}")
+        timings: Dict[str, float] = {}
+        pending: Dict[asyncio.Task, str] = {}
+        started = set()
+
+        async def timed(stage: Stage):
+            # Each stage runs in its own task, so this only labels its own LLM calls
+            current_stage.set(stage.name)
+            listener = stage_listener.get()
+            if listener is not None:
+                listener(stage.name, "started")
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = await stage.run(results)
+                failed = False
+                return result
+            finally:
+                elapsed = time.perf_counter() - start
+                timings[stage.name] = round(elapsed, 4)
+                record_stage(stage.name, elapsed, failed=failed)
+                if listener is not None:
+                    listener(stage.name, "failed" if failed else "completed")
+
+        def launch_ready():
+            for name in self.order:
+                stage = self.stages[name]
+                if name not in started and all(dep in results for dep in stage.depends_on):
+                    started.add(name)
+                    pending[asyncio.create_task(timed(stage))] = name
+
+        launch_ready()
+        try:
+            while pending:
+                finished, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    name = pending.pop(task)
+                    try:
+                        results[name] = task.result()
+                    except Exception as e:
+                        e.failed_stage = name
+                        raise
+                launch_ready()
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        return results, timings
@@ -1,10 +1,21 @@
 from typing import Dict, Any
 from .base_agent import BaseAgent
+from .prompt_builder import PromptBuilder
 import logging
 
 logger = logging.getLogger(__name__)
 
 class ProfileEnhancerAgent(BaseAgent):
+    response_schema = {
+        "type": "object",
+        "properties": {
+            "enhanced_summary": {"type": "string"},
+            "standardized_skills": {"type": "array", "items": {"type": "string"}},
+            "total_years_exp": {"type": "number"},
+        },
+        "required": ["enhanced_summary", "standardized_skills"],
+    }
+
     def __init__(self, provider: str = None, api_key: str = None):
         super().__init__(
             name="ProfileEnhancer",
@@ -29,12 +40,10 @@ class ProfileEnhancerAgent(BaseAgent):
         
         content = messages[-1].get("content", "{}")
         
-        prompt = f"""
-        Enhance and standardize this candidate data:
-        {str(content)}
-        
-        Ensure output is valid JSON.
-        """
+        prompt = PromptBuilder(self.name)
+        prompt.text("Enhance and standardize this candidate data.")
+        prompt.data("Candidate data:", content, priority=1)
+        prompt.text("Ensure output is valid JSON.")
         
-        response = self._query_llm(prompt)
+        response = await self._aquery_llm(prompt.build())
         return self._parse_json_safely(response)
\ No newline at end of file
@@ -0,0 +1,146 @@
+"""
+Token-budgeted prompt assembly.
+
+Agents describe a prompt as ordered sections. Instruction text is required
+and always kept; data sections carry a priority, and when the prompt is over
+the agent's token budget the lowest-priority sections are trimmed first (lists
+lose trailing items, text is cut short, a section that cannot shrink enough is
+dropped). Structured data is serialized as compact JSON with empty fields left
+out, so nested results cost a predictable number of tokens.
+
+Tokens are estimated from the character count (Config.PROMPT_CHARS_PER_TOKEN),
+which is close enough for English text and JSON across the models we run and
+needs no tokenizer. The estimate and the number of trimmed sections are
+recorded in the resume's trace.
+"""
+import json
+import logging
+import textwrap
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from config import Config
+from .tracing import record_prompt
+
+logger = logging.getLogger(__name__)
+
+REQUIRED = None  # priority of sections that are never trimmed
+TRUNCATION_MARK = " …"
+MIN_TRIMMED_CHARS = 80  # below this a trimmed text section is dropped instead
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // Config.PROMPT_CHARS_PER_TOKEN)
+
+
+def compact(value: Any) -> Any:
+    """Drop None, empty strings and empty containers, recursively"""
+    if isinstance(value, dict):
+        items = ((key, compact(item)) for key, item in value.items())
+        return {key: item for key, item in items if not _is_empty(item)}
+    if isinstance(value, (list, tuple)):
+        return [item for item in map(compact, value) if not _is_empty(item)]
+    return value
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or (isinstance(value, (str, dict, list)) and not value)
+
+
+def compact_json(value: Any) -> str:
+    """Single-line JSON without indentation or empty fields"""
+    return json.dumps(compact(value), separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def token_budget(agent: str) -> int:
+    return Config.PROMPT_TOKEN_BUDGETS.get(agent, Config.PROMPT_TOKEN_BUDGET_DEFAULT)
+
+
+@dataclass(slots=True)
+class _Section:
+    label: str
+    value: Any
+    priority: Optional[int]
+    text: str = ""
+
+    def render(self) -> str:
+        body = self.value.strip() if isinstance(self.value, str) else compact_json(self.value)
+        if body in ("", "null", "{}", "[]"):
+            # Nothing to say: the section is left out
+            self.text = ""
+        else:
+            self.text = f"{self.label}\n{body}" if self.label else body
+        return self.text
+
+    def shrink(self, max_chars: int) -> bool:
+        """Fit the rendered section into max_chars; False if it should be dropped"""
+        if isinstance(self.value, list):
+            items = compact(self.value)
+            while items:
+                items.pop()
+                self.value = items
+                if len(self.render()) <= max_chars:
+                    return bool(items)
+            return False
+        if max_chars < MIN_TRIMMED_CHARS:
+            return False
+        body = self.value if isinstance(self.value, str) else compact_json(self.value)
+        keep = max_chars - len(self.label) - 1 - len(TRUNCATION_MARK)
+        if keep <= 0:
+            return False
+        self.value = body[:keep].rstrip() + TRUNCATION_MARK
+        self.render()
+        return True
+
+
+class PromptBuilder:
+    """
+    Assembles one prompt within `budget` estimated tokens (the agent's
+    configured budget by default). Sections appear in the order they were
+    added; higher priorities are kept longer.
+    """
+
+    def __init__(self, agent: str, budget: int = None):
+        self.agent = agent
+        self.budget = budget or token_budget(agent)
+        self._sections: List[_Section] = []
+
+    def text(self, text: str) -> "PromptBuilder":
+        """Required instruction text (dedented)"""
+        self._sections.append(_Section("", textwrap.dedent(text).strip(), REQUIRED))
+        return self
+
+    def data(self, label: str, value: Any, priority: int = REQUIRED) -> "PromptBuilder":
+        """A data section: text as is, anything else as compact JSON"""
+        self._sections.append(_Section(label, value, priority))
+        return self
+
+    def build(self) -> str:
+        sections = [section for section in self._sections if section.render()]
+        max_chars = self.budget * Config.PROMPT_CHARS_PER_TOKEN
+        size = self._size(sections)
+        trimmed = 0
+
+        # Lowest priority first; among equals, the later section goes first
+        trimmable = sorted(
+            (section for section in sections if section.priority is not REQUIRED),
+            key=lambda section: (section.priority, -sections.index(section)),
+        )
+        for section in trimmable:
+            if size <= max_chars:
+                break
+            trimmed += 1
+            if not section.shrink(len(section.text) - (size - max_chars)):
+                sections.remove(section)
+            size = self._size(sections)
+
+        prompt = "\n\n".join(section.text for section in sections)
+        tokens = estimate_tokens(prompt)
+        if tokens > self.budget:
+            logger.debug(f"[{self.agent}] Prompt is {tokens} tokens, over its {self.budget} budget after trimming")
+        record_prompt(self.agent, tokens, trimmed)
+        return prompt
+
+    @staticmethod
+    def _size(sections: List[_Section]) -> int:
+        return sum(len(section.text) for section in sections) + 2 * max(len(sections) - 1, 0)
@@ -1,11 +1,22 @@
 from typing import Dict, Any
 from .base_agent import BaseAgent
+from .stage_models import RecommendationInput
+from .prompt_builder import PromptBuilder
 from datetime import datetime
-import ast
-import json
 
 
 class RecommenderAgent(BaseAgent):
+    response_schema = {
+        "type": "object",
+        "properties": {
+            "hiring_status": {"type": "string", "enum": ["Recommended", "Not Recommended", "Pending Review"]},
+            "recommendation": {"type": "string"},
+            "next_steps": {"type": "array", "items": {"type": "string"}},
+            "confidence_level": {"type": "string", "enum": ["Low", "Medium", "High"]},
+        },
+        "required": ["hiring_status", "recommendation", "next_steps", "confidence_level"],
+    }
+
     def __init__(self, provider: str = None, api_key: str = None):
         super().__init__(
             name="Recommender",
@@ -23,41 +34,34 @@ class RecommenderAgent(BaseAgent):
         """Generate final recommendations"""
         print("💡 Recommender: Generating final recommendations")
 
+        # Focused context to avoid token limits and noise
         content = messages[-1]["content"]
-        try:
-             workflow_context = ast.literal_eval(content) if isinstance(content, str) else content
-        except (ValueError, SyntaxError):
-             print(f"RecommenderAgent: Failed to parse input: {content}")
-             workflow_context = {}
-
-        # Prepare focused context to avoid token limits and noise
-        focused_context = {
-            "candidate_name": workflow_context.get("extraction_results", {}).get("structured_data", {}).get("Personal Info", {}).get("Name", "Candidate"),
-            "skills": workflow_context.get("analysis_results", {}).get("skills_analysis", {}).get("technical_skills", []),
-            "experience": workflow_context.get("analysis_results", {}).get("skills_analysis", {}).get("years_of_experience", "Unknown"),
-            "matches": workflow_context.get("job_matches", {}).get("matched_jobs", []),
-            "screening_score": workflow_context.get("screening_results", {}).get("screening_score", 0),
-            "red_flags": workflow_context.get("screening_results", {}).get("red_flags", [])
-        }
+        recommendation_input = (
+            content if isinstance(content, RecommendationInput) else RecommendationInput.from_content(content)
+        )
 
-        prompt = f"""
+        # Job matches are the longest part and matter least once screening has scored them
+        summary = recommendation_input.to_dict()
+        matches = summary.pop("matches")
+        prompt = PromptBuilder(self.name)
+        prompt.text("""
         ACT AS A SENIOR HR DIRECTOR.
-        Provide a final hiring recommendation based on the candidate summary below.
-        
-        Candidate Data: {json.dumps(focused_context, indent=2)}
-        
+        Provide a final hiring recommendation based on the candidate summary below.""")
+        prompt.data("Candidate Data:", summary)
+        prompt.data("Job Matches:", matches, priority=1)
+        prompt.text("""
         REQUIRED OUTPUT FORMAT (STRICT JSON):
-        {{
+        {
             "hiring_status": "Recommended" | "Not Recommended" | "Pending Review",
             "recommendation": "Professional 2-3 sentence justification. Focus on why they fit or don't fit based on skills and screening score.",
             "next_steps": ["Specific actionable next step 1", "Specific actionable next step 2"],
             "confidence_level": "Low" | "Medium" | "High"
-        }}
+        }
         
         DO NOT include any explanation outside the JSON block.
-        """
+        """)
 
-        response = self._query_llm(prompt)
+        response = await self._aquery_llm(prompt.build())
         parsed = self._parse_json_safely(response)
         
         if not parsed or "recommendation" not in parsed:
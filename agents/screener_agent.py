@@ -1,11 +1,21 @@
 from typing import Dict, Any
 from .base_agent import BaseAgent
+from .stage_models import ScreeningInput
+from .prompt_builder import PromptBuilder
 from datetime import datetime
-import ast
-import json
 
 
 class ScreenerAgent(BaseAgent):
+    response_schema = {
+        "type": "object",
+        "properties": {
+            "screening_report": {"type": "string"},
+            "screening_score": {"type": "integer", "minimum": 0, "maximum": 100},
+            "red_flags": {"type": "array", "items": {"type": "string"}},
+        },
+        "required": ["screening_report", "screening_score", "red_flags"],
+    }
+
     def __init__(self, provider: str = None, api_key: str = None):
         super().__init__(
             name="Screener",
@@ -25,39 +35,30 @@ class ScreenerAgent(BaseAgent):
         """Screen the candidate"""
         print("👥 Screener: Conducting initial screening")
 
+        # Focused context: only what screening needs, not the whole workflow
         content = messages[-1]["content"]
-        try:
-             workflow_context = ast.literal_eval(content) if isinstance(content, str) else content
-        except (ValueError, SyntaxError):
-             print(f"ScreenerAgent: Failed to parse input: {content}")
-             workflow_context = {}
-             
-        # Prepare focused context
-        focused_context = {
-            "candidate_name": workflow_context.get("extraction_results", {}).get("structured_data", {}).get("Personal Info", {}).get("Name", "Candidate"),
-            "skills_analysis": workflow_context.get("analysis_results", {}).get("skills_analysis", {}),
-            "job_matches": workflow_context.get("job_matches", {}).get("matched_jobs", [])
-        }
+        screening_input = content if isinstance(content, ScreeningInput) else ScreeningInput.from_content(content)
              
-        prompt = f"""
-        Conduct a comprehensive screening of this candidate based on the profile and job matches.
-        
-        Candidate Data: {json.dumps(focused_context, indent=2)}
-        
+        prompt = PromptBuilder(self.name)
+        prompt.text("Conduct a comprehensive screening of this candidate based on the profile and job matches.")
+        prompt.data("Candidate:", screening_input.candidate_name)
+        prompt.data("Skills Analysis:", screening_input.skills_analysis, priority=2)
+        prompt.data("Job Matches:", screening_input.job_matches, priority=1)
+        prompt.text("""
         Evaluate:
         1. Qualification alignment with matched jobs
         2. Experience relevance
         3. Skill gaps or red flags
         
         Return a STRICT JSON object with no markdown formatting:
-        {{
+        {
             "screening_report": "detailed textual report (3-4 sentences)",
             "screening_score": number (integer 0-100),
             "red_flags": ["flag1", "flag2"]
-        }}
-        """
+        }
+        """)
 
-        response = self._query_llm(prompt)
+        response = await self._aquery_llm(prompt.build())
         parsed = self._parse_json_safely(response)
 
         return {
@@ -0,0 +1,151 @@
+"""
+Typed inputs handed from one workflow stage to the next.
+
+The orchestrator builds these from earlier stage results and passes them by
+reference, so nothing is stringified and parsed back between stages. Agents
+still accept the older message content (a dict, or its JSON / str() form)
+from callers outside the workflow; from_content() converts it and raises the
+stage's error when it cannot be read, instead of carrying on with defaults.
+"""
+import ast
+import json
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, List, Optional, Type
+
+from utils.exceptions import (
+    AnalysisError,
+    ExtractionError,
+    MatchingError,
+    RecommendationError,
+    ScreeningError,
+)
+
+
+def parse_content(content: Any, error: Type[Exception]) -> Dict[str, Any]:
+    """Message content from an external caller as a dict; raises `error` if unreadable"""
+    if isinstance(content, dict):
+        return content
+    if isinstance(content, str):
+        try:
+            value = json.loads(content)
+        except json.JSONDecodeError:
+            try:
+                value = ast.literal_eval(content)
+            except (ValueError, SyntaxError) as e:
+                raise error(f"Unreadable stage input: {e}")
+        if isinstance(value, dict):
+            return value
+    raise error(f"Expected a mapping as stage input, got {type(content).__name__}")
+
+
+def _dict(value: Any) -> Dict[str, Any]:
+    return value if isinstance(value, dict) else {}
+
+
+def candidate_name(extraction_results: Dict[str, Any], default: str = "Candidate") -> str:
+    """Name from the extractor's structured data"""
+    personal = _dict(_dict(_dict(extraction_results).get("structured_data")).get("Personal Info"))
+    return personal.get("Name", default)
+
+
+class StageInput:
+    """Shared helpers; subclasses are slotted dataclasses"""
+
+    __slots__ = ()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Shallow dict of the fields, in declaration order"""
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+
+@dataclass(slots=True)
+class ResumeInput(StageInput):
+    """What the extractor reads: a PDF on disk, or plain text"""
+    file_path: Optional[str] = None
+    filename: Optional[str] = None
+    content_hash: Optional[str] = None
+    text: str = ""
+
+    @classmethod
+    def from_content(cls, content: Any) -> "ResumeInput":
+        data = parse_content(content, ExtractionError)
+        return cls(
+            file_path=data.get("file_path"),
+            filename=data.get("filename"),
+            content_hash=data.get("content_hash"),
+            text=data.get("text", ""),
+        )
+
+
+@dataclass(slots=True)
+class AnalysisInput(StageInput):
+    raw_text: str = ""
+    structured_data: Any = ""
+    enhanced_data: Any = ""
+
+    @classmethod
+    def from_content(cls, content: Any) -> "AnalysisInput":
+        data = parse_content(content, AnalysisError)
+        return cls(
+            raw_text=data.get("raw_text", ""),
+            structured_data=data.get("structured_data", ""),
+            enhanced_data=data.get("enhanced_data", ""),
+        )
+
+
+@dataclass(slots=True)
+class MatchInput(StageInput):
+    skills_analysis: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_content(cls, content: Any) -> "MatchInput":
+        """Accepts the analyzer's result (or its JSON / str() form)"""
+        return cls(skills_analysis=_dict(parse_content(content, MatchingError).get("skills_analysis")))
+
+
+@dataclass(slots=True)
+class ScreeningInput(StageInput):
+    candidate_name: str = "Candidate"
+    skills_analysis: Dict[str, Any] = field(default_factory=dict)
+    job_matches: List[Dict[str, Any]] = field(default_factory=list)
+
+    @classmethod
+    def from_context(cls, context: Dict[str, Any]) -> "ScreeningInput":
+        """Pick what screening needs out of the workflow results"""
+        return cls(
+            candidate_name=candidate_name(context.get("extraction_results")),
+            skills_analysis=_dict(_dict(context.get("analysis_results")).get("skills_analysis")),
+            job_matches=_dict(context.get("job_matches")).get("matched_jobs", []),
+        )
+
+    @classmethod
+    def from_content(cls, content: Any) -> "ScreeningInput":
+        return cls.from_context(parse_content(content, ScreeningError))
+
+
+@dataclass(slots=True)
+class RecommendationInput(StageInput):
+    candidate_name: str = "Candidate"
+    skills: List[str] = field(default_factory=list)
+    experience: Any = "Unknown"
+    matches: List[Dict[str, Any]] = field(default_factory=list)
+    screening_score: int = 0
+    red_flags: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_context(cls, context: Dict[str, Any]) -> "RecommendationInput":
+        """Pick what the recommendation needs out of the workflow results"""
+        skills_analysis = _dict(_dict(context.get("analysis_results")).get("skills_analysis"))
+        screening = _dict(context.get("screening_results"))
+        return cls(
+            candidate_name=candidate_name(context.get("extraction_results")),
+            skills=skills_analysis.get("technical_skills", []),
+            experience=skills_analysis.get("years_of_experience", "Unknown"),
+            matches=_dict(context.get("job_matches")).get("matched_jobs", []),
+            screening_score=screening.get("screening_score", 0),
+            red_flags=screening.get("red_flags", []),
+        )
+
+    @classmethod
+    def from_content(cls, content: Any) -> "RecommendationInput":
+        return cls.from_context(parse_content(content, RecommendationError))
@@ -0,0 +1,276 @@
+"""
+Per-resume traces and process-wide Prometheus metrics.
+
+A Trace collects, for one resume, the wall time of every workflow stage and
+the LLM activity inside it (latency, prompt/completion tokens, cache hits,
+parse failures). It is carried in a context variable, so asyncio tasks
+spawned by the workflow record into the trace of the resume they belong to.
+Every recording also feeds the process-wide metrics served at /metrics.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Tuple
+
+from .llm_cache import get_llm_cache
+
+current_trace: ContextVar[Optional["Trace"]] = ContextVar("current_trace", default=None)
+current_stage: ContextVar[Optional[str]] = ContextVar("current_stage", default=None)
+
+_STAGE_FIELDS = (
+    "llm_calls", "llm_errors", "llm_latency", "prompt_tokens",
+    "completion_tokens", "cache_hits", "parse_failures",
+    "prompt_estimated_tokens", "prompt_sections_trimmed",
+)
+
+
+class Trace:
+    """Stage timings and LLM usage for one resume"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _stage(self, name: str) -> Dict[str, Any]:
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = {"wall_time": 0.0, **{field: 0 for field in _STAGE_FIELDS}}
+        return stage
+
+    def add(self, stage: str, **values):
+        with self._lock:
+            entry = self._stage(stage)
+            for field, value in values.items():
+                entry[field] += value
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = {
+                name: {field: round(value, 4) if isinstance(value, float) else value for field, value in entry.items()}
+                for name, entry in self.stages.items()
+            }
+        totals = {field: sum(entry[field] for entry in stages.values()) for field in _STAGE_FIELDS}
+        totals["llm_latency"] = round(totals["llm_latency"], 4)
+        return {
+            "total_wall_time": round(time.perf_counter() - self.started, 4),
+            "stages": stages,
+            "totals": totals,
+        }
+
+
+@contextmanager
+def tracing():
+    """Record everything run inside the block (including spawned tasks) into a new Trace"""
+    trace = Trace()
+    token = current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        current_trace.reset(token)
+
+
+def detach_trace():
+    """Stop recording into the caller's trace (for background work outliving a resume)"""
+    current_trace.set(None)
+    current_stage.set(None)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """Minimal Prometheus registry: labelled counters, gauges and histograms, text exposition"""
+
+    DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._meta: Dict[str, Tuple[str, str]] = {}
+        self._counters: Dict[str, Dict[Tuple, float]] = {}
+        self._histograms: Dict[str, Dict[Tuple, list]] = {}
+        self._buckets: Dict[str, Tuple[float, ...]] = {}
+
+    def counter(self, name: str, help_text: str):
+        self._meta[name] = ("counter", help_text)
+        self._counters[name] = {}
+
+    def gauge(self, name: str, help_text: str):
+        self._meta[name] = ("gauge", help_text)
+        self._counters[name] = {}
+
+    def histogram(self, name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self._meta[name] = ("histogram", help_text)
+        self._histograms[name] = {}
+        self._buckets[name] = tuple(buckets)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters[name]
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels):
+        """Overwrite one series: gauges, or counters whose totals are kept elsewhere"""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._counters[name][key] = value
+
+    def observe(self, name: str, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        buckets = self._buckets[name]
+        with self._lock:
+            series = self._histograms[name]
+            state = series.get(key)
+            if state is None:
+                # Per-bucket counts (non-cumulative), then sum and count
+                state = series[key] = [[0] * len(buckets), 0.0, 0]
+            index = bisect.bisect_left(buckets, value)
+            if index < len(buckets):
+                state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @staticmethod
+    def _labels(key: Tuple, extra: Tuple = ()) -> str:
+        pairs = list(key) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            for name, (kind, help_text) in self._meta.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                if kind in ("counter", "gauge"):
+                    for key, value in self._counters[name].items():
+                        lines.append(f"{name}{self._labels(key)} {value}")
+                    continue
+                buckets = self._buckets[name]
+                for key, (counts, total, count) in self._histograms[name].items():
+                    cumulative = 0
+                    for bound, bucket_count in zip(buckets, counts):
+                        cumulative += bucket_count
+                        lines.append(f"{name}_bucket{self._labels(key, (('le', bound),))} {cumulative}")
+                    lines.append(f"{name}_bucket{self._labels(key, (('le', '+Inf'),))} {count}")
+                    lines.append(f"{name}_sum{self._labels(key)} {total}")
+                    lines.append(f"{name}_count{self._labels(key)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+METRICS.histogram("recruiter_stage_seconds", "Wall time of workflow stages")
+METRICS.histogram("recruiter_resume_seconds", "End-to-end wall time per processed resume")
+METRICS.counter("recruiter_resumes_total", "Resumes run through the orchestrator, by outcome")
+METRICS.histogram("recruiter_llm_request_seconds", "Latency of LLM requests (cache misses only)")
+METRICS.counter("recruiter_llm_requests_total", "LLM requests, by outcome")
+METRICS.counter("recruiter_llm_tokens_total", "LLM tokens reported by the provider")
+METRICS.counter("recruiter_cache_hits_total", "Responses served from a cache instead of the LLM or PDF parser")
+METRICS.counter("recruiter_json_responses_total", "LLM responses by how their JSON was found")
+METRICS.counter("recruiter_parse_failures_total", "LLM responses that could not be parsed as JSON")
+METRICS.histogram(
+    "recruiter_prompt_tokens", "Estimated size of assembled prompts, after trimming",
+    buckets=(250, 500, 750, 1000, 1500, 2000, 3000, 4000, 8000),
+)
+METRICS.counter("recruiter_prompt_trims_total", "Prompt sections trimmed or dropped to fit a token budget")
+METRICS.counter("recruiter_llm_cache_lookups_total", "LLM cache lookups, by tier that answered (or miss)")
+METRICS.gauge("recruiter_llm_cache_memory_entries", "Responses held in the LLM cache's memory tier")
+METRICS.counter("recruiter_llm_cache_purged_total", "Expired LLM cache rows deleted from SQLite")
+
+
+def _stage_label(agent: str) -> str:
+    return current_stage.get() or agent
+
+
+def record_stage(stage: str, seconds: float, failed: bool = False):
+    METRICS.observe("recruiter_stage_seconds", seconds, stage=stage, status="failed" if failed else "ok")
+    trace = current_trace.get()
+    if trace is not None:
+        trace.add(stage, wall_time=seconds)
+
+
+def record_resume(seconds: float, failed: bool = False):
+    status = "failed" if failed else "completed"
+    METRICS.observe("recruiter_resume_seconds", seconds, status=status)
+    METRICS.inc("recruiter_resumes_total", status=status)
+
+
+def record_llm_call(agent: str, provider: str, seconds: float, usage: Any = None, error: bool = False):
+    """One LLM round trip; `usage` is the response's usage block, if the provider sent one"""
+    prompt_tokens = getattr(usage, "prompt_tokens", None) or 0
+    completion_tokens = getattr(usage, "completion_tokens", None) or 0
+
+    METRICS.observe("recruiter_llm_request_seconds", seconds, agent=agent, provider=provider)
+    METRICS.inc("recruiter_llm_requests_total", agent=agent, provider=provider, outcome="error" if error else "ok")
+    if prompt_tokens:
+        METRICS.inc("recruiter_llm_tokens_total", prompt_tokens, agent=agent, provider=provider, kind="prompt")
+    if completion_tokens:
+        METRICS.inc("recruiter_llm_tokens_total", completion_tokens, agent=agent, provider=provider, kind="completion")
+
+    trace = current_trace.get()
+    if trace is not None:
+        trace.add(
+            _stage_label(agent),
+            llm_calls=1,
+            llm_errors=int(error),
+            llm_latency=seconds,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+        )
+
+
+def record_cache_hit(agent: str, cache: str = "llm"):
+    METRICS.inc("recruiter_cache_hits_total", agent=agent, cache=cache)
+    trace = current_trace.get()
+    if trace is not None:
+        trace.add(_stage_label(agent), cache_hits=1)
+
+
+def record_parse_failure(agent: str, reason: str = "no_json"):
+    METRICS.inc("recruiter_parse_failures_total", agent=agent, reason=reason)
+    trace = current_trace.get()
+    if trace is not None:
+        trace.add(_stage_label(agent), parse_failures=1)
+
+
+def record_json_parse(agent: str, outcome: str):
+    """
+    How an LLM response was parsed: "direct" (the reply was JSON), "extracted"
+    (JSON inside fences or prose), or a failure: "truncated" / "no_json"
+    """
+    METRICS.inc("recruiter_json_responses_total", agent=agent, outcome=outcome)
+    if outcome not in ("direct", "extracted"):
+        record_parse_failure(agent, reason=outcome)
+
+
+def record_prompt(agent: str, tokens: int, trimmed: int = 0):
+    """Estimated size of a prompt built for `agent`, and how many sections were cut to fit"""
+    METRICS.observe("recruiter_prompt_tokens", tokens, agent=agent)
+    if trimmed:
+        METRICS.inc("recruiter_prompt_trims_total", trimmed, agent=agent)
+    trace = current_trace.get()
+    if trace is not None:
+        trace.add(_stage_label(agent), prompt_estimated_tokens=tokens, prompt_sections_trimmed=trimmed)
+
+
+def _collect_llm_cache():
+    """Copy the LLM cache's own counters into the registry"""
+    cache = get_llm_cache()
+    if cache is None:
+        return
+    stats = cache.stats()
+    METRICS.set("recruiter_llm_cache_lookups_total", stats["hits"] - stats["disk_hits"], result="memory_hit")
+    METRICS.set("recruiter_llm_cache_lookups_total", stats["disk_hits"], result="disk_hit")
+    METRICS.set("recruiter_llm_cache_lookups_total", stats["misses"], result="miss")
+    METRICS.set("recruiter_llm_cache_memory_entries", stats["memory_entries"])
+    METRICS.set("recruiter_llm_cache_purged_total", stats["purged"])
+
+
+def render_metrics() -> str:
+    _collect_llm_cache()
+    return METRICS.render()
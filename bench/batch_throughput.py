@@ -0,0 +1,66 @@
+"""
+Bulk-processing throughput benchmark.
+
+Runs synthetic resumes through OrchestratorAgent.process_application with the
+recruiter batch engine at several concurrency levels, against the local stub
+LLM server, and reports resumes/minute.
+
+Usage:
+    python -m bench.batch_throughput --resumes 24 --levels 1 2 4 8 --latency 0.2
+"""
+import argparse
+import asyncio
+import time
+
+from config import Config
+from agents.llm_clients import aclose_clients
+from bench.stub_llm import StubLLMServer
+
+SKILLS = ["Python", "SQL", "Docker", "AWS", "React", "Kubernetes", "Java", "Go", "TensorFlow", "Figma"]
+
+
+def synthetic_resume(i: int) -> dict:
+    """Distinct text per resume so the LLM cache cannot short-circuit calls"""
+    skills = ", ".join(SKILLS[j % len(SKILLS)] for j in range(i, i + 4))
+    return {
+        "text": f"Candidate {i}\nSoftware Engineer with {i % 12} years of experience.\nSkills: {skills}.",
+        "filename": f"synthetic_{i}.pdf",
+    }
+
+
+async def main(n: int, levels, latency: float, jitter: float):
+    Config.LLM_CACHE_ENABLED = False
+    with StubLLMServer(latency=latency, jitter=jitter) as server:
+        Config.DEFAULT_PROVIDER = "ollama"
+        Config.OLLAMA_BASE_URL = server.base_url
+        Config.LLM_MAX_IN_FLIGHT["ollama"] = 6 * max(levels)
+
+        from agents.batch import process_batch
+        from agents.orchestrator import OrchestratorAgent
+
+        orchestrator = OrchestratorAgent(provider="ollama")
+        resumes = [synthetic_resume(i) for i in range(n)]
+
+        rows = []
+        for concurrency in levels:
+            start = time.perf_counter()
+            await process_batch(resumes, orchestrator.process_application, concurrency=concurrency)
+            elapsed = time.perf_counter() - start
+            rows.append((concurrency, elapsed, n / elapsed * 60))
+
+        await aclose_clients()
+
+        print(f"\n{n} resumes, stub latency {latency * 1000:.0f}ms (+/- {jitter * 1000:.0f}ms)")
+        print(f"{'concurrency':>12} {'wall (s)':>10} {'resumes/min':>12}")
+        for concurrency, elapsed, per_minute in rows:
+            print(f"{concurrency:>12} {elapsed:>10.2f} {per_minute:>12.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk resume throughput benchmark")
+    parser.add_argument("--resumes", type=int, default=24)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.resumes, args.levels, args.latency, args.jitter))
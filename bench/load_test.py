@@ -0,0 +1,69 @@
+"""
+Concurrency load test for the BaseAgent LLM transport.
+
+Fires N simultaneous LLM calls at a local stub server and compares the blocking
+_query_llm path with the async _aquery_llm path.
+
+Usage:
+    python -m bench.load_test --latency 0.2 --levels 1 4 16 64
+"""
+import argparse
+import asyncio
+import time
+
+from config import Config
+from agents.llm_clients import aclose_clients
+from agents.base_agent import BaseAgent
+from bench.stub_llm import StubLLMServer
+
+
+class _EchoAgent(BaseAgent):
+    # Every call must reach the stub server
+    cache_ttl = 0
+
+    def __init__(self):
+        super().__init__(name="LoadTest", instructions="Return JSON.", provider="ollama")
+
+    async def run(self, messages: list):
+        return self._parse_json_safely(await self._aquery_llm(messages[-1]["content"]))
+
+
+async def _run_blocking(agent: BaseAgent, n: int) -> float:
+    async def one():
+        return agent._query_llm("ping")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(n)))
+    return time.perf_counter() - start
+
+
+async def _run_async(agent: BaseAgent, n: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(agent._aquery_llm("ping") for _ in range(n)))
+    return time.perf_counter() - start
+
+
+async def main(levels, latency: float, jitter: float):
+    with StubLLMServer(latency=latency, jitter=jitter) as server:
+        Config.OLLAMA_BASE_URL = server.base_url
+        # Measure the transport, not the provider in-flight cap
+        Config.LLM_MAX_IN_FLIGHT["ollama"] = max(levels)
+        agent = _EchoAgent()
+
+        print(f"Stub latency: {latency * 1000:.0f}ms (+/- {jitter * 1000:.0f}ms)")
+        print(f"{'concurrency':>12} {'blocking (s)':>14} {'async (s)':>12} {'async req/s':>12} {'speedup':>9}")
+        for n in levels:
+            blocking = await _run_blocking(agent, n)
+            concurrent = await _run_async(agent, n)
+            print(f"{n:>12} {blocking:>14.2f} {concurrent:>12.2f} {n / concurrent:>12.1f} {blocking / concurrent:>8.1f}x")
+
+        await aclose_clients()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LLM transport load test")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.levels, args.latency, args.jitter))
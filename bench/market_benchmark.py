@@ -0,0 +1,80 @@
+"""
+Market-intelligence stage benchmark, fully offline.
+
+Runs MarketIntelligenceAgent against the fixture search provider (with a
+simulated search latency) and the stub LLM server, and reports per-call
+latency percentiles and calls/second at several concurrency levels.
+
+Usage:
+    python -m bench.market_benchmark --calls 32 --levels 1 4 16 --search-latency 0.3 --latency 0.2
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from pathlib import Path
+
+from config import Config
+from agents.llm_clients import aclose_clients
+from bench.stub_llm import StubLLMServer
+from tools.search_providers import FixtureSearchProvider
+
+FIXTURE = Path(__file__).parent.parent / "data" / "market_search_fixture.jsonl"
+ROLES = ["Software Engineer", "Data Scientist", "Frontend Developer", "Product Designer", "Marketing Specialist"]
+REPLY = {"market_jobs": [
+    {"title": "Platform Engineer", "company": "StubCo", "location": "Remote",
+     "salary_range": "$100k - $140k", "requirements": ["Python", "AWS"], "description": "Stub"},
+]}
+
+
+async def main(calls: int, levels, latency: float, search_latency: float):
+    Config.LLM_CACHE_ENABLED = False
+    with StubLLMServer(latency=latency, reply=REPLY) as server:
+        Config.OLLAMA_BASE_URL = server.base_url
+        Config.LLM_MAX_IN_FLIGHT["ollama"] = max(levels)
+
+        from agents.batch import process_batch
+        from agents.market_intelligence_agent import MarketIntelligenceAgent
+
+        search = FixtureSearchProvider(FIXTURE, latency=search_latency)
+        agent = MarketIntelligenceAgent(provider="ollama", search_provider=search)
+        inputs = [
+            {"role": ROLES[i % len(ROLES)], "skills": ["Python", "SQL", f"Skill{i}"]}
+            for i in range(calls)
+        ]
+
+        async def timed(data):
+            start = time.perf_counter()
+            result = await agent.run([{"content": data}])
+            assert result.get("market_jobs"), result
+            return time.perf_counter() - start
+
+        rows = []
+        for concurrency in levels:
+            start = time.perf_counter()
+            latencies = await process_batch(inputs, timed, concurrency=concurrency)
+            elapsed = time.perf_counter() - start
+            latencies.sort()
+            rows.append((
+                concurrency,
+                statistics.median(latencies) * 1000,
+                latencies[int(0.95 * (len(latencies) - 1))] * 1000,
+                calls / elapsed,
+            ))
+
+        await aclose_clients()
+
+    print(f"\n{calls} calls, search {search_latency * 1000:.0f}ms, stub LLM {latency * 1000:.0f}ms")
+    print(f"{'concurrency':>12} {'p50 (ms)':>10} {'p95 (ms)':>10} {'calls/s':>10}")
+    for concurrency, p50, p95, rate in rows:
+        print(f"{concurrency:>12} {p50:>10.1f} {p95:>10.1f} {rate:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline market-intelligence benchmark")
+    parser.add_argument("--calls", type=int, default=32)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--search-latency", type=float, default=0.3)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.levels, args.latency, args.search_latency))
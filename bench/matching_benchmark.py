@@ -0,0 +1,121 @@
+"""
+Job-scoring benchmark: vectorized JobSkillIndex vs. the per-job Python loop.
+
+Builds synthetic job catalogs in memory and reports per-candidate matching
+time. Also loads each catalog into a scratch SQLite database to time the
+freshness check MatcherAgent runs before every match (get_job_index compares
+JobDatabase.get_jobs_signature with the cached index's).
+
+Usage:
+    python -m bench.matching_benchmark --sizes 10000 100000 1000000
+"""
+import argparse
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from config import Config
+from agents.job_scoring import JobSkillIndex, MATCH_THRESHOLD, NO_REQUIREMENTS_SCORE
+
+LEVELS = ["Junior", "Mid-level", "Senior"]
+
+
+def synthetic_jobs(n: int, vocab_size: int, seed: int = 7):
+    rng = random.Random(seed)
+    vocab = [f"skill_{i}" for i in range(vocab_size)]
+    for job_id in range(1, n + 1):
+        yield job_id, rng.choice(LEVELS), rng.sample(vocab, rng.randint(3, 10))
+
+
+def synthetic_candidates(count: int, vocab_size: int, seed: int = 11):
+    rng = random.Random(seed)
+    vocab = [f"skill_{i}" for i in range(vocab_size)]
+    return [(rng.sample(vocab, rng.randint(5, 20)), rng.choice(LEVELS)) for _ in range(count)]
+
+
+def python_loop(jobs, skills, level, k=3):
+    """Reference: the loop MatcherAgent used before the index"""
+    candidate = set(skills)
+    scored = []
+    for job_id, job_level, requirements in jobs:
+        if job_level != level:
+            continue
+        required = set(requirements)
+        overlap = len(required & candidate)
+        if candidate and not overlap:
+            continue
+        score = int(overlap / len(required) * 100) if required else NO_REQUIREMENTS_SCORE
+        if score >= MATCH_THRESHOLD:
+            scored.append((score, job_id))
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return scored[:k]
+
+
+def signature_check_ms(jobs, workdir: Path, repeat: int = 200) -> float:
+    """Mean time of one get_jobs_signature() call against a database holding `jobs`"""
+    from db.database import JobDatabase
+
+    Config.DB_PATH = str(workdir / f"jobs_{len(jobs)}.sqlite")
+    db = JobDatabase()
+    with db._connection() as conn:
+        conn.executemany(
+            "INSERT INTO jobs (id, title, company, location, type, experience_level, description, requirements) "
+            "VALUES (?, 'Engineer', 'Bench', 'Remote', 'Full-time', ?, '', ?)",
+            ((job_id, level, ",".join(skills)) for job_id, level, skills in jobs),
+        )
+    start = time.perf_counter()
+    for _ in range(repeat):
+        db.get_jobs_signature()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main(sizes, vocab_size: int, candidates: int, loop_limit: int):
+    queries = synthetic_candidates(candidates, vocab_size)
+    workdir = Path(tempfile.mkdtemp(prefix="matching-bench-"))
+    print(f"vocabulary={vocab_size} skills, {candidates} candidates")
+    print(f"{'jobs':>10} {'build (s)':>10} {'top_k (ms)':>11} {'signature (ms)':>15} {'python loop (ms)':>17}")
+
+    try:
+        for n in sizes:
+            run_size(n, queries, vocab_size, loop_limit, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run_size(n: int, queries, vocab_size: int, loop_limit: int, workdir: Path):
+    jobs = list(synthetic_jobs(n, vocab_size))
+
+    start = time.perf_counter()
+    index = JobSkillIndex.from_jobs(jobs)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for skills, level in queries:
+        index.top_k(skills, level)
+    single = (time.perf_counter() - start) / len(queries) * 1000
+
+    signature = signature_check_ms(jobs, workdir)
+
+    if n <= loop_limit:
+        sample = queries[:10]
+        start = time.perf_counter()
+        for skills, level in sample:
+            python_loop(jobs, skills, level)
+        loop = f"{(time.perf_counter() - start) / len(sample) * 1000:>17.2f}"
+    else:
+        loop = f"{'skipped':>17}"
+
+    print(f"{n:>10} {build:>10.2f} {single:>11.2f} {signature:>15.3f} {loop}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vectorized job-scoring benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--vocab", type=int, default=5000)
+    parser.add_argument("--candidates", type=int, default=64)
+    parser.add_argument("--loop-limit", type=int, default=100_000,
+                        help="largest catalog to also time with the Python loop")
+    args = parser.parse_args()
+    main(args.sizes, args.vocab, args.candidates, args.loop_limit)
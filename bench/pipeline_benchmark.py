@@ -0,0 +1,324 @@
+"""
+End-to-end pipeline benchmark, fully offline.
+
+Starts the stub LLM server, synthesizes N PDF resumes into a scratch
+directory with its own SQLite database, and measures:
+
+- process_application: per-resume and per-stage latency, throughput
+- the candidate route (POST /api/candidate/analyze), in-process over ASGI
+- bulk sync (POST /api/recruiter/sync_resumes, then its ingestion event
+  stream): a cold run, then a re-run where every file is a known duplicate
+
+Each scenario reports latency percentiles, throughput, peak RSS (this
+process and the PDF worker processes) and database growth. Results are
+printed, and written as JSON with --output for trend tracking.
+
+Usage:
+    python -m bench.pipeline_benchmark --resumes 20 --latency 0.2 --jitter 0.05 --output bench.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from config import Config
+from bench.stub_llm import StubLLMServer
+from bench.synthetic_resumes import write_resumes
+
+# One reply that every agent can parse into a plausible result
+STUB_REPLY = {
+    "name": "Stub Candidate",
+    "email": "stub@example.com",
+    "technical_skills": ["Python", "AWS", "SQL", "Docker"],
+    "years_of_experience": 6,
+    "education": {"level": "Bachelors", "field": "Computer Science"},
+    "experience_level": "Mid-level",
+    "key_achievements": ["Shipped things"],
+    "domain_expertise": ["Backend"],
+    "screening_score": 72,
+    "recommendation": "Proceed to interview",
+    "market_jobs": [],
+}
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(int(q * len(ordered)), len(ordered) - 1)], 4)
+
+    return {
+        "count": len(ordered),
+        "mean": round(statistics.fmean(ordered), 4),
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "max": round(ordered[-1], 4),
+    }
+
+
+def _stage_latencies(traces: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    per_stage: Dict[str, List[float]] = {}
+    for trace in traces:
+        for stage, entry in trace.get("stages", {}).items():
+            # Work outside a workflow stage (e.g. the candidate route's extractor)
+            # only has LLM time recorded
+            per_stage.setdefault(stage, []).append(entry["wall_time"] or entry["llm_latency"])
+    return {stage: _percentiles(values) for stage, values in per_stage.items()}
+
+
+def _peak_rss_mb() -> Dict[str, float]:
+    # ru_maxrss is in KB on Linux (bytes on macOS)
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {
+        "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1),
+        "pdf_workers": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale, 1),
+    }
+
+
+def _db_state(db_path: Path) -> Dict[str, int]:
+    from db.database import JobDatabase
+
+    size = sum(
+        path.stat().st_size
+        for path in db_path.parent.glob(db_path.name + "*")
+        if path.is_file()
+    )
+    with JobDatabase()._connection() as conn:
+        candidates = conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+    return {"bytes": size, "candidates": candidates}
+
+
+class _Scenario:
+    """Times a scenario and records RSS and DB growth around it"""
+
+    def __init__(self, name: str, db_path: Path, results: Dict[str, Any]):
+        self.name, self.db_path, self.results = name, db_path, results
+
+    def __enter__(self):
+        self.db_before = _db_state(self.db_path)
+        self.start = time.perf_counter()
+        self.entry: Dict[str, Any] = {}
+        return self.entry
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.start
+        db_after = _db_state(self.db_path)
+        self.entry.update({
+            "wall_time": round(wall, 4),
+            "peak_rss_mb": _peak_rss_mb(),
+            "db_growth": {
+                "bytes": db_after["bytes"] - self.db_before["bytes"],
+                "candidates": db_after["candidates"] - self.db_before["candidates"],
+                "total_bytes": db_after["bytes"],
+            },
+        })
+        items = self.entry.get("items")
+        if items:
+            self.entry["throughput_per_min"] = round(items / wall * 60, 2)
+        if self.entry.get("files"):
+            # Includes files skipped as duplicates
+            self.entry["files_per_min"] = round(self.entry["files"] / wall * 60, 2)
+        self.results[self.name] = self.entry
+
+
+async def _bench_process_application(paths: List[Path], concurrency: int) -> Dict[str, Any]:
+    from agents.batch import process_batch
+    from agents.orchestrator import OrchestratorAgent
+
+    orchestrator = OrchestratorAgent(provider="ollama")
+    latencies, traces = [], []
+
+    async def one(path: Path):
+        start = time.perf_counter()
+        result = await orchestrator.process_application({"file_path": str(path), "filename": path.name})
+        latencies.append(time.perf_counter() - start)
+        traces.append(result.get("trace", {}))
+
+    await process_batch(paths, one, concurrency=concurrency)
+    return {
+        "items": len(paths),
+        "latency": _percentiles(latencies),
+        "stages": _stage_latencies(traces),
+        "llm_calls": sum(t.get("totals", {}).get("llm_calls", 0) for t in traces),
+        "prompt_tokens": sum(t.get("totals", {}).get("prompt_tokens", 0) for t in traces),
+        "prompt_estimated_tokens": sum(t.get("totals", {}).get("prompt_estimated_tokens", 0) for t in traces),
+        "prompt_sections_trimmed": sum(t.get("totals", {}).get("prompt_sections_trimmed", 0) for t in traces),
+        "parse_failures": sum(t.get("totals", {}).get("parse_failures", 0) for t in traces),
+    }
+
+
+async def _bench_candidate_route(client, paths: List[Path], concurrency: int) -> Dict[str, Any]:
+    from agents.batch import process_batch
+    from agents.tracing import tracing
+
+    latencies, traces, failures = [], [], 0
+
+    async def one(path: Path):
+        nonlocal failures
+        with tracing() as trace:
+            start = time.perf_counter()
+            with open(path, "rb") as f:
+                response = await client.post(
+                    "/api/candidate/analyze", files={"file": (path.name, f.read(), "application/pdf")}
+                )
+            latencies.append(time.perf_counter() - start)
+        if response.status_code != 200 or response.json().get("status") != "success":
+            failures += 1
+        traces.append(trace.to_dict())
+
+    await process_batch(paths, one, concurrency=concurrency)
+    return {
+        "items": len(paths),
+        "failures": failures,
+        "latency": _percentiles(latencies),
+        "stages": _stage_latencies(traces),
+    }
+
+
+async def _bench_sync(client, files: int) -> Dict[str, Any]:
+    # Submit, then follow the job's event stream until it completes
+    response = (await client.post("/api/recruiter/sync_resumes")).json()
+    results, events = [], 0
+    if response.get("job_id"):
+        async with client.stream("GET", f"/api/recruiter/ingestion/{response['job_id']}/events") as stream:
+            event = None
+            async for line in stream.aiter_lines():
+                if line.startswith("event: "):
+                    event = line[len("event: "):]
+                    events += 1
+                elif line.startswith("data: ") and event == "result":
+                    results.append(json.loads(line[len("data: "):])["result"])
+    return {
+        "files": files,
+        "items": len(results),
+        "skipped_duplicates": response.get("skipped", 0),
+        "failures": sum(1 for r in results if r.get("status") == "Failed"),
+        "events": events,
+    }
+
+
+async def run(n: int, latency: float, jitter: float, concurrency: int) -> Dict[str, Any]:
+    workdir = Path(tempfile.mkdtemp(prefix="recruiter-bench-"))
+    db_path = workdir / "bench.sqlite"
+
+    # Isolated, deterministic environment: scratch DB, no caches, no live market refreshes
+    Config.DB_PATH = str(db_path)
+    Config.LLM_CACHE_ENABLED = False
+    Config.MARKET_SNAPSHOT_REFRESH = False
+    Config.MARKET_SNAPSHOT_PATH = str(workdir / "market_snapshots.json")
+    Config.RESUME_FOLDER = str(workdir / "resumes")
+    Config.DEFAULT_PROVIDER = "ollama"
+    Config.LLM_MAX_IN_FLIGHT["ollama"] = max(8, 6 * concurrency)
+    Config.BATCH_CONCURRENCY = concurrency
+
+    results: Dict[str, Any] = {
+        "config": {
+            "resumes": n,
+            "latency": latency,
+            "jitter": jitter,
+            "concurrency": concurrency,
+            "pdf_page_limited": Config.PDF_PAGE_LIMITED,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "commit": _git_commit(),
+        },
+        "scenarios": {},
+    }
+
+    try:
+        with StubLLMServer(latency=latency, jitter=jitter, reply=STUB_REPLY) as server:
+            Config.OLLAMA_BASE_URL = server.base_url
+
+            import httpx
+            from db.seed_jobs import seed_jobs
+            from agents.llm_clients import aclose_clients
+            from agents.ingestion import get_ingestion_queue
+            from tools.pdf_extraction import shutdown_pdf_pool
+            import main
+
+            seed_jobs()
+            scenarios = results["scenarios"]
+
+            start = time.perf_counter()
+            pipeline_resumes = write_resumes(workdir / "pipeline", n)
+            candidate_resumes = write_resumes(workdir / "candidate", n, start=n)
+            sync_resumes = write_resumes(workdir / "resumes", n, start=2 * n)
+            results["config"]["synthesis_seconds"] = round(time.perf_counter() - start, 3)
+
+            with _Scenario("process_application", db_path, scenarios) as entry:
+                entry.update(await _bench_process_application(pipeline_resumes, concurrency))
+
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+                with _Scenario("candidate_route", db_path, scenarios) as entry:
+                    entry.update(await _bench_candidate_route(client, candidate_resumes, concurrency))
+
+                with _Scenario("bulk_sync_cold", db_path, scenarios) as entry:
+                    entry.update(await _bench_sync(client, len(sync_resumes)))
+
+                # Every file is now known, so this measures the duplicate-skip path
+                with _Scenario("bulk_sync_duplicates", db_path, scenarios) as entry:
+                    entry.update(await _bench_sync(client, len(sync_resumes)))
+
+            results["llm_requests"] = server.request_count
+            results["llm_json_mode_requests"] = server.json_mode_requests
+            await get_ingestion_queue().stop()
+            await aclose_clients()
+            shutdown_pdf_pool()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return results
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _print_summary(results: Dict[str, Any]):
+    config = results["config"]
+    print(f"\n{config['resumes']} resumes/scenario, stub latency {config['latency'] * 1000:.0f}ms "
+          f"(+/- {config['jitter'] * 1000:.0f}ms), concurrency {config['concurrency']}")
+    print(f"{'scenario':>22} {'wall (s)':>9} {'p50 (s)':>8} {'p95 (s)':>8} {'per min':>8} {'RSS MB':>7} {'DB KB':>7}")
+    for name, entry in results["scenarios"].items():
+        latency = entry.get("latency", {})
+        print(
+            f"{name:>22} {entry['wall_time']:>9.2f} {latency.get('p50', float('nan')):>8.3f} "
+            f"{latency.get('p95', float('nan')):>8.3f} {entry.get('throughput_per_min', 0):>8.1f} "
+            f"{entry['peak_rss_mb']['self']:>7.1f} {entry['db_growth']['bytes'] / 1024:>7.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline end-to-end pipeline benchmark")
+    parser.add_argument("--resumes", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--output", type=Path, help="write the JSON results here")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.resumes, args.latency, args.jitter, args.concurrency))
+    _print_summary(results)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+        print(f"\nResults written to {args.output}")
+    else:
+        print(json.dumps(results, indent=2))
@@ -0,0 +1,102 @@
+"""
+Local OpenAI-compatible stub server for benchmarks.
+
+Serves POST /v1/chat/completions with a configurable artificial latency so the
+agent transport can be measured without Ollama or Nebius.
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+DEFAULT_REPLY = {"stub": True}
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        # Keep benchmark output readable
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+
+        server = self.server
+        delay = server.latency + random.uniform(-server.jitter, server.jitter)
+        time.sleep(max(delay, 0))
+
+        content = json.dumps(server.reply)
+        payload = json.dumps({
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": sum(len(m.get("content", "")) for m in body.get("messages", [])) // 4,
+                "completion_tokens": len(content) // 4,
+                "total_tokens": 0,
+            },
+        }).encode()
+
+        with server.lock:
+            server.request_count += 1
+            if body.get("response_format"):
+                server.json_mode_requests += 1
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Default backlog of 5 drops connections under high concurrency
+    request_queue_size = 1024
+
+
+class StubLLMServer:
+    """Background OpenAI-compatible server with latency/jitter in seconds."""
+
+    def __init__(self, latency: float = 0.2, jitter: float = 0.0, reply: Optional[dict] = None, port: int = 0):
+        self.httpd = _StubHTTPServer(("127.0.0.1", port), _StubHandler)
+        self.httpd.latency = latency
+        self.httpd.jitter = jitter
+        self.httpd.reply = reply if reply is not None else DEFAULT_REPLY
+        self.httpd.request_count = 0
+        self.httpd.json_mode_requests = 0
+        self.httpd.lock = threading.Lock()
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    @property
+    def request_count(self) -> int:
+        return self.httpd.request_count
+
+    @property
+    def json_mode_requests(self) -> int:
+        """Requests that asked for structured output (response_format)"""
+        return self.httpd.json_mode_requests
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,97 @@
+"""
+Synthetic PDF resumes for benchmarks.
+
+Writes small, valid text PDFs (Helvetica, one text object per page) without
+any PDF library, so pdfminer has real files to parse on an offline machine.
+Every resume is distinct, so neither the extraction cache nor duplicate
+detection can short-circuit a run.
+"""
+from pathlib import Path
+from typing import List
+
+SKILLS = [
+    "Python", "SQL", "Docker", "AWS", "React", "Kubernetes", "Java", "Go",
+    "TensorFlow", "Figma", "TypeScript", "PostgreSQL", "Machine Learning", "Node.js",
+]
+TITLES = ["Software Engineer", "Data Scientist", "Frontend Developer", "Backend Engineer", "ML Engineer"]
+LINES_PER_PAGE = 48
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: Path, lines: List[str]):
+    """Write `lines` as a plain-text PDF, paginated"""
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+
+    # Object numbers: 1 catalog, 2 page tree, 3 font, then (page, content) pairs
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    kids = []
+    for index, page_lines in enumerate(pages):
+        page_id, content_id = 4 + 2 * index, 5 + 2 * index
+        kids.append(f"{page_id} 0 R")
+        text = "".join(f"({_escape(line)}) Tj T*\n" for line in page_lines)
+        stream = f"BT\n/F1 11 Tf\n14 TL\n50 790 Td\n{text}ET\n".encode("latin-1", "replace")
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode()
+        objects[content_id] = b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"endstream"
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for number in sorted(objects):
+        offsets[number] = len(out)
+        out += b"%d 0 obj\n" % number + objects[number] + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for number in sorted(objects):
+        out += b"%010d 00000 n \n" % offsets[number]
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    Path(path).write_bytes(bytes(out))
+
+
+def resume_lines(i: int) -> List[str]:
+    """Deterministic, distinct resume text for candidate i"""
+    skills = [SKILLS[(i + j) % len(SKILLS)] for j in range(5)]
+    years = 1 + i % 12
+    title = TITLES[i % len(TITLES)]
+    lines = [
+        f"Candidate {i} Example",
+        f"candidate{i}@example.com | +1 555 {i:04d}",
+        "",
+        "SUMMARY",
+        f"{title} with {years} years of experience building production systems.",
+        "",
+        "SKILLS",
+        ", ".join(skills),
+        "",
+        "EXPERIENCE",
+    ]
+    for job in range(3):
+        lines += [
+            f"{title} - Company {i}-{job} ({2024 - job * 2} - {2026 - job * 2})",
+            f"- Delivered project {job} using {skills[job]} and {skills[(job + 1) % 5]}.",
+            f"- Improved performance of service {i}-{job} by {10 + (i + job) % 40}%.",
+            "",
+        ]
+    lines += ["EDUCATION", f"B.Sc. Computer Science, University {i % 7}", ""]
+    # Pad to a realistic length (about two pages)
+    lines += [f"Additional detail line {n} for candidate {i}." for n in range(60)]
+    return lines
+
+
+def write_resumes(directory: Path, n: int, start: int = 0) -> List[Path]:
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(start, start + n):
+        path = directory / f"candidate_{i:05d}.pdf"
+        write_pdf(path, resume_lines(i))
+        paths.append(path)
+    return paths
@@ -15,5 +15,78 @@ class Config:
     NEBIUS_MODEL = "google/gemma-2-9b-it-fast" 
     NEBIUS_API_KEY = "v1.CmQKHHN0YXRpY2tleS1lMDBiNnpzeGJuanJ3N2F6bXMSIXNlcnZpY2VhY2NvdW50LWUwMGFrOTIzODR0NjdzcGt4bjIMCIWR48oGEKTujY4DOgwIhZT7lQcQwIfHowFAAloDZTAw.AAAAAAAAAAHx5bY13HGXiox16ATVGN6dliOeSk2nIS67hirLS3DOfOByD76lV7pbjMSqyeWpa-wweliporRhm2kTYpXvhLgI"
     
+    # LLM HTTP connection pool (shared by all agents in the process)
+    LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", 100))
+    LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", 20))
+    LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", 30.0))
+    LLM_HTTP2 = os.getenv("LLM_HTTP2", "1") == "1"
+    LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 120.0))
+    
+    # Structured output per provider: "json_schema", "json_object" or "" (plain requests).
+    # Agents without a response_schema get json_object; a provider that rejects
+    # response_format gets plain requests for the rest of the process.
+    LLM_JSON_MODE = os.getenv("LLM_JSON_MODE", "1") == "1"
+    LLM_RESPONSE_FORMAT = {"ollama": "json_object", "nebius": "json_schema"}
+    
+    # Max concurrent LLM requests per provider (per worker process)
+    LLM_MAX_IN_FLIGHT = {"ollama": 4, "nebius": 16}
+    LLM_MAX_IN_FLIGHT_DEFAULT = 8
+    
+    # Folder scanned by the recruiter "sync resumes" action
+    RESUME_FOLDER = os.getenv("RESUME_FOLDER", "resumes")
+    
+    # Resumes processed concurrently by recruiter bulk endpoints
+    BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", 4))
+    
+    # PDF parsing (process pool; 0 workers = one per CPU core)
+    PDF_WORKERS = int(os.getenv("PDF_WORKERS", 0))
+    PDF_EXTRACT_TIMEOUT = float(os.getenv("PDF_EXTRACT_TIMEOUT", 30.0))
+    PDF_MAX_BYTES = int(os.getenv("PDF_MAX_BYTES", 20 * 1024 * 1024))
+    # Characters of resume text the prompts actually use; parsing stops there
+    EXTRACTION_CHAR_BUDGET = 4000
+    PDF_PAGE_LIMITED = os.getenv("PDF_PAGE_LIMITED", "1") == "1"
+    
+    # Recruiter uploads, streamed to spool files in uploads/
+    UPLOAD_MAX_FILE_BYTES = int(os.getenv("UPLOAD_MAX_FILE_BYTES", PDF_MAX_BYTES))
+    UPLOAD_MAX_REQUEST_BYTES = int(os.getenv("UPLOAD_MAX_REQUEST_BYTES", 500 * 1024 * 1024))
+    UPLOAD_CHUNK_SIZE = 256 * 1024  # bytes buffered per file between disk writes
+    
+    # Prompt budgets in estimated tokens (user prompt only), per agent name.
+    # Over budget, the lowest-priority prompt sections are trimmed first.
+    PROMPT_CHARS_PER_TOKEN = 4
+    PROMPT_TOKEN_BUDGET_DEFAULT = int(os.getenv("PROMPT_TOKEN_BUDGET_DEFAULT", 1500))
+    PROMPT_TOKEN_BUDGETS = {
+        "Extractor": 1600,
+        "ProfileEnhancer": 1000,
+        "Analyzer": 1500,
+        "Screener": 1200,
+        "Recommender": 1000,
+        "CandidateAdvisor": 1000,
+        "MarketIntelligence": 800,
+    }
+    
+    # LLM response cache (memory LRU + db/llm_cache.sqlite)
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") == "1"
+    LLM_CACHE_DB = "llm_cache.sqlite"
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 1024))
+    LLM_CACHE_TTL = 24 * 3600  # default per-agent TTL in seconds
+    LLM_CACHE_PURGE_INTERVAL = 3600  # seconds between sweeps of expired rows
+    
+    # Market intelligence snapshots (db/market_snapshots.json), refreshed in the background
+    MARKET_SNAPSHOT_PATH = os.getenv("MARKET_SNAPSHOT_PATH", "market_snapshots.json")
+    MARKET_SNAPSHOT_TTL = float(os.getenv("MARKET_SNAPSHOT_TTL", 6 * 3600))
+    MARKET_SNAPSHOT_REFRESH = os.getenv("MARKET_SNAPSHOT_REFRESH", "1") == "1"
+    MARKET_SNAPSHOT_SKILLS = 5  # leading skills that make up a snapshot key
+    
+    # Market search backend: "duckduckgo" (live) or "fixture" (local JSONL/SQLite file)
+    MARKET_SEARCH_PROVIDER = os.getenv("MARKET_SEARCH_PROVIDER", "duckduckgo")
+    MARKET_SEARCH_FIXTURE = os.getenv("MARKET_SEARCH_FIXTURE", "data/market_search_fixture.jsonl")
+    MARKET_SEARCH_TIMEOUT = float(os.getenv("MARKET_SEARCH_TIMEOUT", 10.0))
+    MARKET_SEARCH_CONCURRENCY = int(os.getenv("MARKET_SEARCH_CONCURRENCY", 2))
+    
     # Database
-    DB_PATH = "jobs.sqlite"
+    DB_PATH = os.getenv("DB_PATH", "jobs.sqlite")  # relative to db/, or absolute
+    SQLITE_BUSY_TIMEOUT = 10.0  # seconds a writer waits on a locked database
+    SQLITE_CACHE_SIZE_KB = 64 * 1024
+    SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+    REPORT_COMPRESSION_LEVEL = 6  # zlib level for stored candidate reports and resume texts
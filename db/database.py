@@ -1,17 +1,67 @@
+import hashlib
 import sqlite3
+import threading
+import zlib
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import json
 import os
 
+from config import Config
+from tools.skill_taxonomy import canonical_skill_id
+
+# One connection per (thread, database file), reused across JobDatabase instances
+_local = threading.local()
+# Database files whose schema has already been applied in this process
+_initialized = set()
+_init_lock = threading.Lock()
+
 
 class JobDatabase:
+    # Columns of a candidate list row; the report is fetched separately
+    CANDIDATE_SUMMARY_COLUMNS = (
+        "id, filename, name, email, phone, score, recommendation, status, experience_level, created_at"
+    )
+    CANDIDATE_SORT_COLUMNS = {"date": "created_at", "score": "score"}
+
     def __init__(self):
         # Get the directory where database.py is located
         current_dir = Path(__file__).parent
-        self.db_path = current_dir / "jobs.sqlite"
+        self.db_path = current_dir / Config.DB_PATH
         self.schema_path = current_dir / "schema.sql"
-        self._init_db()
+
+        # Schema and migrations only need to run once per process
+        with _init_lock:
+            if str(self.db_path) not in _initialized:
+                self._init_db()
+                _initialized.add(str(self.db_path))
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Long-lived connection for the calling thread, tuned for concurrent access"""
+        connections = getattr(_local, "connections", None)
+        if connections is None:
+            connections = _local.connections = {}
+
+        conn = connections.get(str(self.db_path))
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=Config.SQLITE_BUSY_TIMEOUT)
+            conn.row_factory = sqlite3.Row
+            # WAL lets readers proceed while the ingest writer commits
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA cache_size=-{Config.SQLITE_CACHE_SIZE_KB}")
+            conn.execute(f"PRAGMA mmap_size={Config.SQLITE_MMAP_SIZE}")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            connections[str(self.db_path)] = conn
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        """Thread's connection wrapped in a transaction (commit on success, rollback on error)"""
+        conn = self._get_connection()
+        with conn:
+            yield conn
 
     def _init_db(self):
         """Initialize the database with schema"""
@@ -21,7 +71,7 @@ class JobDatabase:
         with open(self.schema_path) as f:
             schema = f.read()
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             # Simple migration: Try to create tables if they don't exist
             # This works because our schema uses IF NOT EXISTS
             conn.executescript(schema)
@@ -34,6 +84,263 @@ class JobDatabase:
                 print("Migrating database: Creating candidates table...")
                 conn.executescript(schema)
 
+            self._migrate_candidates(conn)
+            texts_moved = self._migrate_extraction_cache(conn)
+            reports_moved = self._migrate_candidate_reports(conn)
+            self._migrate_job_skills(conn)
+            self._canonicalize_skill_rows(conn, "job_skills", "job_id")
+            self._canonicalize_skill_rows(conn, "candidate_skills", "candidate_id")
+
+        if reports_moved or texts_moved:
+            # Dropping the column leaves the candidates pages mostly empty; compact once
+            print("Migrating database: Compacting...")
+            self._get_connection().execute("VACUUM")
+
+    def _migrate_candidates(self, conn: sqlite3.Connection):
+        """Add duplicate-detection columns and indexes to older databases"""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(candidates)")}
+        if "normalized_filename" not in columns:
+            print("Migrating database: Adding candidates.normalized_filename...")
+            conn.execute("ALTER TABLE candidates ADD COLUMN normalized_filename TEXT")
+            rows = conn.execute("SELECT id, filename FROM candidates").fetchall()
+            conn.executemany(
+                "UPDATE candidates SET normalized_filename = ? WHERE id = ?",
+                [(self.normalize_filename(filename), row_id) for row_id, filename in rows],
+            )
+        if "content_hash" not in columns:
+            conn.execute("ALTER TABLE candidates ADD COLUMN content_hash TEXT")
+        if "experience_level" not in columns:
+            conn.execute("ALTER TABLE candidates ADD COLUMN experience_level TEXT")
+            self._migrate_candidate_skills(conn)
+        # Keyset pagination compares scores, which a NULL would silently drop
+        conn.execute("UPDATE candidates SET score = 0 WHERE score IS NULL")
+
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_candidates_normalized_filename ON candidates(normalized_filename)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_candidates_content_hash ON candidates(content_hash)"
+        )
+
+    def _migrate_extraction_cache(self, conn: sqlite3.Connection) -> int:
+        """
+        Move inline extraction_cache.raw_text into resume_texts. The table is
+        rebuilt because the old column is NOT NULL. Returns the number of
+        cached texts moved.
+        """
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(extraction_cache)")}
+        if "raw_text" not in columns:
+            return 0
+        count = conn.execute("SELECT COUNT(*) FROM extraction_cache").fetchone()[0]
+        if count:
+            print(f"Migrating database: Compressing {count} cached extraction texts...")
+        # Databases created without the completeness flag only hold full texts
+        complete = "raw_text_complete" if "raw_text_complete" in columns else "1"
+
+        conn.execute("ALTER TABLE extraction_cache RENAME TO extraction_cache_old")
+        conn.execute("""
+        CREATE TABLE extraction_cache (
+            content_hash TEXT PRIMARY KEY,
+            text_hash TEXT NOT NULL,
+            raw_text_complete INTEGER DEFAULT 1,
+            structured_data TEXT NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
+        rows = conn.execute(
+            f"SELECT content_hash, raw_text, {complete}, structured_data, created_at FROM extraction_cache_old"
+        )
+        while True:
+            batch = rows.fetchmany(500)
+            if not batch:
+                break
+            conn.executemany(
+                "INSERT INTO extraction_cache VALUES (?, ?, ?, ?, ?)",
+                [
+                    (content_hash, self._store_text(conn, raw_text or ""), raw_text_complete, structured_data, created_at)
+                    for content_hash, raw_text, raw_text_complete, structured_data, created_at in batch
+                ],
+            )
+        conn.execute("DROP TABLE extraction_cache_old")
+        return count
+
+    def _migrate_candidate_skills(self, conn: sqlite3.Connection):
+        """Backfill experience levels and skill rows from stored reports"""
+        rows = conn.execute("SELECT id, full_report FROM candidates").fetchall()
+        if rows:
+            print(f"Migrating database: Indexing skills for {len(rows)} candidates...")
+        for row in rows:
+            try:
+                report = json.loads(row["full_report"])
+            except (json.JSONDecodeError, TypeError):
+                report = {}
+            level, skills = self.candidate_profile(report)
+            conn.execute(
+                "UPDATE candidates SET experience_level = ? WHERE id = ?", (level, row["id"])
+            )
+            self._index_candidate_skills(conn, row["id"], skills)
+
+    def _migrate_candidate_reports(self, conn: sqlite3.Connection) -> int:
+        """
+        Move inline candidates.full_report JSON into candidate_reports /
+        resume_texts. Returns the number of reports moved.
+        """
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(candidates)")}
+        if "full_report" not in columns:
+            return 0
+        count = conn.execute("SELECT COUNT(*) FROM candidates WHERE full_report IS NOT NULL").fetchone()[0]
+        if count:
+            print(f"Migrating database: Compressing {count} candidate reports...")
+
+        rows = conn.execute("SELECT id, full_report FROM candidates WHERE full_report IS NOT NULL")
+        while True:
+            batch = rows.fetchmany(500)
+            if not batch:
+                break
+            for candidate_id, full_report in batch:
+                try:
+                    report = json.loads(full_report)
+                except (json.JSONDecodeError, TypeError):
+                    report = {}
+                self._store_report(conn, candidate_id, report)
+
+        try:
+            conn.execute("ALTER TABLE candidates DROP COLUMN full_report")
+        except sqlite3.OperationalError:
+            # SQLite before 3.35 cannot drop columns; emptying it still frees the pages
+            conn.execute("UPDATE candidates SET full_report = NULL WHERE full_report IS NOT NULL")
+        return count
+
+    def _migrate_job_skills(self, conn: sqlite3.Connection):
+        """Index requirements of jobs added before the job_skills table existed"""
+        rows = conn.execute(
+            "SELECT id, requirements FROM jobs WHERE id NOT IN (SELECT job_id FROM job_skills)"
+        ).fetchall()
+        if rows:
+            print(f"Migrating database: Indexing skills for {len(rows)} jobs...")
+        for row in rows:
+            try:
+                requirements = json.loads(row["requirements"])
+            except (json.JSONDecodeError, TypeError):
+                requirements = []
+            self._index_job_skills(conn, row["id"], requirements)
+
+    def _canonicalize_skill_rows(self, conn: sqlite3.Connection, table: str, owner_column: str):
+        """Rewrite skill rows stored before (or under an older) skill taxonomy"""
+        renames = [
+            (self.normalize_skill(skill), skill)
+            for (skill,) in conn.execute(f"SELECT DISTINCT skill FROM {table}")
+            if self.normalize_skill(skill) != skill
+        ]
+        if not renames:
+            return
+        print(f"Migrating database: Canonicalizing {len(renames)} skills in {table}...")
+        conn.executemany(
+            f"INSERT OR IGNORE INTO {table} ({owner_column}, skill) "
+            f"SELECT {owner_column}, ? FROM {table} WHERE skill = ?",
+            renames,
+        )
+        conn.executemany(f"DELETE FROM {table} WHERE skill = ?", [(old,) for _, old in renames])
+
+    def _index_job_skills(self, conn: sqlite3.Connection, job_id: int, requirements: List[str]):
+        skills = {self.normalize_skill(skill) for skill in requirements if isinstance(skill, str)}
+        conn.executemany(
+            "INSERT OR IGNORE INTO job_skills (job_id, skill) VALUES (?, ?)",
+            [(job_id, skill) for skill in skills if skill],
+        )
+
+    def _index_candidate_skills(self, conn: sqlite3.Connection, candidate_id: int, skills: List[str]):
+        normalized = {self.normalize_skill(skill) for skill in skills if isinstance(skill, str)}
+        conn.executemany(
+            "INSERT OR IGNORE INTO candidate_skills (candidate_id, skill) VALUES (?, ?)",
+            [(candidate_id, skill) for skill in normalized if skill],
+        )
+
+    @staticmethod
+    def _compress(text: str) -> bytes:
+        return zlib.compress(text.encode("utf-8"), Config.REPORT_COMPRESSION_LEVEL)
+
+    def _store_text(self, conn: sqlite3.Connection, raw_text: str) -> str:
+        """Store a resume text once in resume_texts and return its hash"""
+        text_hash = hashlib.sha256(raw_text.encode("utf-8")).hexdigest()
+        conn.execute(
+            "INSERT OR IGNORE INTO resume_texts (text_hash, raw_text) VALUES (?, ?)",
+            (text_hash, self._compress(raw_text)),
+        )
+        return text_hash
+
+    def _store_report(self, conn: sqlite3.Connection, candidate_id: int, report: Dict[str, Any]):
+        """Write a compressed report, storing its resume text once in resume_texts"""
+        extraction = report.get("extraction_results") if isinstance(report, dict) else None
+        raw_text = extraction.get("raw_text") if isinstance(extraction, dict) else None
+        if isinstance(raw_text, str) and raw_text:
+            extraction = {key: value for key, value in extraction.items() if key != "raw_text"}
+            extraction["raw_text_ref"] = self._store_text(conn, raw_text)
+            report = {**report, "extraction_results": extraction}
+        conn.execute(
+            "INSERT OR REPLACE INTO candidate_reports (candidate_id, report) VALUES (?, ?)",
+            (candidate_id, self._compress(json.dumps(report, separators=(",", ":")))),
+        )
+
+    def _load_reports(self, conn: sqlite3.Connection, candidate_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Decompressed reports by candidate id, with their resume text restored"""
+        rows = conn.execute(
+            "SELECT candidate_id, report FROM candidate_reports WHERE candidate_id IN (SELECT value FROM json_each(?))",
+            (json.dumps([int(c) for c in candidate_ids]),),
+        ).fetchall()
+        reports = {}
+        for candidate_id, blob in rows:
+            try:
+                reports[candidate_id] = json.loads(zlib.decompress(blob))
+            except (zlib.error, json.JSONDecodeError):
+                reports[candidate_id] = {}
+
+        refs = {
+            report["extraction_results"]["raw_text_ref"]
+            for report in reports.values()
+            if isinstance(report.get("extraction_results"), dict) and "raw_text_ref" in report["extraction_results"]
+        }
+        texts = {}
+        if refs:
+            for text_hash, blob in conn.execute(
+                "SELECT text_hash, raw_text FROM resume_texts WHERE text_hash IN (SELECT value FROM json_each(?))",
+                (json.dumps(sorted(refs)),),
+            ):
+                texts[text_hash] = zlib.decompress(blob).decode("utf-8")
+        for report in reports.values():
+            extraction = report.get("extraction_results")
+            if isinstance(extraction, dict) and "raw_text_ref" in extraction:
+                extraction["raw_text"] = texts.get(extraction.pop("raw_text_ref"), "")
+        return reports
+
+    @staticmethod
+    def candidate_profile(full_report: Dict[str, Any]):
+        """
+        (experience_level, technical_skills) from an orchestrator report, with
+        the same defaults MatcherAgent applies to the analysis.
+        """
+        analysis = full_report.get("analysis_results") if isinstance(full_report, dict) else None
+        skills_analysis = (analysis or {}).get("skills_analysis") or {}
+        if not isinstance(skills_analysis, dict):
+            skills_analysis = {}
+
+        skills = skills_analysis.get("technical_skills", [])
+        if not isinstance(skills, list):
+            skills = []
+        level = skills_analysis.get("experience_level", "Mid-level")
+        if level not in ["Junior", "Mid-level", "Senior"]:
+            level = "Mid-level"
+        return level, skills
+
+    @staticmethod
+    def normalize_skill(skill: str) -> str:
+        """Canonical skill ID ("React.js" -> "react"), so aliases overlap when scoring"""
+        return canonical_skill_id(skill)
+
+    @staticmethod
+    def normalize_filename(filename: str) -> str:
+        return (filename or "").lower().strip()
+
     def add_job(self, job_data: Dict[str, Any]) -> int:
         """Add a new job to the database"""
         query = """
@@ -43,7 +350,7 @@ class JobDatabase:
         ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 query,
@@ -59,14 +366,15 @@ class JobDatabase:
                     json.dumps(job_data.get("benefits", [])),
                 ),
             )
-            return cursor.lastrowid
+            job_id = cursor.lastrowid
+            self._index_job_skills(conn, job_id, job_data["requirements"])
+            return job_id
 
     def get_all_jobs(self) -> List[Dict[str, Any]]:
         """Retrieve all jobs from the database"""
         query = "SELECT * FROM jobs ORDER BY created_at DESC"
 
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._connection() as conn:
             cursor = conn.cursor()
             cursor.execute(query)
             rows = cursor.fetchall()
@@ -88,28 +396,76 @@ class JobDatabase:
                 for row in rows
             ]
 
+    def get_jobs_by_ids(self, job_ids: List[int]) -> List[Dict[str, Any]]:
+        """Fetch jobs by id, returned in the order of job_ids"""
+        query = "SELECT * FROM jobs WHERE id IN (SELECT value FROM json_each(?))"
+
+        with self._connection() as conn:
+            rows = conn.execute(query, (json.dumps([int(job_id) for job_id in job_ids]),)).fetchall()
+
+        by_id = {
+            row["id"]: {
+                "id": row["id"],
+                "title": row["title"],
+                "company": row["company"],
+                "location": row["location"],
+                "type": row["type"],
+                "experience_level": row["experience_level"],
+                "salary_range": row["salary_range"],
+                "description": row["description"],
+                "requirements": json.loads(row["requirements"]),
+                "benefits": json.loads(row["benefits"]) if row["benefits"] else [],
+            }
+            for row in rows
+        }
+        return [by_id[job_id] for job_id in job_ids if job_id in by_id]
+
+    def _table_version(self, *names: str):
+        """(database, change counters...) for trigger-versioned tables; primary-key lookups only"""
+        with self._connection() as conn:
+            versions = dict(conn.execute(
+                "SELECT name, version FROM table_versions WHERE name IN (SELECT value FROM json_each(?))",
+                (json.dumps(names),),
+            ).fetchall())
+        return (str(self.db_path), *(versions[name] for name in names))
+
+    def get_jobs_signature(self):
+        """Changes whenever jobs or job_skills are written; used to invalidate in-memory indexes"""
+        return self._table_version("jobs")
+
+    def iter_job_skills(self):
+        """Yield (job_id, experience_level, [normalized skills]) for every job, by id"""
+        with self._connection() as conn:
+            jobs = conn.execute("SELECT id, experience_level FROM jobs ORDER BY id").fetchall()
+            skills: Dict[int, List[str]] = {}
+            for job_id, skill in conn.execute("SELECT job_id, skill FROM job_skills"):
+                skills.setdefault(job_id, []).append(skill)
+
+        for job_id, level in jobs:
+            yield job_id, level, skills.get(job_id, [])
+
     def search_jobs(
         self, skills: List[str], experience_level: str
     ) -> List[Dict[str, Any]]:
-        """Search jobs based on skills and experience level"""
-        query = """
-        SELECT * FROM jobs
-        WHERE experience_level = ?
-        AND (
         """
-        query_conditions = []
+        Search jobs at an experience level requiring any of the given skills.
+        Skills match whole requirements (case-insensitive) through the
+        job_skills index, so "Java" does not match "JavaScript".
+        """
+        query = "SELECT * FROM jobs WHERE experience_level = ?"
         params = [experience_level]
 
-        # Create LIKE conditions for each skill
-        for skill in skills:
-            query_conditions.append("requirements LIKE ?")
-            params.append(f"%{skill}%")
-
-        query += " OR ".join(query_conditions) + ")"
+        normalized = sorted({self.normalize_skill(skill) for skill in skills if isinstance(skill, str)} - {""})
+        if normalized:
+            query += """
+            AND id IN (
+                SELECT job_id FROM job_skills
+                WHERE skill IN (SELECT value FROM json_each(?))
+            )"""
+            params.append(json.dumps(normalized))
 
         try:
-            with sqlite3.connect(self.db.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self._connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute(query, params)
                 rows = cursor.fetchall()
@@ -140,11 +496,13 @@ class JobDatabase:
         query = """
         INSERT INTO candidates (
             filename, name, email, phone, score,
-            recommendation, full_report, status
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            recommendation, status,
+            normalized_filename, content_hash, experience_level
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
+        level, skills = self.candidate_profile(candidate_data.get("full_report", {}))
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 query,
@@ -153,30 +511,64 @@ class JobDatabase:
                     candidate_data.get("name"),
                     candidate_data.get("email"),
                     candidate_data.get("phone"),
-                    candidate_data.get("score", 0),
+                    candidate_data.get("score") or 0,
                     candidate_data.get("recommendation"),
-                    json.dumps(candidate_data.get("full_report", {})),
-                    candidate_data.get("status", "Analyzed")
+                    candidate_data.get("status", "Analyzed"),
+                    self.normalize_filename(candidate_data["filename"]),
+                    candidate_data.get("content_hash"),
+                    level,
                 )
             )
-            return cursor.lastrowid
+            candidate_id = cursor.lastrowid
+            self._store_report(conn, candidate_id, candidate_data.get("full_report", {}))
+            self._index_candidate_skills(conn, candidate_id, skills)
+            return candidate_id
+
+    def find_known_resumes(self, filenames: List[str], content_hashes: List[str]) -> Dict[str, set]:
+        """
+        Which filenames / content hashes are already stored, or queued or
+        being processed by an ingestion job (so a second sync or upload does
+        not run them again). Returns {"filenames": {...normalized...}, "hashes": {...}}.
+        """
+        query = """
+        SELECT normalized_filename, content_hash FROM candidates
+        WHERE normalized_filename IN (SELECT value FROM json_each(?))
+        OR content_hash IN (SELECT value FROM json_each(?))
+        """
+        # Few files are in flight at once; the partial index keeps this cheap
+        pending_query = """
+        SELECT filename, content_hash FROM ingestion_files
+        WHERE status IN ('queued', 'processing')
+        """
+        normalized = [self.normalize_filename(name) for name in filenames]
+        hashes = [h for h in content_hashes if h]
+
+        with self._connection() as conn:
+            rows = conn.execute(query, (json.dumps(normalized), json.dumps(hashes))).fetchall()
+            rows += [
+                (self.normalize_filename(filename), content_hash)
+                for filename, content_hash in conn.execute(pending_query)
+            ]
+
+        wanted_names, wanted_hashes = set(normalized), set(hashes)
+        return {
+            "filenames": {name for name, _ in rows if name in wanted_names},
+            "hashes": {h for _, h in rows if h in wanted_hashes},
+        }
 
     def get_all_candidates(self) -> List[Dict[str, Any]]:
         """Retrieve all candidates from the database"""
         query = "SELECT * FROM candidates ORDER BY created_at DESC"
 
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._connection() as conn:
             cursor = conn.cursor()
             cursor.execute(query)
             rows = cursor.fetchall()
+            reports = self._load_reports(conn, [row["id"] for row in rows])
             
             results = []
             for row in rows:
-                try:
-                   report = json.loads(row["full_report"])
-                except:
-                   report = {}
+                report = reports.get(row["id"], {})
                    
                 results.append({
                     "id": row["id"],
@@ -192,6 +584,231 @@ class JobDatabase:
                 })
             return results
 
+    def list_candidates(
+        self,
+        limit: int = 50,
+        cursor: Optional[tuple] = None,
+        sort: str = "date",
+        descending: bool = True,
+        status: Optional[str] = None,
+        min_score: Optional[int] = None,
+        max_score: Optional[int] = None,
+        created_from: Optional[str] = None,
+        created_to: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        One page of candidate summaries (no reports), ordered by `sort`
+        ("date" or "score") and then id. `cursor` is the (sort value, id) of
+        the previous page's last row. Returns {"results", "next_cursor",
+        "total"}; next_cursor is None on the last page and total is only
+        counted for the first page. Dates are "YYYY-MM-DD", both inclusive.
+        """
+        column = self.CANDIDATE_SORT_COLUMNS[sort]
+        filters, params = [], []
+        if status:
+            filters.append("status = ?")
+            params.append(status)
+        if min_score is not None:
+            filters.append("score >= ?")
+            params.append(min_score)
+        if max_score is not None:
+            filters.append("score <= ?")
+            params.append(max_score)
+        if created_from:
+            filters.append("created_at >= ?")
+            params.append(created_from)
+        if created_to:
+            filters.append("created_at < date(?, '+1 day')")
+            params.append(created_to)
+
+        page_filters, page_params = list(filters), list(params)
+        if cursor is not None:
+            # Row-value comparison walks the (column, id) index from the cursor
+            page_filters.append(f"({column}, id) {'<' if descending else '>'} (?, ?)")
+            page_params.extend(cursor)
+        direction = "DESC" if descending else "ASC"
+        query = f"""
+        SELECT {self.CANDIDATE_SUMMARY_COLUMNS} FROM candidates
+        WHERE {" AND ".join(page_filters) or "1"}
+        ORDER BY {column} {direction}, id {direction}
+        LIMIT ?
+        """
+
+        with self._connection() as conn:
+            rows = conn.execute(query, (*page_params, limit + 1)).fetchall()
+            total = None
+            if cursor is None:
+                total = conn.execute(
+                    f"SELECT COUNT(*) FROM candidates WHERE {' AND '.join(filters) or '1'}", params
+                ).fetchone()[0]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = (rows[-1][column], rows[-1]["id"])
+        return {"results": [dict(row) for row in rows], "next_cursor": next_cursor, "total": total}
+
+    def get_candidates_by_ids(self, candidate_ids: List[int], include_report: bool = False) -> List[Dict[str, Any]]:
+        """Candidate summaries by id, returned in the order of candidate_ids"""
+        query = f"""
+        SELECT {self.CANDIDATE_SUMMARY_COLUMNS}
+        FROM candidates WHERE id IN (SELECT value FROM json_each(?))
+        """
+
+        with self._connection() as conn:
+            rows = conn.execute(query, (json.dumps([int(c) for c in candidate_ids]),)).fetchall()
+            reports = self._load_reports(conn, [row["id"] for row in rows]) if include_report else {}
+
+        by_id = {}
+        for row in rows:
+            candidate = dict(row)
+            if include_report:
+                candidate["full_report"] = reports.get(row["id"], {})
+            by_id[row["id"]] = candidate
+        return [by_id[c] for c in candidate_ids if c in by_id]
+
+    def get_candidates_signature(self):
+        """
+        (database, any-change counter, rewrite counter) for candidates and
+        candidate_skills. The rewrite counter only moves when indexed data of
+        existing candidates changes, so an index can tell appends from rewrites.
+        """
+        return self._table_version("candidates", "candidate_rewrites")
+
+    def iter_candidate_skills(self, after_id: int = 0):
+        """Yield (candidate_id, experience_level, [normalized skills]) for candidates with id > after_id, by id"""
+        with self._connection() as conn:
+            candidates = conn.execute(
+                "SELECT id, experience_level FROM candidates WHERE id > ? ORDER BY id", (after_id,)
+            ).fetchall()
+            skills: Dict[int, List[str]] = {}
+            for candidate_id, skill in conn.execute(
+                "SELECT candidate_id, skill FROM candidate_skills WHERE candidate_id > ?", (after_id,)
+            ):
+                skills.setdefault(candidate_id, []).append(skill)
+
+        for candidate_id, level in candidates:
+            yield candidate_id, level, skills.get(candidate_id, [])
+
+    def create_ingestion_job(self, job_id: str, kind: str, provider: str, files: List[Dict[str, Any]]):
+        """Queue an ingestion job; each file is {"filename", "file_path", "content_hash"?, "remove_after"?}"""
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO ingestion_jobs (id, kind, provider, total_files) VALUES (?, ?, ?, ?)",
+                (job_id, kind, provider, len(files)),
+            )
+            conn.executemany(
+                """
+                INSERT INTO ingestion_files (job_id, filename, file_path, content_hash, remove_after)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                [
+                    (job_id, f["filename"], str(f["file_path"]), f.get("content_hash"), int(f.get("remove_after", False)))
+                    for f in files
+                ],
+            )
+
+    def get_ingestion_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job row plus its files (in submission order), or None"""
+        with self._connection() as conn:
+            job = conn.execute("SELECT * FROM ingestion_jobs WHERE id = ?", (job_id,)).fetchone()
+            if job is None:
+                return None
+            files = conn.execute(
+                "SELECT * FROM ingestion_files WHERE job_id = ? ORDER BY id", (job_id,)
+            ).fetchall()
+        return {**dict(job), "files": [dict(f) for f in files]}
+
+    def get_unfinished_ingestion_jobs(self) -> List[Dict[str, Any]]:
+        """
+        Jobs not yet completed, oldest first, with their unfinished files.
+        Files left 'processing' by a previous process are reset to 'queued'.
+        """
+        with self._connection() as conn:
+            conn.execute(
+                """
+                UPDATE ingestion_files SET status = 'queued', stage = NULL
+                WHERE status = 'processing'
+                AND job_id IN (SELECT id FROM ingestion_jobs WHERE status != 'completed')
+                """
+            )
+            jobs = conn.execute(
+                "SELECT * FROM ingestion_jobs WHERE status != 'completed' ORDER BY created_at, rowid"
+            ).fetchall()
+            files = conn.execute(
+                """
+                SELECT f.* FROM ingestion_files f JOIN ingestion_jobs j ON j.id = f.job_id
+                WHERE j.status != 'completed' AND f.status = 'queued' ORDER BY f.id
+                """
+            ).fetchall()
+
+        by_job = {job["id"]: {**dict(job), "files": []} for job in jobs}
+        for f in files:
+            by_job[f["job_id"]]["files"].append(dict(f))
+        return list(by_job.values())
+
+    def update_ingestion_file(self, file_id: int, **fields):
+        """Set status / stage / candidate_id / error on one queued file"""
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with self._connection() as conn:
+            conn.execute(
+                f"UPDATE ingestion_files SET {assignments}, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                (*fields.values(), file_id),
+            )
+
+    def set_ingestion_job_status(self, job_id: str, status: str):
+        finished = ", finished_at = CURRENT_TIMESTAMP" if status == "completed" else ""
+        with self._connection() as conn:
+            conn.execute(f"UPDATE ingestion_jobs SET status = ?{finished} WHERE id = ?", (status, job_id))
+
+    def get_cached_extraction(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Return a previous extraction of the same PDF bytes, if any"""
+        query = """
+        SELECT e.raw_text_complete, e.structured_data, t.raw_text
+        FROM extraction_cache e JOIN resume_texts t ON t.text_hash = e.text_hash
+        WHERE e.content_hash = ?
+        """
+
+        with self._connection() as conn:
+            row = conn.execute(query, (content_hash,)).fetchone()
+
+        if row is None:
+            return None
+        try:
+            raw_text = zlib.decompress(row["raw_text"]).decode("utf-8")
+            structured_data = json.loads(row["structured_data"])
+        except (zlib.error, json.JSONDecodeError):
+            return None
+        return {
+            "raw_text": raw_text,
+            "raw_text_complete": bool(row["raw_text_complete"]),
+            "structured_data": structured_data,
+        }
+
+    def cache_extraction(self, content_hash: str, extraction: Dict[str, Any]):
+        """
+        Store an extraction result under the PDF content hash. The text goes
+        to resume_texts, shared with stored reports. A page-limited text is
+        flagged incomplete, so readers that need the whole resume parse the
+        rest and store it again.
+        """
+        query = """
+        INSERT OR REPLACE INTO extraction_cache (
+            content_hash, text_hash, raw_text_complete, structured_data
+        ) VALUES (?, ?, ?, ?)
+        """
+
+        with self._connection() as conn:
+            conn.execute(
+                query,
+                (
+                    content_hash,
+                    self._store_text(conn, extraction.get("raw_text", "")),
+                    int(extraction.get("raw_text_complete", True)),
+                    json.dumps(extraction.get("structured_data", {})),
+                ),
+            )
+
 
 # import sqlite3
 # from pathlib import Path
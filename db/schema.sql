@@ -21,7 +21,148 @@ CREATE TABLE IF NOT EXISTS candidates (
     phone TEXT,
     score INTEGER,
     recommendation TEXT,
-    full_report TEXT, -- JSON stored as text
     status TEXT DEFAULT 'Analyzed',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    normalized_filename TEXT, -- lower-cased, trimmed filename for duplicate checks
+    content_hash TEXT, -- SHA-256 of the resume file
+    experience_level TEXT -- Junior / Mid-level / Senior, from the skills analysis
+);
+
+-- Full workflow reports, kept out of the candidates table so list scans stay
+-- small. zlib-compressed compact JSON; extraction_results.raw_text is replaced
+-- by raw_text_ref, a key into resume_texts
+CREATE TABLE IF NOT EXISTS candidate_reports (
+    candidate_id INTEGER PRIMARY KEY REFERENCES candidates(id) ON DELETE CASCADE,
+    report BLOB NOT NULL
+);
+
+-- Resume text stored once per distinct text (SHA-256 of the text), zlib-compressed
+CREATE TABLE IF NOT EXISTS resume_texts (
+    text_hash TEXT PRIMARY KEY,
+    raw_text BLOB NOT NULL
+) WITHOUT ROWID;
+
+-- Keyset pagination of the recruiter's candidate list: sort by date or score
+-- (ties broken by id), optionally within one status
+CREATE INDEX IF NOT EXISTS idx_candidates_created ON candidates(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_candidates_score ON candidates(score, id);
+CREATE INDEX IF NOT EXISTS idx_candidates_status_created ON candidates(status, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_candidates_status_score ON candidates(status, score, id);
+
+-- One row per (job, requirement) so skill lookups hit an index instead of LIKE scans
+CREATE TABLE IF NOT EXISTS job_skills (
+    job_id INTEGER NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+    skill TEXT NOT NULL, -- normalized (lower-cased, trimmed)
+    PRIMARY KEY (skill, job_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_job_skills_job ON job_skills(job_id);
+CREATE INDEX IF NOT EXISTS idx_jobs_experience_level ON jobs(experience_level);
+
+-- One row per (candidate, analyzed technical skill) for reverse matching
+CREATE TABLE IF NOT EXISTS candidate_skills (
+    candidate_id INTEGER NOT NULL REFERENCES candidates(id) ON DELETE CASCADE,
+    skill TEXT NOT NULL, -- normalized (lower-cased, trimmed)
+    PRIMARY KEY (skill, candidate_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_candidate_skills_candidate ON candidate_skills(candidate_id);
+
+-- Extractor results keyed by SHA-256 of the PDF bytes
+CREATE TABLE IF NOT EXISTS extraction_cache (
+    content_hash TEXT PRIMARY KEY,
+    text_hash TEXT NOT NULL, -- key into resume_texts
+    raw_text_complete INTEGER DEFAULT 1, -- 0: only the first pages were parsed
+    structured_data TEXT NOT NULL, -- JSON stored as text
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-);
\ No newline at end of file
+);
+
+-- Background ingestion: one row per submitted upload / folder sync...
+CREATE TABLE IF NOT EXISTS ingestion_jobs (
+    id TEXT PRIMARY KEY, -- uuid4 hex, handed to the client
+    kind TEXT NOT NULL, -- upload / sync
+    provider TEXT,
+    status TEXT NOT NULL DEFAULT 'queued', -- queued / running / completed
+    total_files INTEGER DEFAULT 0,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    finished_at DATETIME
+);
+
+-- ...and one per file in it, so unfinished work survives a restart
+CREATE TABLE IF NOT EXISTS ingestion_files (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL REFERENCES ingestion_jobs(id) ON DELETE CASCADE,
+    filename TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    content_hash TEXT,
+    remove_after INTEGER DEFAULT 0, -- uploaded spool file, deleted once processed
+    status TEXT NOT NULL DEFAULT 'queued', -- queued / processing / done / failed
+    stage TEXT, -- workflow stage currently running
+    candidate_id INTEGER,
+    error TEXT,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_ingestion_files_job ON ingestion_files(job_id, status);
+CREATE INDEX IF NOT EXISTS idx_ingestion_files_pending ON ingestion_files(status) WHERE status IN ('queued', 'processing');
+CREATE INDEX IF NOT EXISTS idx_ingestion_jobs_status ON ingestion_jobs(status);
+
+-- Change counters bumped by the triggers below. In-memory skill indexes
+-- compare these instead of scanning jobs / candidates on every lookup
+CREATE TABLE IF NOT EXISTS table_versions (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+-- 'candidate_rewrites' only moves when existing candidates' indexed data
+-- changes; while it stands still, new candidates can be appended to an index
+INSERT OR IGNORE INTO table_versions (name) VALUES ('jobs'), ('candidates'), ('candidate_rewrites');
+
+CREATE TRIGGER IF NOT EXISTS jobs_insert_version AFTER INSERT ON jobs BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'jobs';
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_update_version AFTER UPDATE ON jobs BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'jobs';
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_delete_version AFTER DELETE ON jobs BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'jobs';
+END;
+CREATE TRIGGER IF NOT EXISTS job_skills_insert_version AFTER INSERT ON job_skills BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'jobs';
+END;
+CREATE TRIGGER IF NOT EXISTS job_skills_update_version AFTER UPDATE ON job_skills BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'jobs';
+END;
+CREATE TRIGGER IF NOT EXISTS job_skills_delete_version AFTER DELETE ON job_skills BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'jobs';
+END;
+CREATE TRIGGER IF NOT EXISTS candidates_insert_version AFTER INSERT ON candidates BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'candidates';
+END;
+CREATE TRIGGER IF NOT EXISTS candidates_update_version AFTER UPDATE ON candidates BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'candidates';
+END;
+CREATE TRIGGER IF NOT EXISTS candidates_delete_version AFTER DELETE ON candidates BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'candidates';
+END;
+CREATE TRIGGER IF NOT EXISTS candidate_skills_insert_version AFTER INSERT ON candidate_skills BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'candidates';
+END;
+CREATE TRIGGER IF NOT EXISTS candidate_skills_update_version AFTER UPDATE ON candidate_skills BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'candidates';
+END;
+CREATE TRIGGER IF NOT EXISTS candidate_skills_delete_version AFTER DELETE ON candidate_skills BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'candidates';
+END;
+CREATE TRIGGER IF NOT EXISTS candidates_rewrite_version AFTER UPDATE OF id, experience_level ON candidates BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'candidate_rewrites';
+END;
+CREATE TRIGGER IF NOT EXISTS candidates_remove_version AFTER DELETE ON candidates BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'candidate_rewrites';
+END;
+CREATE TRIGGER IF NOT EXISTS candidate_skills_rewrite_version AFTER UPDATE ON candidate_skills BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'candidate_rewrites';
+END;
+CREATE TRIGGER IF NOT EXISTS candidate_skills_remove_version AFTER DELETE ON candidate_skills BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'candidate_rewrites';
+END;
@@ -1,5 +1,6 @@
 import sqlite3
 import json
+import zlib
 
 db_path = "e:/ollama workspace/Ollama_Course/AI Recruiter Agency/db/jobs.sqlite"
 
@@ -13,7 +14,11 @@ try:
     if row:
         print(f"Name: {row['name']}")
         print(f"Score: {row['score']}")
-        full_report = json.loads(row['full_report'])
+        # Reports live zlib-compressed in candidate_reports
+        report_row = conn.execute(
+            "SELECT report FROM candidate_reports WHERE candidate_id = ?", (row['id'],)
+        ).fetchone()
+        full_report = json.loads(zlib.decompress(report_row['report'])) if report_row else {}
         rec = full_report.get('final_recommendation', {})
         print("Final Recommendation Object:")
         print(json.dumps(rec, indent=2))
@@ -1,9 +1,13 @@
 import os
+import json
+import base64
+import uuid
 import shutil
+import asyncio
 import logging
-from typing import Optional, List
+from typing import Optional
 from fastapi import FastAPI, UploadFile, File, Form, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pathlib import Path
@@ -16,7 +20,15 @@ from agents.candidate_advisor_agent import CandidateAdvisorAgent
 from agents.profile_enhancer_agent import ProfileEnhancerAgent
 from agents.screener_agent import ScreenerAgent
 from agents.recommender_agent import RecommenderAgent
-from agents.orchestrator import OrchestratorAgent
+from agents.llm_clients import aclose_clients
+from agents.pipeline import Stage, StageGraph
+from agents.stage_models import AnalysisInput, MatchInput, ResumeInput
+from agents.ingestion import get_ingestion_queue, job_progress
+from agents.job_scoring import get_candidate_index
+from agents.tracing import render_metrics
+from tools.pdf_extraction import shutdown_pdf_pool, file_sha256
+from tools.upload_spool import MultipartSpool
+from utils.exceptions import UploadError, UploadTooLargeError
 
 # Config
 from config import Config
@@ -37,6 +49,23 @@ templates = Jinja2Templates(directory="templates")
 UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 
+@app.on_event("startup")
+async def start_ingestion_workers():
+    """Start the background ingestion workers, resuming unfinished jobs"""
+    get_ingestion_queue().start()
+
+@app.on_event("shutdown")
+async def close_llm_clients():
+    """Stop ingestion workers, release pooled LLM connections and PDF worker processes"""
+    await get_ingestion_queue().stop()
+    await aclose_clients()
+    shutdown_pdf_pool()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics: stage and LLM latency, tokens, cache hits, parse failures"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 # --- CANDIDATE PORTAL ROUTES ---
 
 @app.get("/", response_class=HTMLResponse)
@@ -52,7 +81,7 @@ async def analyze_candidate_resume(
     """
     Process resume for Candidate View (Focus on Advice & Matches).
     """
-    temp_path = UPLOAD_DIR / f"candidate_{file.filename}"
+    temp_path = UPLOAD_DIR / f"candidate_{uuid.uuid4().hex}_{Path(file.filename).name}"
     try:
         # Determine Provider
         provider = "nebius" if nebius_key else Config.DEFAULT_PROVIDER
@@ -66,39 +95,49 @@ async def analyze_candidate_resume(
             
         # Pipeline Execution (Candidate Flow)
         extractor = ExtractorAgent(provider=provider, api_key=api_key)
-        extraction_res = await extractor.run([{"content": {"file_path": str(temp_path)}}])
+        extraction_res = await extractor.run([{"content": ResumeInput(file_path=str(temp_path))}])
         
         if extraction_res.get("extraction_status") == "failed":
             return {"error": "Failed to extract text from PDF."}
 
-        # Profile Enhancement
         enhancer = ProfileEnhancerAgent(provider=provider, api_key=api_key)
-        enhanced_data = await enhancer.run([{"content": str(extraction_res.get("structured_data", "")) }])
-        
-        # Analysis
         analyzer = AnalyzerAgent(provider=provider, api_key=api_key)
-        analysis_input = {
-            "raw_text": extraction_res.get("raw_text", ""),
-            "enhanced_data": enhanced_data,
-            "structured_data": extraction_res.get("structured_data", "")
-        }
-        analysis_res = await analyzer.run([{"content": str(analysis_input)}])
-        structured_data = analysis_res.get("skills_analysis", {})
-
-        # Matching
         matcher = MatcherAgent(provider=provider, api_key=api_key)
-        matcher_res = await matcher.run([{"content": analysis_res}])
-        
-        # Advice
         advisor = CandidateAdvisorAgent(provider=provider, api_key=api_key)
-        advice_res = await advisor.run([{"content": structured_data}])
+
+        async def enhance(results):
+            return await enhancer.run([{"content": extraction_res.get("structured_data", "")}])
+
+        async def analyze(results):
+            analysis_input = AnalysisInput(
+                raw_text=extraction_res.get("raw_text", ""),
+                structured_data=extraction_res.get("structured_data", ""),
+                enhanced_data=results["enhanced_data"],
+            )
+            return await analyzer.run([{"content": analysis_input}])
+
+        async def match(results):
+            return await matcher.run([{"content": MatchInput.from_content(results["analysis"])}])
+
+        async def advise(results):
+            return await advisor.run([{"content": results["analysis"].get("skills_analysis", {})}])
+
+        # Matching and advice only need the analysis, so they run side by side
+        workflow = StageGraph([
+            Stage("enhanced_data", enhance),
+            Stage("analysis", analyze, ("enhanced_data",)),
+            Stage("matches", match, ("analysis",)),
+            Stage("advice", advise, ("analysis",)),
+        ])
+        results, timings = await workflow.execute()
+        logger.info(f"Candidate pipeline stage timings: {timings}")
 
         return {
             "status": "success",
             "provider_used": provider,
-            "profile": structured_data,
-            "jobs": matcher_res.get("matched_jobs", []),
-            "advice": advice_res  
+            "profile": results["analysis"].get("skills_analysis", {}),
+            "jobs": results["matches"].get("matched_jobs", []),
+            "advice": results["advice"]
         }
 
     except Exception as e:
@@ -117,173 +156,229 @@ async def read_recruiter_root(request: Request):
     """Serve the Recruiter Dashboard"""
     return templates.TemplateResponse("recruiter_dashboard.html", {"request": request})
 
+def _encode_cursor(cursor: tuple) -> str:
+    return base64.urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+
+def _decode_cursor(cursor: str) -> tuple:
+    value, candidate_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    return value, int(candidate_id)
+
 @app.get("/api/recruiter/candidates")
-async def get_candidates():
-    """Retrieve all processed candidates from database"""
+async def get_candidates(
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    sort: str = "date",
+    order: str = "desc",
+    status: Optional[str] = None,
+    min_score: Optional[int] = None,
+    max_score: Optional[int] = None,
+    created_from: Optional[str] = None,
+    created_to: Optional[str] = None,
+):
+    """
+    One page of processed candidates (summary fields only), newest first by
+    default. Pass the returned next_cursor to get the following page; the
+    full report is served by /api/recruiter/candidates/{candidate_id}.
+    """
+    limit = min(max(limit, 1), 200)
+    if sort not in JobDatabase.CANDIDATE_SORT_COLUMNS or order not in ("asc", "desc"):
+        return {"status": "error", "message": "sort must be 'date' or 'score' and order 'asc' or 'desc'"}
+    try:
+        decoded_cursor = _decode_cursor(cursor) if cursor else None
+    except (ValueError, TypeError):
+        return {"status": "error", "message": "Invalid cursor"}
     try:
         db = JobDatabase()
-        candidates = db.get_all_candidates()
-        return {"status": "success", "results": candidates}
+        page = db.list_candidates(
+            limit=limit,
+            cursor=decoded_cursor,
+            sort=sort,
+            descending=order == "desc",
+            status=status,
+            min_score=min_score,
+            max_score=max_score,
+            created_from=created_from,
+            created_to=created_to,
+        )
+        return {
+            "status": "success",
+            "results": page["results"],
+            "next_cursor": _encode_cursor(page["next_cursor"]) if page["next_cursor"] else None,
+            "total": page["total"],
+            "limit": limit,
+        }
     except Exception as e:
         logger.error(f"Error retrieving candidates: {e}")
         return {"status": "error", "message": str(e)}
 
+@app.get("/api/recruiter/candidates/{candidate_id}")
+async def get_candidate(candidate_id: int):
+    """One candidate with its full report"""
+    try:
+        candidates = JobDatabase().get_candidates_by_ids([candidate_id], include_report=True)
+        if not candidates:
+            return {"status": "error", "message": f"Candidate {candidate_id} not found"}
+        return {"status": "success", "candidate": candidates[0]}
+    except Exception as e:
+        logger.error(f"Error retrieving candidate {candidate_id}: {e}")
+        return {"status": "error", "message": str(e)}
+
+@app.get("/api/recruiter/jobs/{job_id}/candidates")
+async def get_job_candidates(job_id: int, offset: int = 0, limit: int = 20):
+    """
+    Rank stored candidates for a job, best match first. Uses the skills
+    already analyzed at ingest and MatcherAgent's scoring; no LLM calls.
+    """
+    offset, limit = max(offset, 0), min(max(limit, 1), 100)
+    try:
+        db = JobDatabase()
+        jobs = db.get_jobs_by_ids([job_id])
+        if not jobs:
+            return {"status": "error", "message": f"Job {job_id} not found"}
+        job = jobs[0]
+
+        ranking = get_candidate_index(db).rank_for_job(
+            job["requirements"], job["experience_level"], offset=offset, limit=limit
+        )
+        candidates = {c["id"]: c for c in db.get_candidates_by_ids(ranking["candidate_ids"])}
+        results = [
+            {**candidates[candidate_id], "match_score": score, "matched_skills": matched}
+            for candidate_id, score, matched in zip(ranking["candidate_ids"], ranking["scores"], ranking["matched_skills"])
+            if candidate_id in candidates
+        ]
+        return {
+            "status": "success",
+            "job": {key: job[key] for key in ("id", "title", "company", "experience_level", "requirements")},
+            "total": ranking["total"],
+            "offset": offset,
+            "limit": limit,
+            "results": results,
+        }
+    except Exception as e:
+        logger.error(f"Error ranking candidates for job {job_id}: {e}")
+        return {"status": "error", "message": str(e)}
+
 @app.post("/api/recruiter/sync_resumes")
 async def sync_local_resumes(nebius_key: Optional[str] = Form(None)):
     """
-    Scans the 'resumes/' folder and processes any new PDF files found there.
+    Scans the 'resumes/' folder and queues any new PDF files found there.
+    Returns an ingestion job ID; follow it at /api/recruiter/ingestion/{job_id}/events.
     """
-    RESUME_FOLDER = Path("resumes")
+    RESUME_FOLDER = Path(Config.RESUME_FOLDER).resolve()
     RESUME_FOLDER.mkdir(exist_ok=True)
     
     files = list(RESUME_FOLDER.glob("*.pdf"))
     if not files:
-        return {"status": "success", "message": "No resumes found in folder.", "results": []}
+        return {"status": "success", "message": "No resumes found in folder.", "job_id": None, "total": 0, "skipped": 0}
 
-    results = []
     # Determine Provider
     provider = "nebius" if nebius_key else Config.DEFAULT_PROVIDER
-    orchestrator = OrchestratorAgent(provider=provider, api_key=nebius_key)
     
     db = JobDatabase()
+
+    # 1. Skip files already in the DB or already queued under the same name, without reading them
+    known_names = db.find_known_resumes([file_path.name for file_path in files], [])["filenames"]
+    unseen = []
     for file_path in files:
-        try:
-            # 1. Check for duplicate based on Filename FIRST
-            existing_candidates = db.get_all_candidates()
-            is_file_duplicate = False
-            uploaded_filename = file_path.name.lower().strip()
-            
-            logger.info(f"Checking for duplicates for: {uploaded_filename}")
-            
-            for cand in existing_candidates:
-                db_filename = cand["filename"].lower().strip()
-                # logger.info(f"Comparing against DB file: {db_filename}") # Verbose logging
-                if db_filename == uploaded_filename:
-                     is_file_duplicate = True
-                     logger.info(f"FOUND DUPLICATE: {file_path.name} matches {cand['filename']}")
-                     break
-            
-            if is_file_duplicate:
-                logger.info(f"Skipping duplicate file: {file_path.name}")
-                continue
+        if db.normalize_filename(file_path.name) in known_names:
+            logger.info(f"Skipping duplicate file: {file_path.name}")
+        else:
+            unseen.append(file_path)
 
-            logger.info(f"Syncing local resume: {file_path.name}")
-            
-            # 2. Run Orchestrator
-            resume_data = {
-                "file_path": str(file_path),
-                "filename": file_path.name
-            }
-            result = await orchestrator.process_application(resume_data)
-            
-            # 3. Robust Name Extraction
-            extraction_results = result.get("extraction_results", {})
-            structured_data = extraction_results.get("structured_data", {})
-            personal = structured_data.get("Personal Info") or structured_data.get("personal_info") or {}
-            
-            if isinstance(personal, list) and len(personal) > 0: personal = personal[0]
-            
-            candidate_name = (
-                personal.get("Name") or 
-                personal.get("name") or 
-                personal.get("Full Name") or 
-                personal.get("full_name") or
-                file_path.stem
-            )
-            
-            # 4. Prepare and Save
-            summary = {
-                "filename": file_path.name,
-                "name": str(candidate_name),
-                "email": personal.get("Email") or personal.get("email"),
-                "phone": personal.get("Phone") or personal.get("phone"),
-                "score": result.get("screening_results", {}).get("screening_score", 0),
-                "recommendation": result.get("final_recommendation", {}).get("recommendation", "N/A"),
-                "full_report": result,
-                "status": "Analyzed"
-            }
-            
-            db.add_candidate(summary)
-            results.append(summary)
-            
-            logger.info(f"Result for {file_path.name}: Name={candidate_name}, Score={summary['score']}")
+    # 2. Hash only the files with new names, to catch copies of known resumes
+    hashes = await asyncio.gather(*(asyncio.to_thread(file_sha256, str(file_path)) for file_path in unseen))
+    seen_hashes = set(db.find_known_resumes([], hashes)["hashes"]) if unseen else set()
+
+    new_files = []
+    for file_path, content_hash in zip(unseen, hashes):
+        if content_hash in seen_hashes:
+            logger.info(f"Skipping duplicate file: {file_path.name}")
+            continue
+        seen_hashes.add(content_hash)
+        new_files.append({"filename": file_path.name, "file_path": file_path, "content_hash": content_hash})
 
-        except Exception as e:
-            logger.error(f"Sync failed for {file_path.name}: {e}")
-            results.append({"filename": file_path.name, "status": "Failed", "error": str(e)})
+    skipped = len(files) - len(new_files)
+    if not new_files:
+        return {"status": "success", "message": "No new resumes found in folder.", "job_id": None, "total": 0, "skipped": skipped}
 
-    return {"status": "success", "results": results}
+    # 3. Queue the new files for the background workers
+    job_id = get_ingestion_queue().submit("sync", new_files, provider, nebius_key)
+    return {"status": "success", "job_id": job_id, "total": len(new_files), "skipped": skipped}
 
 @app.post("/api/recruiter/upload")
-async def batch_upload_resumes(
-    files: List[UploadFile] = File(...),
-    nebius_key: Optional[str] = Form(None)
-):
+async def batch_upload_resumes(request: Request):
     """
-    Handle bulk upload for recruiter.
+    Handle bulk upload for recruiter. The multipart body ("files" parts plus
+    an optional "nebius_key" field) is streamed to spool files, then queued
+    for the background workers; returns an ingestion job ID.
     """
-    results = []
+    try:
+        spool = MultipartSpool(
+            request.headers.get("content-type"), UPLOAD_DIR,
+            content_length=request.headers.get("content-length"),
+        )
+        await spool.consume(request.stream())
+    except UploadTooLargeError as e:
+        return JSONResponse({"status": "error", "message": str(e)}, status_code=413)
+    except UploadError as e:
+        return JSONResponse({"status": "error", "message": str(e)}, status_code=400)
+
     # Determine Provider
+    nebius_key = spool.fields.get("nebius_key") or None
     provider = "nebius" if nebius_key else Config.DEFAULT_PROVIDER
-    orchestrator = OrchestratorAgent(provider=provider, api_key=nebius_key)
-    
-    db = JobDatabase()
-    
-    for file in files:
-        try:
-            logger.info(f"Processing batch upload: {file.filename}")
-            # Save file
-            temp_path = UPLOAD_DIR / file.filename
-            with open(temp_path, "wb") as buffer:
-                buffer.write(await file.read())
-            
-            # Run Orchestrator
-            resume_data = {
-                "file_path": str(temp_path),
-                "filename": file.filename
-            }
-            result = await orchestrator.process_application(resume_data)
-            
-            # Robust Name Extraction
-            extraction_results = result.get("extraction_results", {})
-            structured_data = extraction_results.get("structured_data", {})
-            personal = structured_data.get("Personal Info") or structured_data.get("personal_info") or {}
-            if isinstance(personal, list) and len(personal) > 0: personal = personal[0]
-            
-            candidate_name = (
-                personal.get("Name") or 
-                personal.get("name") or 
-                personal.get("Full Name") or 
-                personal.get("full_name") or
-                file.filename
-            )
-            
-            summary = {
-                "filename": file.filename,
-                "name": str(candidate_name),
-                "email": personal.get("Email") or personal.get("email"),
-                "phone": personal.get("Phone") or personal.get("phone"),
-                "score": result.get("screening_results", {}).get("screening_score", 0),
-                "recommendation": result.get("final_recommendation", {}).get("recommendation", "N/A"),
-                "full_report": result,
-                "status": "Analyzed"
-            }
-            
-            # Save to DB
-            db.add_candidate(summary)
-            results.append(summary)
-            
-            logger.info(f"Upload Result for {file.filename}: Name={candidate_name}, Score={summary['score']}")
 
-        except Exception as e:
-            logger.error(f"Batch upload failed for {file.filename}: {e}")
-            results.append({"filename": file.filename, "status": "Failed", "error": str(e)})
-        finally:
-            if temp_path.exists():
-                os.remove(temp_path)
-                
-    return {"results": results}
+    failed = [{"filename": upload.filename, "status": "Failed", "error": upload.error} for upload in spool.rejected]
+    for upload in spool.rejected:
+        logger.warning(f"Batch upload rejected {upload.filename}: {upload.error}")
+
+    # Skip resumes already stored or queued, or repeated in this upload, by the hash taken while streaming
+    accepted = spool.accepted
+    seen_hashes = JobDatabase().find_known_resumes([], [upload.content_hash for upload in accepted])["hashes"]
+    queued, skipped = [], 0
+    for upload in accepted:
+        if upload.content_hash in seen_hashes:
+            logger.info(f"Skipping duplicate upload: {upload.filename}")
+            os.remove(upload.path)
+            skipped += 1
+            continue
+        seen_hashes.add(upload.content_hash)
+        queued.append({
+            "filename": upload.filename,
+            "file_path": upload.path.resolve(),
+            "content_hash": upload.content_hash,
+            "remove_after": True,
+        })
+
+    if not queued:
+        message = "All uploaded resumes are already stored." if skipped else "No files could be accepted."
+        return {"status": "success" if skipped else "error", "message": message, "job_id": None, "total": 0, "skipped": skipped, "failed": failed}
+
+    job_id = get_ingestion_queue().submit("upload", queued, provider, nebius_key)
+    return {"status": "success", "job_id": job_id, "total": len(queued), "skipped": skipped, "failed": failed}
+
+@app.get("/api/recruiter/ingestion/{job_id}")
+async def get_ingestion_job(job_id: str):
+    """Progress of an ingestion job and the state of each of its files"""
+    job = JobDatabase().get_ingestion_job(job_id)
+    if job is None:
+        return {"status": "error", "message": f"Ingestion job {job_id} not found"}
+    return {"status": "success", "job": job_progress(job), "files": job["files"]}
+
+@app.get("/api/recruiter/ingestion/{job_id}/events")
+async def stream_ingestion_job(job_id: str):
+    """
+    Server-Sent Events for an ingestion job: the current state, then per-file
+    stage progress and results as they happen, ending with a "done" event.
+    """
+    async def event_stream():
+        async for event, data in get_ingestion_queue().events(job_id):
+            yield f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
 
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,91 @@
+import random
+import tempfile
+from pathlib import Path
+
+from config import Config
+
+
+def scratch_db(count, seed=1):
+    """Candidates with few distinct scores and dates, so most sort keys tie"""
+    Config.DB_PATH = str(Path(tempfile.mkdtemp()) / "recruiter.db")
+    from db.database import JobDatabase
+    db = JobDatabase()
+    rng = random.Random(seed)
+    for number in range(count):
+        add_candidate(db, rng, number)
+    return db, rng
+
+
+def add_candidate(db, rng, number):
+    candidate_id = db.add_candidate({
+        "filename": f"resume_{number}.pdf",
+        "name": f"Candidate {number}",
+        "score": rng.choice([40, 55, 55, 70, 90]),
+        "status": rng.choice(["Analyzed", "Shortlisted"]),
+    })
+    with db._connection() as conn:
+        conn.execute(
+            "UPDATE candidates SET created_at = ? WHERE id = ?",
+            (f"2026-10-{rng.randint(1, 4):02d} 09:00:00", candidate_id),
+        )
+    return candidate_id
+
+
+def walk(db, limit, on_page=None, **options):
+    """Follow next_cursor to the end, returning every row seen"""
+    seen, cursor = [], None
+    for _ in range(1000):
+        page = db.list_candidates(limit=limit, cursor=cursor, **options)
+        assert (page["total"] is None) == (cursor is not None)
+        seen += page["results"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return seen
+        if on_page:
+            on_page()
+    raise AssertionError("next_cursor never ran out")
+
+
+def sort_key(row, sort):
+    return (row["created_at"] if sort == "date" else row["score"], row["id"])
+
+
+def test_pages_cover_every_row_once():
+    db, _ = scratch_db(53)
+    for sort in ("date", "score"):
+        for descending in (True, False):
+            for status in (None, "Shortlisted"):
+                options = dict(sort=sort, descending=descending, status=status)
+                expected = db.list_candidates(limit=1000, **options)
+                seen = walk(db, 7, **options)
+                assert [row["id"] for row in seen] == [row["id"] for row in expected["results"]], options
+                assert len(seen) == expected["total"]
+                keys = [sort_key(row, sort) for row in seen]
+                assert keys == sorted(keys, reverse=descending)
+
+
+def test_cursor_is_stable_across_inserts():
+    db, rng = scratch_db(40, seed=2)
+    for sort in ("date", "score"):
+        for descending in (True, False):
+            before = {row["id"] for row in db.list_candidates(limit=1000, sort=sort)["results"]}
+            added = []
+            seen = walk(
+                db, 6, lambda: added.append(add_candidate(db, rng, 1000 + len(added))),
+                sort=sort, descending=descending,
+            )
+            ids = [row["id"] for row in seen]
+            # No duplicates, and every row that existed before the walk is on some page
+            assert len(ids) == len(set(ids))
+            assert before <= set(ids)
+            # Rows inserted mid-walk appear only if they sort after the cursor
+            assert set(ids) - before <= set(added)
+            keys = [sort_key(row, sort) for row in seen]
+            assert keys == sorted(keys, reverse=descending)
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,75 @@
+from agents.json_parsing import JSONObjectScanner, first_json_object
+
+
+def scan(chunks):
+    scanner = JSONObjectScanner()
+    found = [candidate for chunk in chunks for candidate in scanner.feed(chunk)]
+    return found, scanner.pending
+
+
+def test_braces_inside_strings():
+    text = 'Result: {"summary": "uses {curly} and [square] } ] brackets", "n": 1} done'
+    value, outcome = first_json_object(text)
+    assert outcome == "extracted"
+    assert value == {"summary": "uses {curly} and [square] } ] brackets", "n": 1}
+
+
+def test_escaped_quotes():
+    text = 'Here you go: {"quote": "she said \\"{hi}\\"", "path": "C:\\\\"} thanks'
+    value, outcome = first_json_object(text)
+    assert outcome == "extracted"
+    assert value == {"quote": 'she said "{hi}"', "path": "C:\\"}
+
+
+def test_chunk_boundaries_inside_a_string():
+    text = '```json\n{"skills": ["C++", "a \\"}\\" b"], "nested": {"x": [1, {"y": "]"}]}}\n```'
+    expected = '{"skills": ["C++", "a \\"}\\" b"], "nested": {"x": [1, {"y": "]"}]}}'
+    # Every split point, including just after a backslash and mid-string
+    for split in range(1, len(text)):
+        found, pending = scan([text[:split], text[split:]])
+        assert found == [expected], split
+        assert not pending
+    found, pending = scan(list(text))
+    assert found == [expected]
+    assert not pending
+
+
+def test_mismatched_brackets():
+    value, outcome = first_json_object('{"a": [1, 2}')
+    assert (value, outcome) == (None, "no_json")
+    # Scanning carries on after a mismatched candidate
+    value, outcome = first_json_object('broken {"a": [1} then {"b": 2}')
+    assert (value, outcome) == ({"b": 2}, "extracted")
+
+
+def test_balanced_but_invalid_candidate_is_skipped():
+    value, outcome = first_json_object('Dear {name}, the result is {"ok": true}')
+    assert (value, outcome) == ({"ok": True}, "extracted")
+
+
+def test_only_objects_are_returned():
+    assert first_json_object('["a", "b"]') == (None, "no_json")
+    assert first_json_object('Dear {name}, the result is ["ok"]') == (None, "no_json")
+    # An array in the prose before the object is skipped
+    value, outcome = first_json_object('Scores [1, 2] follow: {"score": 2}')
+    assert (value, outcome) == ({"score": 2}, "extracted")
+
+
+def test_truncated_output():
+    value, outcome = first_json_object('Sure! {"unterminated": [1, 2')
+    assert (value, outcome) == (None, "truncated")
+    # Cut off inside a string: the closing brace in it must not end the object
+    value, outcome = first_json_object('{"text": "ends with }')
+    assert (value, outcome) == (None, "truncated")
+
+
+def test_direct_and_no_json():
+    assert first_json_object('  {"a": 1}\n') == ({"a": 1}, "direct")
+    assert first_json_object("no structured data here") == (None, "no_json")
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,119 @@
+import random
+
+import numpy as np
+
+from agents.job_scoring import CandidateSkillIndex, JobSkillIndex, MATCH_THRESHOLD, NO_REQUIREMENTS_SCORE
+from db.database import JobDatabase
+
+SKILLS = ["Python", "SQL", "Docker", "AWS", "React", "Go", "Kubernetes", "Java", "Rust", "Figma", "Excel", "Scala"]
+LEVELS = ["Junior", "Mid-level", "Senior"]
+
+
+def random_rows(rng, start, count, skills=SKILLS):
+    return [
+        (row_id, rng.choice(LEVELS), rng.sample(skills, rng.randint(0, 5)))
+        for row_id in range(start, start + count)
+    ]
+
+
+def assert_same_index(actual, expected):
+    for name in ("row_ids", "level_codes", "indptr", "indices", "postings", "skill_ptr"):
+        assert np.array_equal(getattr(actual, name), getattr(expected, name)), name
+    assert actual.vocabulary == expected.vocabulary
+    assert actual.levels == expected.levels
+
+
+def python_scores(rows, skills, level):
+    """The per-row loop the index replaced: SQL filter, then MatcherAgent's score"""
+    normalize = JobDatabase.normalize_skill
+    wanted = {normalize(skill) for skill in skills if isinstance(skill, str)} - {""}
+    scored = []
+    for row_id, row_level, row_skills in rows:
+        required = {normalize(skill) for skill in row_skills if isinstance(skill, str)} - {""}
+        if row_level != level or (wanted and not wanted & required):
+            continue
+        overlap = len(required & wanted)
+        score = int(overlap / len(required) * 100) if required else NO_REQUIREMENTS_SCORE
+        scored.append((row_id, score))
+    return scored
+
+
+def test_job_top_k_matches_python_loop():
+    rng = random.Random(3)
+    # Aliases and case variants must overlap as they do in the loop
+    skills = SKILLS + ["python", "React.js", "k8s", "", None]
+    jobs = random_rows(rng, 1, 400, skills)
+    jobs += [(401, "Senior", []), (402, "Junior", [])]
+    index = JobSkillIndex.from_jobs(jobs)
+    for _ in range(100):
+        query, level = rng.sample(skills, rng.randint(0, 6)), rng.choice(LEVELS)
+        scored = python_scores(jobs, query, level)
+        kept = [(row_id, score) for row_id, score in scored if score >= MATCH_THRESHOLD]
+        # Stable sort by score keeps the lowest id first on ties
+        expected = sorted(kept, key=lambda item: item[1], reverse=True)[:3]
+
+        match = index.top_k(query, level, k=3)
+        assert list(zip(match["job_ids"].tolist(), match["scores"].tolist())) == expected, (query, level)
+        assert match["number_of_matches"] == len(kept)
+        assert match["first_eligible_id"] == (scored[0][0] if scored else None)
+
+
+def test_candidate_ranking_matches_python_loop():
+    rng = random.Random(5)
+    candidates = random_rows(rng, 1, 300, SKILLS + ["python", "React.js"])
+    index = CandidateSkillIndex.from_candidates(candidates)
+    normalize = JobDatabase.normalize_skill
+    for _ in range(100):
+        requirements, level = rng.sample(SKILLS, rng.randint(0, 5)), rng.choice(LEVELS)
+        required = {normalize(skill) for skill in requirements}
+        expected = []
+        for row_id, row_level, row_skills in candidates:
+            overlap = len(required & {normalize(skill) for skill in row_skills})
+            if row_level != level or (required and not overlap):
+                continue
+            score = int(overlap / len(required) * 100) if required else NO_REQUIREMENTS_SCORE
+            if score >= MATCH_THRESHOLD:
+                expected.append((row_id, score))
+        expected.sort(key=lambda item: item[1], reverse=True)
+
+        ranked = index.rank_for_job(requirements, level, offset=5, limit=10)
+        assert list(zip(ranked["candidate_ids"], ranked["scores"])) == expected[5:15], (requirements, level)
+        assert ranked["total"] == len(expected)
+
+
+def test_appended_index_matches_rebuild():
+    rng = random.Random(7)
+    rows = random_rows(rng, 1, 200, SKILLS[:8])
+    index = CandidateSkillIndex.from_candidates(rows)
+    # Later batches bring skills the index has not seen yet
+    for batch in (random_rows(rng, 201, 1), random_rows(rng, 202, 50), random_rows(rng, 252, 30)):
+        index = index.appended(batch)
+        rows += batch
+        assert_same_index(index, CandidateSkillIndex.from_candidates(rows))
+        assert index.last_row_id == rows[-1][0]
+
+
+def test_appended_index_ranks_like_rebuild():
+    rng = random.Random(11)
+    rows = random_rows(rng, 1, 300)
+    index = CandidateSkillIndex.from_candidates(rows[:100]).appended(rows[100:250]).appended(rows[250:])
+    rebuilt = CandidateSkillIndex.from_candidates(rows)
+    for _ in range(50):
+        requirements, level = rng.sample(SKILLS, rng.randint(0, 4)), rng.choice(LEVELS)
+        assert index.rank_for_job(requirements, level) == rebuilt.rank_for_job(requirements, level)
+
+
+def test_append_leaves_the_old_index_alone():
+    rows = [(1, "Senior", ["Python"]), (2, "Junior", ["SQL"])]
+    index = CandidateSkillIndex.from_candidates(rows)
+    grown = index.appended([(3, "Senior", ["Python", "Haskell"])])
+    assert index.rank_for_job(["Python"], "Senior")["candidate_ids"] == [1]
+    assert grown.rank_for_job(["Python"], "Senior")["candidate_ids"] == [1, 3]
+    assert index.appended([]) is index
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,73 @@
+import tempfile
+from pathlib import Path
+
+from config import Config
+from tools.skill_taxonomy import canonical_skill_id, canonical_skill_name, canonicalize_skills, find_skills
+
+
+def scratch_db():
+    Config.DB_PATH = str(Path(tempfile.mkdtemp()) / "recruiter.db")
+    from db.database import JobDatabase
+    return JobDatabase()
+
+
+def test_aliases_share_one_id():
+    for spellings, canonical_id in (
+        (["React", "React.js", "reactjs", " React  JS "], "react"),
+        (["AWS", "Amazon Web Services", "aws cloud"], "aws"),
+        (["Node.js", "NodeJS", "node"], "node.js"),
+        (["C++", "cpp"], "c++"),
+        (["Kubernetes", "K8s"], "kubernetes"),
+    ):
+        assert {canonical_skill_id(spelling) for spelling in spellings} == {canonical_id}, spellings
+    assert canonical_skill_name("react.js") == "React"
+    # Similar names stay apart, and unknown skills keep their plain normalization
+    assert canonical_skill_id("JavaScript") != canonical_skill_id("Java")
+    assert canonical_skill_id("  Apache   Kafka ") == "apache kafka"
+    assert canonical_skill_name("  Apache   Kafka ") == "Apache Kafka"
+
+
+def test_free_text_uses_longest_match():
+    assert find_skills("Built REST APIs on Amazon Web Services with Node.js") == ["rest apis", "aws", "node.js"]
+    # Short or everyday aliases only count as a whole skill string
+    assert find_skills("Go to the node, keep communication agile") == []
+    assert canonical_skill_id("Go") == "go"
+
+
+def test_canonicalize_skills_expands_and_deduplicates():
+    skills = ["react.js", "Python (Django, Flask)", "ReactJS", "Amazon Web Services", None, "  Apache Kafka "]
+    assert canonicalize_skills(skills) == ["React", "Python (Django, Flask)", "Python", "Django", "Flask", "AWS", "Apache Kafka"]
+    # Running it again changes nothing
+    assert canonicalize_skills(canonicalize_skills(skills)) == canonicalize_skills(skills)
+
+
+def test_stored_skill_rows_are_canonicalized_once():
+    db = scratch_db()
+    job_id = db.add_job({
+        "title": "Frontend Engineer", "company": "Acme", "location": "Remote", "type": "Full-time",
+        "experience_level": "Mid-level", "salary_range": "", "description": "", "requirements": [], "benefits": [],
+    })
+    # Rows written under an older taxonomy: aliases of one skill, plus an unknown skill
+    with db._connection() as conn:
+        conn.executemany(
+            "INSERT INTO job_skills (job_id, skill) VALUES (?, ?)",
+            [(job_id, skill) for skill in ("React.js", "reactjs", "react", "Amazon Web Services", "Rust")],
+        )
+        db._canonicalize_skill_rows(conn, "job_skills", "job_id")
+        first = sorted(skill for (skill,) in conn.execute("SELECT skill FROM job_skills WHERE job_id = ?", (job_id,)))
+        version = conn.execute("SELECT version FROM table_versions WHERE name = 'jobs'").fetchone()[0]
+        db._canonicalize_skill_rows(conn, "job_skills", "job_id")
+        second = sorted(skill for (skill,) in conn.execute("SELECT skill FROM job_skills WHERE job_id = ?", (job_id,)))
+
+        assert first == ["aws", "react", "rust"]
+        assert second == first
+        # The second pass found nothing to rewrite
+        assert conn.execute("SELECT version FROM table_versions WHERE name = 'jobs'").fetchone()[0] == version
+    assert [job["id"] for job in db.search_jobs(["ReactJS"], "Mid-level")] == [job_id]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
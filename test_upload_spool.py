@@ -0,0 +1,117 @@
+import asyncio
+import hashlib
+import tempfile
+from pathlib import Path
+
+from tools.upload_spool import MultipartSpool
+from utils.exceptions import UploadError, UploadTooLargeError
+
+BOUNDARY = "----spooltestboundary7MA4YWxk"
+CONTENT_TYPE = f"multipart/form-data; boundary={BOUNDARY}"
+
+
+def multipart_body(files, fields=None, closed=True):
+    parts = []
+    for name, value in (fields or {}).items():
+        parts.append(
+            f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'.encode()
+            + value.encode() + b"\r\n"
+        )
+    for filename, data in files:
+        parts.append(
+            f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="files"; filename="{filename}"\r\n'
+            f"Content-Type: application/pdf\r\n\r\n".encode()
+            + data + b"\r\n"
+        )
+    body = b"".join(parts)
+    return body + f"--{BOUNDARY}--\r\n".encode() if closed else body
+
+
+async def chunked(body, size):
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+def spool_body(body, size, **limits):
+    directory = Path(tempfile.mkdtemp())
+    spool = MultipartSpool(CONTENT_TYPE, directory, chunk_size=64, **limits)
+    try:
+        asyncio.run(spool.consume(chunked(body, size)))
+    except Exception as e:
+        return spool, directory, e
+    return spool, directory, None
+
+
+def test_boundary_split_across_chunks():
+    # Part data that nearly repeats the boundary must not end the part early
+    first = b"%PDF-1.4 " + b"x" * 300 + b"\r\n--" + BOUNDARY[:-3].encode() + b" tail"
+    second = bytes(range(256)) * 3
+    body = multipart_body([("a.pdf", first), ("b.pdf", second)], {"api_key": "secret"})
+    boundary_at = body.index(f"--{BOUNDARY}".encode(), 10)
+    # Small odd sizes, plus a split landing in the middle of a boundary line
+    for size in (1, 3, 7, 64, boundary_at + 5, len(body)):
+        spool, directory, error = spool_body(body, size)
+        assert error is None, (size, error)
+        assert spool.fields == {"api_key": "secret"}
+        assert [upload.filename for upload in spool.accepted] == ["a.pdf", "b.pdf"]
+        for upload, data in zip(spool.accepted, (first, second)):
+            assert upload.size == len(data)
+            assert upload.path.read_bytes() == data
+            assert upload.content_hash == hashlib.sha256(data).hexdigest()
+        spool.discard()
+        assert not list(directory.iterdir())
+
+
+def test_file_size_limit_rejects_only_that_file():
+    small, large = b"a" * 100, b"b" * 5000
+    body = multipart_body([("big.pdf", large), ("small.pdf", small)])
+    spool, directory, error = spool_body(body, 128, max_file_bytes=1024)
+    assert error is None
+    assert [upload.filename for upload in spool.accepted] == ["small.pdf"]
+    [rejected] = spool.rejected
+    assert rejected.filename == "big.pdf"
+    assert rejected.error == "File exceeds the 1 KB limit"
+    assert rejected.content_hash is None
+    assert not rejected.path.exists()
+    assert list(directory.iterdir()) == [spool.accepted[0].path]
+    spool.discard()
+
+
+def test_request_size_limit_aborts_and_cleans_up():
+    body = multipart_body([("a.pdf", b"a" * 3000), ("b.pdf", b"b" * 3000)])
+    spool, directory, error = spool_body(body, 256, max_request_bytes=4096)
+    assert isinstance(error, UploadTooLargeError)
+    assert not list(directory.iterdir())
+
+    # A declared Content-Length over the limit is refused before reading
+    try:
+        MultipartSpool(CONTENT_TYPE, directory, max_request_bytes=4096, content_length=str(len(body)))
+    except UploadTooLargeError:
+        pass
+    else:
+        raise AssertionError("expected UploadTooLargeError")
+
+
+def test_missing_final_boundary():
+    body = multipart_body([("a.pdf", b"a" * 500), ("b.pdf", b"b" * 500)], closed=False)
+    for truncated in (body, body[:-200]):
+        spool, directory, error = spool_body(truncated, 100)
+        assert isinstance(error, UploadError) and not isinstance(error, UploadTooLargeError)
+        assert "closing boundary" in str(error)
+        assert not list(directory.iterdir())
+
+
+def test_not_multipart():
+    try:
+        MultipartSpool("application/json", Path(tempfile.gettempdir()))
+    except UploadError:
+        pass
+    else:
+        raise AssertionError("expected UploadError")
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
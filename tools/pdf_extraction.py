@@ -0,0 +1,213 @@
+import asyncio
+import hashlib
+import logging
+import os
+import signal
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Optional, Tuple
+
+from config import Config
+from utils.exceptions import ExtractionError
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+# Per event loop: parses submitted to the pool, capped at its worker count
+_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+# Extra seconds a worker gets to honour its own deadline before the pool is killed
+KILL_GRACE = 5.0
+
+
+class ParseDeadlineExceeded(BaseException):
+    """
+    Raised inside a pool process when its parse runs past the timeout. A
+    BaseException, so pdfminer's own `except Exception` blocks cannot swallow it.
+    """
+
+
+def file_sha256(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file's bytes, read in chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _extract_text_worker(file_path: str) -> str:
+    """Runs inside a pool process; pdfminer is imported there, not in the server"""
+    from pdfminer.high_level import extract_text
+    return extract_text(file_path)
+
+
+def _extract_prefix_worker(file_path: str, max_chars: int) -> Tuple[str, bool]:
+    """
+    Lay out pages one at a time and stop once max_chars of text are collected.
+    Returns (text, complete); complete is False whenever extraction stopped
+    early, since checking for more pages would mean laying one out.
+    """
+    from pdfminer.high_level import extract_pages
+    from pdfminer.layout import LTContainer, LTText, LTTextBox
+
+    chunks = []
+
+    # Same traversal as pdfminer's TextConverter, so the prefix matches the
+    # start of extract_text() output exactly
+    def render(item):
+        if isinstance(item, LTContainer):
+            for child in item:
+                render(child)
+        elif isinstance(item, LTText):
+            chunks.append(item.get_text())
+        if isinstance(item, LTTextBox):
+            chunks.append("\n")
+
+    collected = 0
+    for page in extract_pages(file_path):
+        start = len(chunks)
+        render(page)
+        chunks.append("\f")
+        collected += sum(len(chunk) for chunk in chunks[start:])
+        if collected >= max_chars:
+            return "".join(chunks), False
+    return "".join(chunks), True
+
+
+def _expire(signum, frame):
+    raise ParseDeadlineExceeded()
+
+
+def _with_deadline(worker, timeout: float, file_path: str, *args):
+    """
+    Run `worker` in this pool process under a SIGALRM deadline, so a parse
+    that hangs fails on its own and the process stays in the pool. Platforms
+    without setitimer rely on the pool reset in _run_in_pool.
+    """
+    if not hasattr(signal, "setitimer"):
+        return worker(file_path, *args)
+    previous = signal.signal(signal.SIGALRM, _expire)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return worker(file_path, *args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _pool_size() -> int:
+    return Config.PDF_WORKERS or os.cpu_count() or 1
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=_pool_size())
+        return _executor
+
+
+def _pool_slots() -> asyncio.Semaphore:
+    """
+    One slot per pool process, so a submitted parse starts right away and
+    its timeout measures parsing, not time queued behind other files.
+    """
+    loop = asyncio.get_running_loop()
+    with _executor_lock:
+        slots = _slots.get(loop)
+        if slots is None:
+            slots = _slots[loop] = asyncio.Semaphore(_pool_size())
+        return slots
+
+
+def _reset_executor(executor: ProcessPoolExecutor):
+    """
+    Replace `executor` (if still current) and kill its processes. Only used
+    when a worker missed its own deadline (stuck in native code, or no
+    SIGALRM on this platform): ProcessPoolExecutor cannot stop one process,
+    so every parse running in it fails with BrokenProcessPool and is
+    resubmitted once by _run_in_pool.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    for process in list((getattr(executor, "_processes", None) or {}).values()):
+        process.terminate()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_pdf_pool():
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _check_size(path: Path):
+    try:
+        size = path.stat().st_size
+    except OSError as e:
+        raise ExtractionError(f"Cannot read {path.name}: {e}")
+    if size > Config.PDF_MAX_BYTES:
+        raise ExtractionError(
+            f"{path.name} is {size // 1024} KB, above the {Config.PDF_MAX_BYTES // 1024} KB limit"
+        )
+
+
+async def _run_in_pool(path: Path, worker, *args):
+    loop = asyncio.get_running_loop()
+    # A second attempt only happens when the pool broke under this parse
+    for attempt in range(2):
+        try:
+            async with _pool_slots():
+                executor = _get_executor()
+                future = loop.run_in_executor(
+                    executor, _with_deadline, worker, Config.PDF_EXTRACT_TIMEOUT, str(path), *args
+                )
+                return await asyncio.wait_for(future, timeout=Config.PDF_EXTRACT_TIMEOUT + KILL_GRACE)
+        except ParseDeadlineExceeded:
+            # The worker stopped this parse itself; other parses are unaffected
+            logger.error(f"PDF extraction timed out after {Config.PDF_EXTRACT_TIMEOUT}s: {path.name}")
+            raise ExtractionError(f"Timed out parsing {path.name}")
+        except asyncio.TimeoutError:
+            logger.error(f"PDF worker ignored its deadline on {path.name}; resetting the pool")
+            _reset_executor(executor)
+            raise ExtractionError(f"Timed out parsing {path.name}")
+        except BrokenProcessPool as e:
+            # Another file timed out (or a worker died) and took the pool down with this parse in it
+            _reset_executor(executor)
+            if attempt:
+                raise ExtractionError(f"Failed to parse {path.name}: {e}")
+            logger.warning(f"PDF pool was reset while parsing {path.name}; retrying on a fresh pool")
+        except ExtractionError:
+            raise
+        except Exception as e:
+            raise ExtractionError(f"Failed to parse {path.name}: {e}")
+
+
+async def extract_pdf_text(file_path: str) -> str:
+    """
+    Extract the full text of a PDF in a worker process.
+    Raises ExtractionError if the file is missing, too large or takes longer
+    than Config.PDF_EXTRACT_TIMEOUT seconds to parse.
+    """
+    path = Path(file_path)
+    _check_size(path)
+    return await _run_in_pool(path, _extract_text_worker)
+
+
+async def extract_pdf_prefix(file_path: str, max_chars: int) -> Tuple[str, bool]:
+    """
+    Extract text page by page until at least max_chars are available.
+    Returns (text, complete); later pages are never parsed. Same errors as
+    extract_pdf_text.
+    """
+    path = Path(file_path)
+    _check_size(path)
+    return await _run_in_pool(path, _extract_prefix_worker, max_chars)
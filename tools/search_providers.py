@@ -0,0 +1,156 @@
+"""
+Web search backends for MarketIntelligenceAgent.
+
+Every provider exposes `async search(query, max_results)` returning
+[{"title": ..., "snippet": ...}]. DuckDuckGo is the live backend; the fixture
+provider answers from a local JSONL or SQLite file so the market stage can be
+tested and benchmarked offline.
+"""
+import asyncio
+import json
+import re
+import sqlite3
+import threading
+import weakref
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config import Config
+
+
+def _normalize_query(query: str) -> str:
+    return " ".join((query or "").lower().split())
+
+
+def _words(text: str) -> set:
+    return set(re.findall(r"[a-z0-9+#]+", (text or "").lower()))
+
+
+class SearchProvider:
+    """Interface for market search backends"""
+
+    name = "base"
+
+    async def search(self, query: str, max_results: int = 5) -> List[Dict[str, str]]:
+        raise NotImplementedError
+
+
+class DuckDuckGoSearchProvider(SearchProvider):
+    """
+    DuckDuckGo text search. The client is synchronous, so each search runs in
+    a worker thread; a per-loop semaphore caps concurrent searches and every
+    search is bounded by a timeout. A timed-out search is abandoned, not
+    killed: its thread finishes in the background.
+    """
+
+    name = "duckduckgo"
+
+    def __init__(self, timeout: float = None, max_concurrency: int = None):
+        self.timeout = Config.MARKET_SEARCH_TIMEOUT if timeout is None else timeout
+        self.max_concurrency = Config.MARKET_SEARCH_CONCURRENCY if max_concurrency is None else max_concurrency
+        self._limiters = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _limiter(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            limiter = self._limiters.get(loop)
+            if limiter is None:
+                limiter = self._limiters[loop] = asyncio.Semaphore(self.max_concurrency)
+            return limiter
+
+    async def search(self, query: str, max_results: int = 5) -> List[Dict[str, str]]:
+        async with self._limiter():
+            return await asyncio.wait_for(
+                asyncio.to_thread(self._search_sync, query, max_results), self.timeout
+            )
+
+    @staticmethod
+    def _search_sync(query: str, max_results: int) -> List[Dict[str, str]]:
+        from duckduckgo_search import DDGS
+
+        with DDGS() as ddgs:
+            return [
+                {"title": r.get("title", ""), "snippet": r.get("body", "")}
+                for r in ddgs.text(query, max_results=max_results) or []
+            ]
+
+
+class FixtureSearchProvider(SearchProvider):
+    """
+    Deterministic search over recorded results. Accepts a JSONL file with one
+    {"query", "title", "snippet"} object per line, or a SQLite file with a
+    search_results(query, title, snippet) table.
+
+    Records recorded for the exact (normalized) query are returned first;
+    otherwise records are ranked by words shared with the query. `latency`
+    adds a fixed delay per search to stand in for the network in benchmarks.
+    """
+
+    name = "fixture"
+
+    def __init__(self, path: Path, latency: float = 0.0):
+        self.path = Path(path)
+        self.latency = latency
+        self.records = self._load()
+        self._words = [_words(f"{r['query']} {r['title']} {r['snippet']}") for r in self.records]
+
+    def _load(self) -> List[Dict[str, str]]:
+        if self.path.suffix in (".sqlite", ".sqlite3", ".db"):
+            with sqlite3.connect(self.path) as conn:
+                rows = conn.execute("SELECT query, title, snippet FROM search_results ORDER BY rowid").fetchall()
+            records = [{"query": q, "title": t, "snippet": s} for q, t, s in rows]
+        else:
+            records = []
+            with open(self.path) as f:
+                for line in f:
+                    if line.strip():
+                        records.append(json.loads(line))
+        return [
+            {
+                "query": _normalize_query(r.get("query", "")),
+                "title": r.get("title", "") or "",
+                "snippet": r.get("snippet", "") or "",
+            }
+            for r in records
+        ]
+
+    async def search(self, query: str, max_results: int = 5) -> List[Dict[str, str]]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        normalized = _normalize_query(query)
+        exact = [r for r in self.records if r["query"] == normalized]
+        if exact:
+            hits = exact
+        else:
+            query_words = _words(query)
+            scored = [
+                (len(query_words & words), position)
+                for position, words in enumerate(self._words)
+            ]
+            # Most shared words first, then file order
+            scored.sort(key=lambda item: (-item[0], item[1]))
+            hits = [self.records[position] for overlap, position in scored if overlap]
+
+        return [{"title": r["title"], "snippet": r["snippet"]} for r in hits[:max_results]]
+
+
+_provider: Optional[SearchProvider] = None
+_provider_lock = threading.Lock()
+
+
+def get_search_provider() -> SearchProvider:
+    """Process-wide provider chosen by Config.MARKET_SEARCH_PROVIDER"""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            if Config.MARKET_SEARCH_PROVIDER == "fixture":
+                # Relative paths are resolved against the project root
+                path = Path(__file__).parent.parent / Config.MARKET_SEARCH_FIXTURE
+                _provider = FixtureSearchProvider(path)
+            elif Config.MARKET_SEARCH_PROVIDER == "duckduckgo":
+                _provider = DuckDuckGoSearchProvider()
+            else:
+                raise ValueError(f"Unknown market search provider: {Config.MARKET_SEARCH_PROVIDER}")
+        return _provider
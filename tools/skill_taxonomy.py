@@ -0,0 +1,197 @@
+"""
+Canonical skill taxonomy.
+
+Analyzer output and job requirements spell the same skill many ways
+("Amazon Web Services" / "AWS", "react.js" / "React"). Every alias below is
+compiled once into a token trie, so a skill string is mapped to its canonical
+ID in one walk over its tokens, and known skills can be picked out of free
+text ("Experience with Amazon Web Services") with a longest-match scan.
+
+Canonical IDs are the normalized canonical names ("aws", "node.js", "c++").
+Skills that are not in the taxonomy keep their plain normalization
+(lower-cased, whitespace collapsed), so unknown skills still match exactly.
+"""
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+# Canonical name -> alternative spellings (case and punctuation are normalized)
+SKILL_ALIASES: Dict[str, List[str]] = {
+    # Languages
+    "Python": ["Python3", "Python 3", "Python programming"],
+    "JavaScript": ["JS", "ECMAScript", "ES6", "Vanilla JS", "Vanilla JavaScript"],
+    "TypeScript": ["TS"],
+    "Java": ["Core Java", "Java SE"],
+    "C++": ["CPP", "C plus plus"],
+    "C#": ["CSharp", "C Sharp"],
+    "Go": ["Golang"],
+    "SQL": ["Structured Query Language", "SQL queries"],
+    "HTML": ["HTML5"],
+    "CSS": ["CSS3"],
+    # Frameworks and libraries
+    "React": ["React.js", "ReactJS", "React JS"],
+    "Angular": ["AngularJS", "Angular.js", "Angular JS"],
+    "Vue": ["Vue.js", "VueJS", "Vue JS"],
+    "Node.js": ["Node", "NodeJS", "Node JS"],
+    "Express": ["Express.js", "ExpressJS"],
+    "Next.js": ["NextJS", "Next JS"],
+    ".NET": ["dotnet", "dot net", ".NET Core", "ASP.NET"],
+    "Django": ["Django REST Framework", "DRF"],
+    "Flask": [],
+    "FastAPI": ["Fast API"],
+    "Spring Boot": ["Spring", "SpringBoot"],
+    "TensorFlow": ["Tensor Flow"],
+    "PyTorch": ["Torch"],
+    "scikit-learn": ["sklearn", "scikit learn", "scikit"],
+    "Pandas": [],
+    "NumPy": [],
+    # Data and infrastructure
+    "PostgreSQL": ["Postgres", "Postgre SQL", "PSQL"],
+    "MySQL": ["My SQL"],
+    "MongoDB": ["Mongo", "Mongo DB"],
+    "AWS": ["Amazon Web Services", "Amazon AWS", "AWS Cloud"],
+    "Google Cloud": ["GCP", "Google Cloud Platform"],
+    "Azure": ["Microsoft Azure", "Azure Cloud"],
+    "Docker": ["Docker containers", "Containerization"],
+    "Kubernetes": ["K8s", "Kube"],
+    "CI/CD": ["CICD", "Continuous Integration", "CI CD pipelines", "CI/CD pipelines"],
+    "Git": ["Git version control", "Version control"],
+    "REST APIs": ["REST", "REST API", "RESTful", "RESTful APIs", "RESTful services"],
+    "Linux": ["GNU/Linux", "Linux administration"],
+    # Data science
+    "Machine Learning": ["ML"],
+    "Deep Learning": ["DL"],
+    "Natural Language Processing": ["NLP"],
+    "Artificial Intelligence": ["AI"],
+    "Data analysis": ["Data analytics", "Data analyst"],
+    "Statistics": ["Statistical analysis", "Statistical modeling"],
+    # Design, marketing and general
+    "Figma": [],
+    "Sketch": ["Sketch app"],
+    "Adobe Creative Suite": ["Adobe Creative Cloud", "Adobe CC", "Adobe Suite"],
+    "CAD software": ["CAD", "Computer-aided design"],
+    "SEO": ["Search Engine Optimization"],
+    "Google Analytics": ["GA4", "Google Analytics 4"],
+    "Agile methodologies": ["Agile", "Scrum", "Agile/Scrum", "Agile development"],
+    "Project management": ["Project management skills"],
+    "Communication skills": ["Communication", "Strong communication", "Verbal communication"],
+}
+
+# Spellings that are ordinary words (or too short) to trust inside free text;
+# they only match when they are the whole skill string
+WHOLE_STRING_ONLY = {
+    "go", "ai", "ml", "dl", "ts", "js", "node", "spring", "torch", "rest", "restful",
+    "agile", "scrum", "communication", "cad", "sketch", "express", "kube", "mongo",
+    "scikit", "version control",
+}
+
+# Keeps "c++", "c#", ".net", "node.js" together as single tokens
+_TOKEN_RE = re.compile(r"\.?[a-z0-9+#]+(?:\.[a-z0-9+#]+)*")
+# Mark the end of an alias in the trie: canonical ID, and whether the alias
+# may also match inside free text
+_END = "$"
+_IN_TEXT = "$text"
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _normalize(skill: str) -> str:
+    return " ".join(skill.lower().split())
+
+
+def _compile(aliases: Dict[str, List[str]]) -> Tuple[dict, Dict[str, str]]:
+    """Build the token trie and the canonical ID -> display name table"""
+    trie: dict = {}
+    names: Dict[str, str] = {}
+    for name, spellings in aliases.items():
+        canonical_id = _normalize(name)
+        names[canonical_id] = name
+        for spelling in [name, *spellings]:
+            node = trie
+            for token in _tokens(spelling):
+                node = node.setdefault(token, {})
+            existing = node.get(_END)
+            if existing is not None and existing != canonical_id:
+                raise ValueError(f"Alias {spelling!r} maps to both {existing!r} and {canonical_id!r}")
+            node[_END] = canonical_id
+            node[_IN_TEXT] = _normalize(spelling) not in WHOLE_STRING_ONLY
+    return trie, names
+
+
+_TRIE, _NAMES = _compile(SKILL_ALIASES)
+
+
+def _lookup(tokens: List[str]) -> Optional[str]:
+    node = _TRIE
+    for token in tokens:
+        node = node.get(token)
+        if node is None:
+            return None
+    return node.get(_END)
+
+
+@lru_cache(maxsize=65536)
+def canonical_skill_id(skill: str) -> str:
+    """Canonical ID for a skill string, or its plain normalization if unknown"""
+    return _lookup(_tokens(skill)) or _normalize(skill)
+
+
+def canonical_skill_name(skill: str) -> str:
+    """Display name for a skill ("react.js" -> "React"); unknown skills are returned trimmed"""
+    canonical_id = _lookup(_tokens(skill))
+    return _NAMES[canonical_id] if canonical_id else " ".join(skill.split())
+
+
+def find_skills(text: str) -> List[str]:
+    """
+    Canonical IDs of every known skill mentioned in free text, in order of
+    appearance. Overlapping aliases resolve to the longest match.
+    """
+    tokens = _tokens(text)
+    found: List[str] = []
+    start = 0
+    while start < len(tokens):
+        node, match, end = _TRIE, None, start
+        for position in range(start, len(tokens)):
+            node = node.get(tokens[position])
+            if node is None:
+                break
+            if node.get(_IN_TEXT):
+                match, end = node[_END], position + 1
+        if match is None:
+            start += 1
+            continue
+        if match not in found:
+            found.append(match)
+        start = end
+    return found
+
+
+def canonicalize_skills(skills: List[str]) -> List[str]:
+    """
+    Canonical display names for an analyzer skill list, deduplicated in order.
+    Entries that are not a known skill are kept as written, followed by any
+    known skills they mention ("Python (Django, Flask)" also yields "Python").
+    """
+    result: List[str] = []
+    seen = set()
+
+    def add(name: str):
+        key = canonical_skill_id(name)
+        if key and key not in seen:
+            seen.add(key)
+            result.append(name)
+
+    for skill in skills:
+        if not isinstance(skill, str):
+            continue
+        canonical_id = _lookup(_tokens(skill))
+        if canonical_id:
+            add(_NAMES[canonical_id])
+            continue
+        add(" ".join(skill.split()))
+        for mentioned in find_skills(skill):
+            add(_NAMES[mentioned])
+    return result
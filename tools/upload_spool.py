@@ -0,0 +1,238 @@
+"""
+Streaming multipart uploads.
+
+Reads a multipart/form-data request body chunk by chunk and writes each file
+part straight to its own uniquely named spool file, hashing it on the way.
+The next chunk is only pulled from the client once the previous one is on
+disk, so a slow disk slows the upload down instead of filling memory: at most
+about one UPLOAD_CHUNK_SIZE buffer per request is held, whatever the size or
+number of files.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional
+
+from python_multipart.exceptions import FormParserError
+from python_multipart.multipart import MultipartParser, MultipartState, parse_options_header
+
+from config import Config
+from utils.exceptions import UploadError, UploadTooLargeError
+
+logger = logging.getLogger(__name__)
+
+MAX_FIELD_BYTES = 64 * 1024  # plain form fields (API keys and the like)
+
+
+def _format_limit(limit: int) -> str:
+    if limit >= 1024 * 1024:
+        return f"{limit / (1024 * 1024):g} MB"
+    return f"{limit / 1024:g} KB"
+
+
+class SpooledUpload:
+    """One uploaded file, already on disk"""
+
+    __slots__ = ("field_name", "filename", "path", "size", "content_hash", "error", "_file", "_digest", "_buffer")
+
+    def __init__(self, field_name: str, filename: str, path: Path, file):
+        self.field_name = field_name
+        self.filename = filename
+        self.path = path
+        self.size = 0
+        self.content_hash: Optional[str] = None
+        self.error: Optional[str] = None
+        self._file = file
+        self._digest = hashlib.sha256()
+        self._buffer = bytearray()
+
+    def _flush(self):
+        """Write and hash the buffered bytes (runs in a worker thread)"""
+        if self._file is not None and self._buffer:
+            self._file.write(self._buffer)
+            self._digest.update(self._buffer)
+        self._buffer.clear()
+
+    def _close(self):
+        self._flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            if self.error is None:
+                self.content_hash = self._digest.hexdigest()
+
+    def _discard(self):
+        """Drop the spool file; the rest of this part is read but not kept"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._buffer.clear()
+        if self.path.exists():
+            os.remove(self.path)
+
+
+class MultipartSpool:
+    """
+    Parses one multipart request into spooled files and text fields.
+
+    A file larger than `max_file_bytes` is dropped (its `error` says why) and
+    the rest of the request still goes through; a body larger than
+    `max_request_bytes` aborts the whole request with UploadTooLargeError.
+    """
+
+    def __init__(
+        self,
+        content_type: str,
+        directory: Path,
+        max_file_bytes: int = None,
+        max_request_bytes: int = None,
+        chunk_size: int = None,
+        content_length: Optional[str] = None,
+    ):
+        _, params = parse_options_header(content_type or "")
+        boundary = params.get(b"boundary")
+        if not boundary:
+            raise UploadError("Expected a multipart/form-data request")
+        self.directory = Path(directory)
+        self.max_file_bytes = max_file_bytes or Config.UPLOAD_MAX_FILE_BYTES
+        self.max_request_bytes = max_request_bytes or Config.UPLOAD_MAX_REQUEST_BYTES
+        self.chunk_size = chunk_size or Config.UPLOAD_CHUNK_SIZE
+        # Refuse a declared oversize body before reading any of it
+        if content_length and content_length.isdigit() and int(content_length) > self.max_request_bytes:
+            raise UploadTooLargeError(self._request_limit_message())
+        self.files: List[SpooledUpload] = []
+        self.fields: Dict[str, str] = {}
+        self.received = 0
+
+        self._parser = MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+        })
+        self._headers: Dict[bytes, bytes] = {}
+        self._header_name = bytearray()
+        self._header_value = bytearray()
+        self._upload: Optional[SpooledUpload] = None
+        self._field_name: Optional[str] = None
+        self._field_data = bytearray()
+        # Uploads with a full buffer to write, and uploads whose part has ended
+        self._full: List[SpooledUpload] = []
+        self._ended: List[SpooledUpload] = []
+
+    # --- parser callbacks (synchronous; no I/O happens here) ---
+
+    def _on_part_begin(self):
+        self._headers = {}
+        self._upload, self._field_name = None, None
+        self._field_data.clear()
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_name += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[bytes(self._header_name).lower()] = bytes(self._header_value)
+        self._header_name.clear()
+        self._header_value.clear()
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        if b"filename" not in options:
+            self._field_name = name
+            return
+        filename = Path(options[b"filename"].decode("utf-8", "replace")).name
+        if not filename:
+            # Browsers send an empty file part when no file was chosen
+            return
+        fd, path = tempfile.mkstemp(prefix="upload_", suffix=Path(filename).suffix[:16], dir=self.directory)
+        self._upload = SpooledUpload(name, filename, Path(path), os.fdopen(fd, "wb"))
+        self.files.append(self._upload)
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        upload = self._upload
+        if upload is None:
+            if len(self._field_data) + end - start > MAX_FIELD_BYTES:
+                raise UploadError(f"Form field '{self._field_name}' is too large")
+            self._field_data += data[start:end]
+            return
+        upload.size += end - start
+        if upload.error is not None:
+            return
+        if upload.size > self.max_file_bytes:
+            upload.error = f"File exceeds the {_format_limit(self.max_file_bytes)} limit"
+            upload._discard()
+            return
+        upload._buffer += data[start:end]
+        if len(upload._buffer) >= self.chunk_size:
+            self._full.append(upload)
+
+    def _on_part_end(self):
+        if self._upload is None:
+            if self._field_name:
+                self.fields[self._field_name] = self._field_data.decode("utf-8", "replace")
+        else:
+            self._ended.append(self._upload)
+
+    # --- driving the parser ---
+
+    async def consume(self, stream: AsyncIterator[bytes]):
+        """Feed the request body through the parser; cleans up every spool file on failure"""
+        try:
+            async for chunk in stream:
+                self.received += len(chunk)
+                if self.received > self.max_request_bytes:
+                    raise UploadTooLargeError(self._request_limit_message())
+                try:
+                    self._parser.write(chunk)
+                except FormParserError as e:
+                    raise UploadError(f"Invalid multipart data: {e}")
+                # Disk writes and hashing happen off the event loop, before the next read
+                if self._full or self._ended:
+                    full, ended = self._full, self._ended
+                    self._full, self._ended = [], []
+                    await asyncio.to_thread(self._write, full, ended)
+            self._parser.finalize()
+            if self._parser.state != MultipartState.END:
+                # finalize() does not check this: a body cut off before the
+                # closing boundary would otherwise pass as complete files
+                raise UploadError("Invalid multipart data: missing the closing boundary")
+            await asyncio.to_thread(self._write, [], self.files)
+        except BaseException:
+            self.discard()
+            raise
+
+    def _request_limit_message(self) -> str:
+        return f"Upload exceeds the {_format_limit(self.max_request_bytes)} request limit"
+
+    @staticmethod
+    def _write(full: List[SpooledUpload], ended: List[SpooledUpload]):
+        for upload in full:
+            upload._flush()
+        for upload in ended:
+            upload._close()
+
+    def discard(self):
+        """Remove every spool file written for this request"""
+        for upload in self.files:
+            try:
+                upload._discard()
+            except OSError as e:
+                logger.warning(f"Could not remove spool file {upload.path}: {e}")
+
+    @property
+    def accepted(self) -> List[SpooledUpload]:
+        return [upload for upload in self.files if upload.error is None]
+
+    @property
+    def rejected(self) -> List[SpooledUpload]:
+        return [upload for upload in self.files if upload.error is not None]
@@ -31,4 +31,15 @@ class ScreeningError(ResumeProcessingError):
 class RecommendationError(ResumeProcessingError):
     """Raised when generating recommendations fails"""
 
-    pass
\ No newline at end of file
+    pass
+
+class UploadError(ResumeProcessingError):
+    """Raised when an upload request is malformed"""
+
+    pass
+
+
+class UploadTooLargeError(UploadError):
+    """Raised when an upload request exceeds its size limit"""
+
+    pass